@@ -0,0 +1,70 @@
+"""Measure per-request authentication overhead of the JWT strategy.
+
+Run with ``python -m benchmarks.auth``. The user manager is a stub that
+returns a user without I/O, so only the strategy work is measured:
+
+* before: a new JWTStrategy per request that verifies the token every time;
+* after: the shared strategy from `get_jwt_strategy`, which verifies a
+  token once and serves its claims from the LRU until it expires.
+"""
+
+import asyncio
+import time
+
+from fastapi_users.authentication import JWTStrategy
+
+from models import User
+from services.users.modules.manager import get_jwt_strategy
+
+REQUESTS = 20_000
+
+
+class StubUserManager:
+    def __init__(self, user: User) -> None:
+        self.user = user
+
+    def parse_id(self, user_id):
+        return int(user_id)
+
+    async def get(self, user_id):
+        return self.user
+
+
+def fresh_strategy() -> JWTStrategy:
+    shared = get_jwt_strategy()
+    return JWTStrategy(secret=shared.secret, lifetime_seconds=shared.lifetime_seconds)
+
+
+def shared_strategy() -> JWTStrategy:
+    return get_jwt_strategy()
+
+
+async def measure(strategy_factory, token: str, user_manager) -> float:
+    """Return the average microseconds per request."""
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        user = await strategy_factory().read_token(token, user_manager)
+        assert user is not None
+    return (time.perf_counter() - started) / REQUESTS * 1_000_000
+
+
+async def main() -> None:
+    user = User(
+        id=1,
+        email="bench@example.com",
+        first_name="Bench",
+        second_name="Mark",
+        hashed_password="",
+    )
+    user_manager = StubUserManager(user)
+
+    token = await shared_strategy().write_token(user)
+
+    before = await measure(fresh_strategy, token, user_manager)
+    after = await measure(shared_strategy, token, user_manager)
+    print(f"before: {before:8.2f} us/request")
+    print(f" after: {after:8.2f} us/request ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""Compare fan-out on write with fan-out on read for the home feed.
+
+Run with ``python -m benchmarks.feed [--readers N] [--authors N] [--posts N]``
+against the database configured in ``.env``. Everything runs inside one
+transaction that is rolled back, so no data is left behind. Every reader
+follows every author, then for each strategy:
+
+* publish: average time of `TimelineQueryBuilder.fan_out_post` for new posts;
+* read: p50/p95 latency of the first feed page for random readers.
+
+Fan-out on read is simulated with a threshold of 0 (every author's posts are
+pulled); fan-out on write precomputes all timelines first.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from common.schemas import PaginationParams
+from db.database import Database
+from models import Follow, Post, TimelineEntry, User
+from services.feed.query_builder.timeline import TIMELINE_COLUMNS, TimelineQueryBuilder
+
+
+async def seed(session: AsyncSession, readers: int, authors: int, posts: int):
+    users = await session.execute(
+        insert(User)
+        .values(
+            [
+                {
+                    "email": f"feed-bench-{i}@example.com",
+                    "first_name": "Feed",
+                    "second_name": "Bench",
+                    "hashed_password": "",
+                }
+                for i in range(readers + authors)
+            ]
+        )
+        .returning(User.id)
+    )
+    user_ids = users.scalars().all()
+    reader_ids, author_ids = user_ids[:readers], user_ids[readers:]
+
+    started = datetime.now(timezone.utc) - timedelta(days=30)
+    post_rows = [
+        {
+            "title": f"Post {author_id}/{i}",
+            "content": "x" * 200,
+            "author_id": author_id,
+            "created_at": started + timedelta(seconds=random.randrange(30 * 86400)),
+            "is_published": True,
+        }
+        for author_id in author_ids
+        for i in range(posts)
+    ]
+    for offset in range(0, len(post_rows), 1000):
+        await session.execute(insert(Post).values(post_rows[offset : offset + 1000]))
+
+    follow_rows = [
+        {"follower_id": reader_id, "followee_id": author_id}
+        for reader_id in reader_ids
+        for author_id in author_ids
+    ]
+    for offset in range(0, len(follow_rows), 5000):
+        await session.execute(
+            insert(Follow).values(follow_rows[offset : offset + 5000])
+        )
+    await session.execute(
+        update(User).where(User.id.in_(author_ids)).values(number_of_followers=readers)
+    )
+    return reader_ids, author_ids
+
+
+async def publish(session: AsyncSession, author_ids, count: int) -> float:
+    """Return the average milliseconds spent fanning out one new post."""
+    elapsed = 0.0
+    for _ in range(count):
+        post = Post(
+            title="New post",
+            content="y" * 200,
+            author_id=random.choice(author_ids),
+            is_published=True,
+        )
+        session.add(post)
+        await session.flush()
+        started = time.perf_counter()
+        await TimelineQueryBuilder.fan_out_post(session, post.id)
+        elapsed += time.perf_counter() - started
+    return elapsed / count * 1000
+
+
+async def read(session: AsyncSession, reader_ids, count: int):
+    """Return p50 and p95 milliseconds for reading the first feed page."""
+    params = PaginationParams(size=20)
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await TimelineQueryBuilder.get_feed(session, random.choice(reader_ids), params)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=1000)
+    parser.add_argument("--authors", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=40, help="Posts per author")
+    parser.add_argument("--publishes", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    database = Database()
+    async with database.engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            reader_ids, author_ids = await seed(
+                session, args.readers, args.authors, args.posts
+            )
+
+            TimelineQueryBuilder.fanout_max_followers = 0
+            read_publish = await publish(session, author_ids, args.publishes)
+            read_p50, read_p95 = await read(session, reader_ids, args.reads)
+
+            TimelineQueryBuilder.fanout_max_followers = args.readers
+            await session.execute(
+                pg_insert(TimelineEntry)
+                .from_select(
+                    TIMELINE_COLUMNS,
+                    select(
+                        Follow.follower_id, Post.id, Post.author_id, Post.created_at
+                    ).join(Post, Post.author_id == Follow.followee_id),
+                )
+                .on_conflict_do_nothing()
+            )
+            write_publish = await publish(session, author_ids, args.publishes)
+            write_p50, write_p95 = await read(session, reader_ids, args.reads)
+        finally:
+            await session.close()
+            await transaction.rollback()
+    await database.dispose()
+
+    print(
+        f"{args.readers} readers following {args.authors} authors "
+        f"with {args.posts} posts each"
+    )
+    print(f"{'strategy':<16}{'publish ms':>12}{'read p50 ms':>14}{'read p95 ms':>14}")
+    print(
+        f"{'fan-out on read':<16}{read_publish:>12.2f}{read_p50:>14.2f}{read_p95:>14.2f}"
+    )
+    print(
+        f"{'fan-out on write':<16}{write_publish:>12.2f}"
+        f"{write_p50:>14.2f}{write_p95:>14.2f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
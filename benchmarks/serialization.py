@@ -0,0 +1,127 @@
+"""Compare the ORM + schema pipeline with the Core row pipeline for list pages.
+
+Run with ``python -m benchmarks.serialization``. Rows come from an in-memory
+SQLite table shaped like LikedPostResponseSchema, so only the Python work
+after the query is measured:
+
+* orm: build Post instances, copy them into the response schema field by
+  field, then let FastAPI validate and encode the response model;
+* rows: hand the Core rows to RowsResponse, which writes JSON with orjson.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Boolean, DateTime, create_engine, text
+
+from common.responses import RowsResponse
+from models import Post
+from services.posts.schemas import (
+    LikedPostResponseSchema,
+    LikedPostsListResponseSchema,
+)
+
+PAGE_SIZES = (100, 1_000, 10_000)
+REPEATS = 5
+
+CREATE_TABLE = """
+CREATE TABLE liked_posts (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(100),
+    content VARCHAR(1000),
+    author_id INTEGER,
+    created_at TIMESTAMP,
+    is_published BOOLEAN,
+    number_of_likes INTEGER,
+    number_of_comments INTEGER,
+    liked_at TIMESTAMP
+)
+"""
+
+
+def fetch_rows(connection, size: int):
+    query = text("SELECT * FROM liked_posts ORDER BY id LIMIT :size").columns(
+        created_at=DateTime(), is_published=Boolean(), liked_at=DateTime()
+    )
+    return connection.execute(query, {"size": size}).mappings().all()
+
+
+def orm_pipeline(rows) -> bytes:
+    response_adapter = TypeAdapter(LikedPostsListResponseSchema)
+    items = []
+    for row in rows:
+        post = Post(**{key: row[key] for key in row.keys() if key != "liked_at"})
+        items.append(
+            LikedPostResponseSchema(
+                id=post.id,
+                title=post.title,
+                content=post.content,
+                author_id=post.author_id,
+                created_at=post.created_at,
+                is_published=post.is_published,
+                number_of_likes=post.number_of_likes,
+                number_of_comments=post.number_of_comments,
+                liked_at=row["liked_at"],
+            )
+        )
+    content = LikedPostsListResponseSchema(items=items)
+    validated = response_adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def rows_pipeline(rows) -> bytes:
+    return RowsResponse({"items": rows}).body
+
+
+def measure(pipeline, rows) -> float:
+    """Return the best per-item time in microseconds over REPEATS runs."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        pipeline(rows)
+        best = min(best, time.perf_counter() - started)
+    return best / len(rows) * 1_000_000
+
+
+def main() -> None:
+    engine = create_engine("sqlite://")
+    now = datetime.now()
+    with engine.begin() as connection:
+        connection.execute(text(CREATE_TABLE))
+        connection.execute(
+            text(
+                "INSERT INTO liked_posts VALUES (:id, :title, :content, :author_id,"
+                " :created_at, :is_published, :number_of_likes,"
+                " :number_of_comments, :liked_at)"
+            ),
+            [
+                {
+                    "id": i,
+                    "title": f"Post {i}",
+                    "content": "Lorem ipsum dolor sit amet. " * 10,
+                    "author_id": i % 50,
+                    "created_at": (now - timedelta(minutes=i)).isoformat(),
+                    "is_published": True,
+                    "number_of_likes": i % 300,
+                    "number_of_comments": i % 40,
+                    "liked_at": now.isoformat(),
+                }
+                for i in range(1, max(PAGE_SIZES) + 1)
+            ],
+        )
+
+    print(f"{'items':>8} {'orm us/item':>12} {'rows us/item':>13} {'speedup':>8}")
+    with engine.connect() as connection:
+        for size in PAGE_SIZES:
+            rows = fetch_rows(connection, size)
+            assert orm_pipeline(rows[:1]) and rows_pipeline(rows[:1])
+            orm = measure(orm_pipeline, rows)
+            core = measure(rows_pipeline, rows)
+            print(f"{size:>8} {orm:>12.2f} {core:>13.2f} {orm / core:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure import and boot time of the application in fresh interpreters.
+
+Run with ``python -m benchmarks.startup [--repeat N]``. Each run starts a new
+Python process that imports `main` and then enters and exits the FastAPI
+lifespan, so module-level work, settings parsing and engine/cache setup are
+all included. No database connection is opened: the pool connects lazily.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def boot():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(boot())
+booted = time.perf_counter()
+
+from common.settings import Settings, get_settings
+settings_started = time.perf_counter()
+for _ in range(100):
+    Settings()
+parse = (time.perf_counter() - settings_started) / 100
+cached_started = time.perf_counter()
+for _ in range(100):
+    get_settings()
+cached = (time.perf_counter() - cached_started) / 100
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (booted - imported) * 1000,
+    "settings_parse_us": parse * 1_000_000,
+    "settings_cached_us": cached * 1_000_000,
+}))
+"""
+
+
+def run_probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_probe() for _ in range(args.repeat)]
+    for metric in runs[0]:
+        values = [run[metric] for run in runs]
+        print(
+            f"{metric:>20}: median {statistics.median(values):9.2f}"
+            f"  min {min(values):9.2f}  max {max(values):9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
 from .errors import EmptyQueryResult, UnauthorizedAccess
-from .settings import Settings
+from .settings import Settings, get_settings, reload_settings
@@ -0,0 +1,47 @@
+from .base import CacheBackend, NullCache
+from .memory import MemoryCache
+from .redis import RedisCache
+
+_cache: CacheBackend = NullCache()
+
+
+def get_cache() -> CacheBackend:
+    """Return the process-wide cache configured at startup."""
+    return _cache
+
+
+def configure_cache(cache: CacheBackend) -> None:
+    global _cache
+    _cache = cache
+
+
+def create_cache(settings) -> CacheBackend:
+    """Build the backend selected by `CacheSettings`."""
+    if settings.backend == "memory":
+        return MemoryCache(
+            max_entries=settings.max_entries, default_ttl=settings.ttl_seconds
+        )
+    if settings.backend == "redis":
+        return RedisCache.from_url(
+            settings.redis_url,
+            prefix=settings.key_prefix,
+            default_ttl=settings.ttl_seconds,
+        )
+    return NullCache(default_ttl=settings.ttl_seconds)
+
+
+def create_sticky_cache(settings, ttl: float) -> CacheBackend:
+    """Build the store for replica stickiness markers from `CacheSettings`.
+
+    Markers must be seen by every worker, so they live in Redis, under their
+    own prefix, whenever `redis_url` is set, and in process memory otherwise.
+    They are kept apart from the response cache so its evictions, hit counts
+    and disabled state do not affect them.
+    """
+    if settings.redis_url:
+        return RedisCache.from_url(
+            settings.redis_url,
+            prefix=f"{settings.key_prefix}sticky:",
+            default_ttl=ttl,
+        )
+    return MemoryCache(max_entries=settings.max_entries, default_ttl=ttl)
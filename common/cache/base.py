@@ -0,0 +1,75 @@
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+TagsFactory = Callable[[Any], Iterable[str]]
+
+
+class CacheBackend:
+    """Interface for response caches keyed by string with tag-based invalidation.
+
+    Values must be JSON-serialisable so every backend can store them.
+    """
+
+    def __init__(self, default_ttl: float = 60) -> None:
+        self.default_ttl = default_ttl
+        # Counted by `get` of each backend, read by the /metrics endpoint; keep
+        # unrelated lookups (such as replica stickiness) in their own backend.
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+    ) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Drop every entry stored with any of the given tags."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: TagsFactory = lambda value: (),
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for `key`, loading and storing it on a miss.
+
+        `tags` is called with the loaded value so entries can be tagged with
+        the ids they contain. Exceptions from `loader` propagate and nothing
+        is cached.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        value = await loader()
+        await self.set(key, value, tags=tags(value), ttl=ttl)
+        return value
+
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing; used when caching is disabled."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set(self, key, value, tags=(), ttl=None) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        pass
@@ -0,0 +1,79 @@
+from typing import Any, Iterable, Optional
+
+import orjson
+
+from common.cache.base import CacheBackend
+
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis, shared by every worker.
+
+    `client` is any object implementing the `redis.asyncio.Redis` commands used
+    here (get, delete, aclose and a non-transactional `pipeline` with set,
+    sadd, smembers and expire), so a local fake can stand in for a server.
+    Writes and tag invalidation each take one round trip however many tags
+    are involved.
+    """
+
+    def __init__(self, client, prefix: str = "blog:", default_ttl: float = 60) -> None:
+        super().__init__(default_ttl=default_ttl)
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCache":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError(
+                "The redis cache backend requires the `redis` package"
+            ) from e
+        return cls(redis_asyncio.from_url(url), **kwargs)
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._prefix}tag:{tag}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(raw)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+    ) -> None:
+        ttl = int(ttl if ttl is not None else self.default_ttl)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), orjson.dumps(value), ex=ttl)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, self._key(key))
+                # Tag sets only need to outlive the entries they point to.
+                pipe.expire(tag_key, ttl)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*(self._key(key) for key in keys))
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        if not tags:
+            return
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        async with self._client.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+        await self._client.delete(*tag_keys, *set().union(*members))
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,17 @@
+POSTS_LIST_TAG = "posts:list"
+TRENDING_TAG = "posts:trending"
+
+
+def post_tag(post_id: int) -> str:
+    """Tag for every cached entry that contains the post."""
+    return f"post:{post_id}"
+
+
+def post_comments_tag(post_id: int) -> str:
+    """Tag for cached comment listings of the post."""
+    return f"post:{post_id}:coms"
+
+
+def explanation_tag(post_id: int) -> str:
+    """Tag for cached explanations of the post; only edits and deletes drop it."""
+    return f"post:{post_id}:explanation"
@@ -8,3 +8,15 @@ class UnauthorizedAccess(Exception):
 
 class LikeNotFound(Exception):
     """"""
+
+
+class LikeAlreadyExists(Exception):
+    """Raised when the user has already liked the target."""
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request issues more SQL statements than its route allows."""
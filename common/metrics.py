@@ -0,0 +1,387 @@
+"""Minimal Prometheus-compatible metrics with pre-rendered label sets.
+
+Each label combination is a child object created once (at startup where
+the label values are known) with its exposition label string already
+formatted, so recording a sample is a list index and a few additions.
+Values read from other objects (pool sizes, cache hit counts) are collected
+by callbacks only when `/metrics` is scraped.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Samples = Iterable[Tuple[Sequence[str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_string(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterChild:
+    __slots__ = ("labels", "value")
+
+    def __init__(self, labels: str) -> None:
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class HistogramChild:
+    __slots__ = ("labels", "buckets", "counts", "sum", "count")
+
+    def __init__(self, labels: str, buckets: Sequence[float]) -> None:
+        self.labels = labels
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self.labels()
+
+    def _new_child(self, labels: str):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child for `values`, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._new_child(_label_string(self.labelnames, values))
+            self._children[values] = child
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self, labels: str) -> CounterChild:
+        return CounterChild(labels)
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_braces(child.labels)} {_format_value(child.value)}"
+            for child in self._children.values()
+        ]
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the counter of a metric without labels."""
+        self.labels().inc(amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self, labels: str) -> HistogramChild:
+        return HistogramChild(labels, self.buckets)
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for child in self._children.values():
+            prefix = f"{child.labels}," if child.labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{prefix}le="{_format_value(float(bound))}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_braces(child.labels)} {child.sum!r}")
+            lines.append(f"{self.name}_count{_braces(child.labels)} {child.count}")
+        return lines
+
+    def observe(self, value: float) -> None:
+        """Observe `value` on a histogram without labels."""
+        self.labels().observe(value)
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose samples are read from `collect` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Samples],
+        type: str = "gauge",
+    ) -> None:
+        # No children: samples come from `collect`.
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.type = type
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_braces(_label_string(self.labelnames, values))} "
+            f"{_format_value(value)}"
+            for values, value in self.collect()
+        ]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add `metric`, replacing one with the same name (e.g. on app restart)."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to serve a request, by route template.",
+        ("method", "route"),
+    )
+)
+HTTP_RESPONSES = REGISTRY.register(
+    Counter(
+        "http_responses_total",
+        "Responses sent, by route template and status class.",
+        ("method", "route", "status"),
+    )
+)
+DB_SESSION_SECONDS = REGISTRY.register(
+    Histogram(
+        "db_session_duration_seconds",
+        "Lifetime of DatabaseSession contexts.",
+    )
+)
+DB_POOL_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "db_pool_wait_seconds",
+        "Time to check a connection out, including waiting and connecting.",
+        ("pool",),
+    )
+)
+JWT_VERIFY_SECONDS = REGISTRY.register(
+    Histogram(
+        "auth_jwt_verify_seconds",
+        "Time to verify a JWT signature (cache misses only).",
+        buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+    )
+)
+PASSWORD_HASH_SECONDS = REGISTRY.register(
+    Histogram(
+        "auth_password_hash_seconds",
+        "Time to hash or verify a password on the hashing pool.",
+        ("operation",),
+        buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    )
+)
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+UNMATCHED_ROUTE = "unmatched"
+# Methods of unmatched requests that get their own label; any other method,
+# and any method a route does not declare, is recorded as OTHER_METHOD so
+# clients cannot create label sets.
+STANDARD_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+)
+OTHER_METHOD = "other"
+
+
+class RouteMetrics:
+    """Pre-allocated children for one method and route template."""
+
+    __slots__ = ("latency", "responses")
+
+    def __init__(self, method: str, route: str) -> None:
+        self.latency = HTTP_REQUEST_SECONDS.labels(method, route)
+        self.responses = [
+            HTTP_RESPONSES.labels(method, route, status) for status in STATUS_CLASSES
+        ]
+
+    def record(self, status: int, seconds: float) -> None:
+        self.latency.observe(seconds)
+        self.responses[min(max(status // 100, 1), 5) - 1].inc()
+
+
+# id of the route object (routes are unhashable) -> method -> RouteMetrics
+_route_metrics: Dict[int, Dict[str, RouteMetrics]] = {}
+_unmatched: Dict[str, RouteMetrics] = {}
+
+
+def preallocate_route_metrics(routes: Iterable[object]) -> None:
+    """Create the children of every route and method before serving traffic."""
+    for route in routes:
+        path = getattr(route, "path", None)
+        methods = getattr(route, "methods", None)
+        if path is None or not methods:
+            continue
+        by_method = _route_metrics.setdefault(id(route), {})
+        for method in methods:
+            if method not in by_method:
+                by_method[method] = RouteMetrics(method, path)
+
+
+def record_request(route: object, method: str, status: int, seconds: float) -> None:
+    """Record a finished request; `route` is the matched route, if any."""
+    if route is None:
+        by_method = _unmatched
+    else:
+        by_method = _route_metrics.get(id(route))
+        if by_method is None:
+            # Routes added after startup: allocate once.
+            by_method = _route_metrics[id(route)] = {}
+    metrics = by_method.get(method)
+    if metrics is None:
+        known = getattr(route, "methods", None) or STANDARD_METHODS
+        label = method if method in known else OTHER_METHOD
+        metrics = by_method.get(label)
+        if metrics is None:
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            metrics = by_method[label] = RouteMetrics(label, path)
+    metrics.record(status, seconds)
+
+
+def register_pool_metrics(engines: Dict[str, object]) -> None:
+    """Expose checked-out, overflow and size of each engine's connection pool.
+
+    Engines are read at scrape time, so pools recreated on dispose are
+    followed. Pools without these counters (NullPool, StaticPool) are skipped.
+    """
+
+    def collect(method: str) -> Callable[[], Samples]:
+        def samples() -> Samples:
+            for name, engine in engines.items():
+                read = getattr(engine.pool, method, None)
+                if read is not None:
+                    yield (name,), read()
+
+        return samples
+
+    for metric, method, help in (
+        ("db_pool_checked_out", "checkedout", "Connections currently checked out."),
+        (
+            "db_pool_overflow",
+            "overflow",
+            "Connections beyond pool_size, negative while the pool fills.",
+        ),
+        ("db_pool_size", "size", "Configured pool size."),
+    ):
+        REGISTRY.register(CallbackMetric(metric, help, ("pool",), collect(method)))
+
+
+def register_cache_metrics(caches: Dict[str, Callable[[], object]]) -> None:
+    """Expose hit and miss totals of caches; values are getters returning
+    objects with `hits` and `misses`, read at scrape time."""
+
+    def collect(attribute: str) -> Callable[[], Samples]:
+        def samples() -> Samples:
+            for name, get_cache in caches.items():
+                yield (name,), getattr(get_cache(), attribute, 0)
+
+        return samples
+
+    REGISTRY.register(
+        CallbackMetric(
+            "cache_hits_total",
+            "Cache lookups that found a value.",
+            ("cache",),
+            collect("hits"),
+            type="counter",
+        )
+    )
+    REGISTRY.register(
+        CallbackMetric(
+            "cache_misses_total",
+            "Cache lookups that found nothing.",
+            ("cache",),
+            collect("misses"),
+            type="counter",
+        )
+    )
+
+
+def register_password_pool_metrics(pool: object) -> None:
+    """Expose the queued and running hashes of a `PasswordHashingPool`."""
+    for name, attribute, help in (
+        ("auth_password_pool_queued", "queued", "Hashes waiting for a worker."),
+        ("auth_password_pool_running", "running", "Hashes running on a worker."),
+    ):
+        REGISTRY.register(
+            CallbackMetric(
+                name,
+                help,
+                (),
+                lambda attribute=attribute: [((), getattr(pool, attribute))],
+            )
+        )
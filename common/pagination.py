@@ -0,0 +1,68 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+
+from common.errors import InvalidCursor
+from common.schemas import PaginationParams
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Encode a `(created_at, id)` keyset position as an opaque string."""
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor from e
+
+
+def paginate(
+    select_query: Select,
+    pagination_params: PaginationParams,
+    created_at_column,
+    id_column,
+    descending: bool = True,
+) -> Select:
+    """Order the query by `(created_at, id)` and apply keyset or offset paging.
+
+    One extra row is requested so `split_page` can tell whether a next page exists.
+    """
+    if descending:
+        select_query = select_query.order_by(created_at_column.desc(), id_column.desc())
+    else:
+        select_query = select_query.order_by(created_at_column.asc(), id_column.asc())
+
+    if pagination_params.cursor:
+        position = tuple_(created_at_column, id_column)
+        cursor_value = tuple_(*decode_cursor(pagination_params.cursor))
+        select_query = select_query.where(
+            position < cursor_value if descending else position > cursor_value
+        )
+    else:
+        select_query = select_query.offset(
+            pagination_params.page * pagination_params.size
+        )
+
+    return select_query.limit(pagination_params.size + 1)
+
+
+def split_page(
+    items: Sequence[Any], pagination_params: PaginationParams
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row from `paginate` and build the next cursor."""
+    items = list(items)
+    if len(items) <= pagination_params.size:
+        return items, None
+    items = items[: pagination_params.size]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,61 @@
+import typing
+from typing import Any, List, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.orm import RelationshipProperty
+
+
+def schema_columns(schema: Type[BaseModel], model, **extra_columns) -> List[Any]:
+    """Select only the columns of `model` that `schema` serializes.
+
+    Fields that are not columns of `model` (e.g. `liked_at` on a like listing)
+    can be supplied as keyword arguments and are labelled with the field name.
+    """
+    table_columns = model.__table__.columns
+    columns = []
+    for name in schema.model_fields:
+        if name in extra_columns:
+            columns.append(extra_columns[name].label(name))
+        elif name in table_columns:
+            columns.append(getattr(model, name))
+    return columns
+
+
+def _nested_schema(annotation) -> Any:
+    """Return the model inside `Schema`, `Optional[Schema]` or `List[Schema]`."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for argument in typing.get_args(annotation):
+        nested = _nested_schema(argument)
+        if nested is not None:
+            return nested
+    return None
+
+
+def find_unneeded_eager_loads(query: Select, schema: Type[BaseModel]) -> List[str]:
+    """Return the loader option paths that `schema` never serializes.
+
+    A path such as ``Post.comments`` is needed only when `schema` has a
+    ``comments`` field whose type is itself a schema; deeper paths are checked
+    against that nested schema in turn. This reads the statement's private
+    option list, so it is meant for tests (tests/test_projection.py) rather
+    than the request path.
+    """
+    unneeded = []
+    for option in query._with_options:
+        for element in getattr(option, "context", ()):
+            keys = [
+                entry.key
+                for entry in element.path.natural_path
+                if isinstance(entry, RelationshipProperty)
+            ]
+            current = schema
+            for key in keys:
+                field = current.model_fields.get(key) if current else None
+                current = _nested_schema(field.annotation) if field else None
+                if current is None:
+                    unneeded.append(".".join(keys))
+                    break
+    return sorted(set(unneeded))
+
@@ -0,0 +1,66 @@
+from typing import Any, AsyncIterator
+
+import orjson
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.engine import Row, RowMapping
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from db.database import DatabaseSession
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, RowMapping):
+        return dict(value)
+    if isinstance(value, Row):
+        return value._asdict()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+NDJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+
+
+def dump_rows(content: Any) -> bytes:
+    """Serialize content that may contain Core rows straight to JSON bytes."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class RowsResponse(Response):
+    """JSON response for content built from Core rows.
+
+    Returning an instance from a route skips FastAPI's response_model
+    validation, so the query must select exactly the schema's columns
+    (see `common.projection.schema_columns`). Keep `response_model` on the
+    route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_rows(content)
+
+
+async def stream_ndjson_rows(
+    session_maker: async_sessionmaker, query: Select, yield_per: int
+) -> AsyncIterator[bytes]:
+    """Yield NDJSON chunks of at most `yield_per` rows from a server-side cursor.
+
+    The generator opens its own session: it keeps running after the request's
+    dependencies are torn down, and only one partition of rows is held in
+    memory at a time.
+    """
+    async with DatabaseSession(session_maker=session_maker) as db:
+        result = await db.session.stream(
+            query.execution_options(yield_per=yield_per)
+        )
+        async for partition in result.mappings().partitions():
+            yield b"".join(
+                orjson.dumps(row, default=_default, option=NDJSON_OPTIONS)
+                for row in partition
+            )
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    media_type = NDJSON_MEDIA_TYPE
@@ -1 +1,2 @@
-from .pagination import PaginationParams
+from .pagination import PaginationParams, MAX_PAGE_SIZE
+from .likes import LikeBatchSchema, LikeBatchResponseSchema
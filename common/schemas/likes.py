@@ -0,0 +1,24 @@
+from typing import Dict, List
+
+from sqlmodel import SQLModel, Field
+
+from .pagination import MAX_PAGE_SIZE
+
+
+class LikeBatchSchema(SQLModel):
+    like: List[int] = Field(default_factory=list, max_length=MAX_PAGE_SIZE)
+    unlike: List[int] = Field(default_factory=list, max_length=MAX_PAGE_SIZE)
+
+
+class LikeBatchResponseSchema(SQLModel):
+    # Ids whose like state changed; with the like buffer enabled, every
+    # requested id, since the batch is only written on the next flush.
+    liked: List[int] = []
+    unliked: List[int] = []
+
+    @classmethod
+    def from_deltas(cls, deltas: Dict[int, int]) -> "LikeBatchResponseSchema":
+        return cls(
+            liked=sorted(target for target, delta in deltas.items() if delta > 0),
+            unliked=sorted(target for target, delta in deltas.items() if delta < 0),
+        )
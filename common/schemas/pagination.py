@@ -1,6 +1,14 @@
+from typing import Optional
+
 from sqlmodel import SQLModel, Field
 
+MAX_PAGE_SIZE = 500
+
 
 class PaginationParams(SQLModel):
     page: int = Field(default=0, ge=0)
-    size: int = Field(default=100, gt=1, lt=100000)
+    size: int = Field(default=100, gt=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque cursor from `next_cursor`; takes precedence over `page`",
+    )
@@ -1,10 +1,27 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel, SecretStr, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy.engine import URL
 
 
+class ReplicaSettings(BaseModel):
+    # Full SQLAlchemy URL of a read replica, e.g. a streaming standby; unset
+    # sends every query to the primary.
+    url: SecretStr | None = Field(default=None, exclude=True, repr=False)
+    # Send GET/HEAD requests using AsyncSessionDep to the replica; with this
+    # off only routes using ReadSessionDep read from it.
+    route_reads_by_method: bool = True
+    # After a client writes, its reads stay on the primary this long. The
+    # marker is kept in Redis when IS_CACHE__REDIS_URL is set, so several
+    # workers share it, and in process memory otherwise.
+    sticky_seconds: float = Field(default=5.0, ge=0)
+    max_lag_seconds: float = Field(default=5.0, gt=0)
+    lag_check_interval_seconds: float = Field(default=5.0, gt=0)
+
+
 class DatabaseSettings(BaseModel):
     host: str
     port: int
@@ -13,6 +30,17 @@ class DatabaseSettings(BaseModel):
     password: SecretStr | None = Field(default=None, exclude=True, repr=False)
     engine: str
     debug: bool
+    pool_size: int = Field(default=10, ge=1)
+    max_overflow: int = Field(default=20, ge=0)
+    pool_timeout: float = Field(default=30.0, gt=0)
+    pool_recycle: int = Field(default=1800, ge=-1)
+    pool_pre_ping: bool = True
+    statement_cache_size: int = Field(default=100, ge=0)
+    # Statements at least this slow are logged with their route; 0 disables.
+    slow_query_ms: float = Field(default=200.0, ge=0)
+    # What to do when a route exceeds its `query_budget`; "raise" is for tests.
+    query_budget_action: Literal["off", "warn", "raise"] = "warn"
+    replica: ReplicaSettings = ReplicaSettings()
 
     def get_url(self, password: SecretStr | None = None) -> URL:
         password = password or self.password
@@ -29,6 +57,26 @@ class DatabaseSettings(BaseModel):
             database=self.db,
         )
 
+    def get_engine_args(self, drivername: str | None = None) -> dict:
+        """Return keyword arguments for `create_async_engine`.
+
+        `drivername` selects driver-specific options for another URL, such
+        as the replica's; it defaults to the primary's engine.
+        """
+        engine_args = dict(
+            echo=self.debug,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+        )
+        if "asyncpg" in (drivername or self.engine):
+            engine_args["connect_args"] = dict(
+                statement_cache_size=self.statement_cache_size
+            )
+        return engine_args
+
 
 class DefaultSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -49,8 +97,87 @@ class AuthSettings(BaseModel):
     reset_password_token_secret: SecretStr
     verification_token_secret: SecretStr
     jwt_strategy_token_secret: SecretStr
+    # 0 disables the per-process cache of users resolved from tokens.
+    user_cache_ttl_seconds: float = Field(default=30.0, ge=0)
+    user_cache_max_entries: int = Field(default=10000, gt=0)
+    # Trust is_active / is_superuser claims in the token instead of loading
+    # the user; changes take effect only when a new token is issued.
+    stateless_tokens: bool = False
+    # Verified tokens whose claims are kept until they expire; 0 disables.
+    token_cache_max_entries: int = Field(default=10000, ge=0)
+    # Password hashing runs on this pool; at most `workers` hashes at a time.
+    password_pool: Literal["thread", "process"] = "thread"
+    password_pool_workers: int = Field(default=4, ge=1)
+
+
+class LikeSettings(BaseModel):
+    counter_shards: int = Field(default=0, ge=0)
+    shard_fold_interval_seconds: float = Field(default=5.0, gt=0)
+    buffer_enabled: bool = False
+    buffer_flush_interval_ms: int = Field(default=500, gt=0)
+    buffer_max_pending: int = Field(default=10000, gt=0)
+
+
+class CommentSettings(BaseModel):
+    # 0 disables the periodic reconciliation of comment and reply counters.
+    counter_reconcile_interval_seconds: float = Field(default=3600.0, ge=0)
+
+
+class TrendingSettings(BaseModel):
+    top_k: int = Field(default=100, ge=1, le=10000)
+    # 0 disables the periodic rebuild of the trending_posts table.
+    refresh_interval_seconds: float = Field(default=60.0, ge=0)
+
+
+class FeedSettings(BaseModel):
+    # Authors with more followers are merged into feeds on read instead of
+    # being pushed into every follower's timeline; 0 disables fan-out on write.
+    fanout_max_followers: int = Field(default=1000, ge=0)
+    # Recent posts copied into the timeline when following a user.
+    follow_backfill_posts: int = Field(default=50, ge=0)
+
+
+class ExplainerSettings(BaseModel):
+    base_url: str = "http://localhost:11434"
+    model: str = "mistral"
+    timeout_seconds: float = Field(default=300.0, gt=0)
+    max_connections: int = Field(default=10, ge=1)
+    max_concurrency: int = Field(default=4, ge=1)
+    cache_ttl_seconds: int = Field(default=86400, gt=0)
+    # Background explanation jobs; 0 workers leaves them to a separate process.
+    job_workers: int = Field(default=2, ge=0)
+    job_max_attempts: int = Field(default=5, ge=1)
+    job_backoff_seconds: float = Field(default=5.0, gt=0)
+    job_poll_interval_seconds: float = Field(default=1.0, gt=0)
+    job_stale_after_seconds: float = Field(default=900.0, gt=0)
+
+
+class CacheSettings(BaseModel):
+    backend: Literal["memory", "redis", "none"] = "memory"
+    ttl_seconds: int = Field(default=60, gt=0)
+    max_entries: int = Field(default=10000, gt=0)
+    redis_url: str | None = None
+    key_prefix: str = "blog:"
 
 
 class Settings(DatabaseConnectionSettings):
     debug: bool
     auth: AuthSettings
+    likes: LikeSettings = LikeSettings()
+    comments: CommentSettings = CommentSettings()
+    feed: FeedSettings = FeedSettings()
+    trending: TrendingSettings = TrendingSettings()
+    cache: CacheSettings = CacheSettings()
+    explainer: ExplainerSettings = ExplainerSettings()
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment on first use."""
+    return Settings()
+
+
+def reload_settings() -> Settings:
+    """Re-read the environment, e.g. after a test changes variables."""
+    get_settings.cache_clear()
+    return get_settings()
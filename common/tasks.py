@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a coroutine function on a fixed interval in the background."""
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        callback: Callable[[], Awaitable[None]],
+        run_on_stop: bool = False,
+    ) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.run_on_stop = run_on_stop
+        self._callback = callback
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> None:
+        """Run the callback, logging instead of propagating failures."""
+        try:
+            await self._callback()
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.run_once()
+
+    def start(self) -> None:
+        """Schedule the task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self, run_final: Optional[bool] = None) -> None:
+        """Cancel the task, optionally running the callback one last time.
+
+        `run_final` defaults to the task's `run_on_stop` flag.
+        """
+        if run_final is None:
+            run_final = self.run_on_stop
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if run_final:
+            await self.run_once()
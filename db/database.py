@@ -1,15 +1,52 @@
+import hashlib
+import logging
+import time
 from types import TracebackType
 from typing import Optional, Dict, Self, AsyncIterator
 
-from sqlalchemy.engine import URL
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     async_sessionmaker,
     AsyncSession,
     create_async_engine,
 )
+from sqlalchemy.pool import QueuePool
 
-from common.settings import Settings
+from common.cache import CacheBackend, NullCache, create_sticky_cache
+from common.metrics import DB_POOL_WAIT_SECONDS, DB_SESSION_SECONDS
+from common.settings import Settings, get_settings
+from db.instrumentation import TimedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Seconds the standby is behind, or 0 when it has replayed everything it
+# received (an idle primary would otherwise look like growing lag).
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """)
+
+
+def _create_engine(
+    url: str | URL, engine_args: Dict, pool_name: str
+) -> AsyncEngine:
+    """Create an engine whose queue pool reports checkout waits as `pool_name`."""
+    url = make_url(url)
+    pool_class = url.get_dialect(_is_async=True).get_pool_class(url)
+    if "poolclass" not in engine_args and issubclass(pool_class, QueuePool):
+        engine_args = {**engine_args, "poolclass": TimedQueuePool}
+    engine = create_async_engine(url, **engine_args)
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.wait_metric = DB_POOL_WAIT_SECONDS.labels(pool_name)
+    return engine
 
 
 class Database:
@@ -19,10 +56,12 @@ class Database:
         engine_args: Optional[Dict] = None,
         custom_engine: Optional[AsyncEngine] = None,
         settings: Optional[Settings] = None,
+        replica_url: Optional[str | URL] = None,
+        sticky_cache: Optional[CacheBackend] = None,
     ):
         engine_args = engine_args or {}
 
-        self._settings = settings or Settings()
+        self._settings = settings or get_settings()
 
         if custom_engine:
             self._engine = custom_engine
@@ -30,26 +69,109 @@ class Database:
             if not db_url:
                 db_url = self._settings.database.get_url()
             if not engine_args:
-                engine_args = dict(echo=self._settings.database.debug)
-            self._engine = create_async_engine(db_url, **engine_args)  # type: ignore
+                engine_args = self._settings.database.get_engine_args()
+            self._engine = _create_engine(
+                db_url, engine_args, "primary"  # type: ignore
+            )
 
+        instrument_engine(self._engine, self._settings.database.slow_query_ms)
         self._session_maker = async_sessionmaker(
             self._engine, class_=AsyncSession, expire_on_commit=False
         )
 
+        self.replica_settings = self._settings.database.replica
+        if replica_url is None and self.replica_settings.url is not None:
+            replica_url = self.replica_settings.url.get_secret_value()
+        self._replica_engine: Optional[AsyncEngine] = None
+        self._replica_session_maker: Optional[async_sessionmaker] = None
+        if replica_url:
+            replica_url = make_url(replica_url)
+            self._replica_engine = _create_engine(
+                replica_url,
+                self._settings.database.get_engine_args(replica_url.drivername),
+                "replica",
+            )
+            instrument_engine(
+                self._replica_engine, self._settings.database.slow_query_ms
+            )
+            self._replica_session_maker = async_sessionmaker(
+                self._replica_engine, class_=AsyncSession, expire_on_commit=False
+            )
+        # Until the first lag check the replica is trusted if configured.
+        self.replica_healthy = self._replica_engine is not None
+        # Clients that wrote recently; see `mark_primary_sticky`.
+        if sticky_cache is None:
+            sticky_cache = (
+                create_sticky_cache(
+                    self._settings.cache, self.replica_settings.sticky_seconds
+                )
+                if self._replica_engine is not None
+                else NullCache()
+            )
+        self.sticky_cache = sticky_cache
+
     @property
     def engine(self) -> AsyncEngine:
         """Return an `AsyncEngine` object."""
         return self._engine
 
+    @property
+    def engines(self) -> Dict[str, AsyncEngine]:
+        """Return the primary engine and the replica's, if configured, by name."""
+        engines = {"primary": self._engine}
+        if self._replica_engine is not None:
+            engines["replica"] = self._replica_engine
+        return engines
+
     @property
     def session_maker(self) -> async_sessionmaker:
         """Return an `async_sessionmaker` object."""
         return self._session_maker
 
+    @property
+    def replica_session_maker(self) -> Optional[async_sessionmaker]:
+        """Return the replica's `async_sessionmaker`, or None without a replica."""
+        return self._replica_session_maker
+
+    @property
+    def read_session_maker(self) -> async_sessionmaker:
+        """Return the replica's session maker while it is healthy, else the primary's."""
+        if self._replica_session_maker is not None and self.replica_healthy:
+            return self._replica_session_maker
+        return self._session_maker
+
+    async def check_replica(self) -> Optional[float]:
+        """Measure replica lag and mark the replica unhealthy when it is too far behind.
+
+        Connection errors count as unhealthy, so reads fall back to the
+        primary until a later check succeeds. Returns the lag in seconds.
+        """
+        if self._replica_engine is None:
+            return None
+        lag: Optional[float] = None
+        try:
+            async with self._replica_engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    lag = await connection.scalar(REPLICA_LAG_QUERY)
+                else:
+                    await connection.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as e:
+            logger.warning("Replica lag check failed: %s", e)
+        healthy = lag is not None and lag <= self.replica_settings.max_lag_seconds
+        if healthy != self.replica_healthy:
+            logger.warning(
+                "Replica %s (lag %s s)", "recovered" if healthy else "disabled", lag
+            )
+        self.replica_healthy = healthy
+        return None if lag is None else float(lag)
+
     async def dispose(self, close: bool = True) -> None:
-        """Dispose of the connection pool."""
+        """Dispose of the connection pools and close the sticky marker store."""
         await self.engine.dispose(close=close)
+        if self._replica_engine is not None:
+            await self._replica_engine.dispose(close=close)
+        await self.sticky_cache.close()
 
 
 class DatabaseSession:
@@ -57,16 +179,18 @@ class DatabaseSession:
 
     def __init__(
         self,
+        session_maker: async_sessionmaker,
         commit_on_exit: bool = False,
-        session_maker: Optional[async_sessionmaker] = None,
     ) -> None:
-        """Database session."""
+        """Database session on `session_maker`, usually the app's `Database`.
+
+        There is no implicit default: a fallback `Database` would open a
+        second engine that nothing disposes.
+        """
         self.commit_on_exit = commit_on_exit
-        if session_maker is None:
-            self._session_maker = Database().session_maker
-        else:
-            self._session_maker = session_maker
+        self._session_maker = session_maker
         self._session = None
+        self._started_at = 0.0
 
     @property
     def session(self) -> AsyncSession:
@@ -76,6 +200,7 @@ class DatabaseSession:
     async def __aenter__(self) -> Self:
         """Database session context enter."""
         self._session = self._session_maker()  # type: ignore
+        self._started_at = time.perf_counter()
         return self
 
     async def __aexit__(
@@ -92,8 +217,69 @@ class DatabaseSession:
                 await self.session.commit()  # type: ignore
         finally:
             await self.session.close()
+            DB_SESSION_SECONDS.observe(time.perf_counter() - self._started_at)
+
+
+def get_database(request: Request) -> Database:
+    """Return the process-wide `Database` created in the application lifespan."""
+    return request.app.state.database
+
+
+def _sticky_key(request: Request) -> str:
+    """Identify the client by its credentials, or its address when anonymous."""
+    identity = request.headers.get("authorization") or (
+        request.client.host if request.client else ""
+    )
+    return "db:sticky:" + hashlib.sha256(identity.encode()).hexdigest()
+
+
+async def mark_primary_sticky(request: Request, database: Database) -> None:
+    """Keep the client's reads on the primary for `sticky_seconds`."""
+    if (
+        database.replica_session_maker is not None
+        and database.replica_settings.sticky_seconds
+    ):
+        await database.sticky_cache.set(
+            _sticky_key(request), True, ttl=database.replica_settings.sticky_seconds
+        )
+
+
+async def get_read_session_maker(
+    request: Request, database: Database
+) -> async_sessionmaker:
+    """Pick the replica unless it lags or the client wrote recently."""
+    if database.replica_session_maker is None:
+        return database.session_maker
+    if await database.sticky_cache.get(_sticky_key(request)):
+        return database.session_maker
+    return database.read_session_maker
+
+
+async def get_async_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Yield a session on the primary, or on the replica for safe methods.
+
+    Requests that may write mark the client sticky to the primary both
+    before and after the route runs, so its next reads see the write.
+    """
+    database = get_database(request)
+    if (
+        request.method in SAFE_METHODS
+        and database.replica_settings.route_reads_by_method
+    ):
+        session_maker = await get_read_session_maker(request, database)
+        async with DatabaseSession(session_maker=session_maker) as db:
+            yield db.session
+        return
+
+    await mark_primary_sticky(request, database)
+    async with DatabaseSession(session_maker=database.session_maker) as db:
+        yield db.session
+    await mark_primary_sticky(request, database)
 
 
-async def get_async_session() -> AsyncIterator[AsyncSession]:
-    async with DatabaseSession() as db:
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Yield a read-only session on the replica whenever it is safe to use."""
+    database = get_database(request)
+    session_maker = await get_read_session_maker(request, database)
+    async with DatabaseSession(session_maker=session_maker) as db:
         yield db.session
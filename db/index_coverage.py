@@ -0,0 +1,145 @@
+"""Check that every column filtered in a query builder is backed by an index.
+
+Run with ``python -m db.index_coverage``; the exit code is non-zero when a
+``.where(...)`` clause in ``services/*/query_builder`` compares a model column
+that is not the leading column of the primary key or of any declared index.
+Later columns of a composite index count as covered when the same clause also
+filters on the index's leading column.
+"""
+
+import ast
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+
+from sqlalchemy import Table
+
+import models
+
+ROOT = Path(__file__).resolve().parent.parent
+QUERY_BUILDERS = "services/*/query_builder/*.py"
+
+FILTER_METHODS = {"where", "filter", "having"}
+COMPARATOR_METHODS = {"in_", "is_", "ilike", "like", "startswith", "between"}
+
+# (table, column) pairs that are intentionally filtered without an index.
+ALLOWED_UNINDEXED: Set[Tuple[str, str]] = {
+    # Counter reconciliation scans whole tables on purpose.
+    ("posts", "number_of_comments"),
+    ("comments", "number_of_replies"),
+    # Fan-out threshold, checked on rows already joined by primary key.
+    ("users", "number_of_followers"),
+}
+
+
+def get_model_tables() -> Dict[str, Table]:
+    """Map model class names exported from `models` to their tables."""
+    return {
+        name: obj.__table__
+        for name, obj in vars(models).items()
+        if isinstance(getattr(obj, "__table__", None), Table)
+    }
+
+
+def get_indexed_columns(table: Table) -> Set[str]:
+    """Return the columns that lead the primary key or any index."""
+    indexed = set()
+    if table.primary_key.columns:
+        indexed.add(list(table.primary_key.columns)[0].name)
+    for index in table.indexes:
+        expressions = list(index.expressions)
+        if expressions and hasattr(expressions[0], "name"):
+            indexed.add(expressions[0].name)
+    for column in table.columns:
+        if column.index or column.unique:
+            indexed.add(column.name)
+    return indexed
+
+
+def get_composite_indexes(table: Table) -> List[List[str]]:
+    """Return the column names of every multi-column index, in index order."""
+    composites = []
+    for index in table.indexes:
+        names = [getattr(expression, "name", None) for expression in index.expressions]
+        if len(names) > 1 and all(names):
+            composites.append(names)
+    return composites
+
+
+def iter_filter_calls(
+    tree: ast.AST, model_names: Set[str]
+) -> Iterator[List[Tuple[str, str, int]]]:
+    """Yield the `(model, column, lineno)` comparisons of each filter call."""
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in FILTER_METHODS
+        ):
+            continue
+        yield list(iter_compared_columns(node, model_names))
+
+
+def iter_compared_columns(
+    node: ast.Call, model_names: Set[str]
+) -> Iterator[Tuple[str, str, int]]:
+    """Yield `(model, column, lineno)` for every column compared in one call."""
+    for argument in node.args:
+        for inner in ast.walk(argument):
+            operands: List[ast.AST] = []
+            if isinstance(inner, ast.Compare):
+                operands = [inner.left, *inner.comparators]
+            elif (
+                isinstance(inner, ast.Call)
+                and isinstance(inner.func, ast.Attribute)
+                and inner.func.attr in COMPARATOR_METHODS
+            ):
+                operands = [inner.func.value]
+            for operand in operands:
+                if (
+                    isinstance(operand, ast.Attribute)
+                    and isinstance(operand.value, ast.Name)
+                    and operand.value.id in model_names
+                ):
+                    yield operand.value.id, operand.attr, operand.lineno
+
+
+def find_uncovered_filters() -> List[str]:
+    """Return a description of each filtered column without a covering index."""
+    tables = get_model_tables()
+    indexed = {name: get_indexed_columns(table) for name, table in tables.items()}
+    composites = {
+        name: get_composite_indexes(table) for name, table in tables.items()
+    }
+    problems = []
+    for path in sorted(ROOT.glob(QUERY_BUILDERS)):
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        for compared in iter_filter_calls(tree, set(tables)):
+            filtered = {(model, column) for model, column, _ in compared}
+            for model, column, lineno in compared:
+                table = tables[model]
+                if column not in table.columns:
+                    continue
+                if (table.name, column) in ALLOWED_UNINDEXED:
+                    continue
+                if column in indexed[model] or any(
+                    column in names and (model, names[0]) in filtered
+                    for names in composites[model]
+                ):
+                    continue
+                problems.append(
+                    f"{path.relative_to(ROOT)}:{lineno}: "
+                    f"{table.name}.{column} is filtered without a covering index"
+                )
+    return problems
+
+
+def main() -> int:
+    problems = find_uncovered_filters()
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.errors import QueryBudgetExceeded
+from common.metrics import HistogramChild, record_request
+from common.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements, rows and database time accumulated by one request."""
+
+    def __init__(self, scope: Optional[Scope] = None) -> None:
+        self.scope = scope
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.budget: Optional[int] = None
+        self.status = 500
+        self.started_at = time.perf_counter()
+
+    @property
+    def route(self) -> str:
+        """Method and route template, e.g. ``GET /posts/{post_id}``."""
+        if self.scope is None:
+            return "background"
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}"
+
+    def server_timing(self) -> str:
+        return (
+            f"db;dur={self.db_seconds * 1000:.1f};"
+            f'desc="{self.statements} statements, {self.rows} rows"'
+        )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Return the stats of the request being handled, if any."""
+    return _current_stats.get()
+
+
+def _row_count(cursor) -> int:
+    """Rows the statement returned or changed, from the DBAPI ``rowcount``.
+
+    asyncpg reports it for SELECTs too (from the command status); drivers
+    that report -1 for SELECTs, such as aiosqlite, only count written rows.
+    """
+    return max(cursor.rowcount, 0)
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_ms: float) -> None:
+    """Count every statement on `engine` and log those slower than `slow_query_ms`.
+
+    SQLAlchemy runs the async driver inside a greenlet that shares the
+    calling task's context, so the handlers see the request's `QueryStats`.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.rows += _row_count(cursor)
+            stats.db_seconds += elapsed
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s",
+                elapsed * 1000,
+                stats.route if stats is not None else "background",
+                statement,
+            )
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that observes how long checkouts wait for a connection.
+
+    `wait_metric` is assigned after the engine is created and carried over
+    when the engine recreates its pool on dispose.
+    """
+
+    wait_metric: Optional[HistogramChild] = None
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_metric is not None:
+                self.wait_metric.observe(time.perf_counter() - started_at)
+
+    def recreate(self) -> "TimedQueuePool":
+        pool = super().recreate()
+        pool.wait_metric = self.wait_metric
+        return pool
+
+
+class QueryStatsMiddleware:
+    """Collect `QueryStats` per request and report them in ``Server-Timing``.
+
+    The request's latency and status class are recorded in the HTTP metrics
+    of its route template once the response has been sent.
+
+    Statements issued after the response headers are sent (by a streaming
+    body) are not in the header. When the route declared a budget with
+    `query_budget`, exceeding it is logged or, with `budget_action` (default:
+    the ``query_budget_action`` setting) set to ``"raise"``, raised as
+    `QueryBudgetExceeded` so tests fail on N+1 queries.
+    """
+
+    def __init__(self, app: ASGIApp, budget_action: Optional[str] = None) -> None:
+        self.app = app
+        self.budget_action = budget_action
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats.status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            record_request(
+                scope.get("route"),
+                scope["method"],
+                stats.status,
+                time.perf_counter() - stats.started_at,
+            )
+        self.check_budget(stats)
+
+    def check_budget(self, stats: QueryStats) -> None:
+        if stats.budget is None or stats.statements <= stats.budget:
+            return
+        message = (
+            f"{stats.route} issued {stats.statements} SQL statements, "
+            f"budget is {stats.budget}"
+        )
+        action = self.budget_action or get_settings().database.query_budget_action
+        if action == "raise":
+            raise QueryBudgetExceeded(message)
+        if action == "warn":
+            logger.warning(message)
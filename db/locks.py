@@ -0,0 +1,16 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def try_advisory_xact_lock(session: AsyncSession, name: str) -> bool:
+    """Take the Postgres advisory lock `name` until the transaction ends.
+
+    Returns False without waiting when another transaction holds it, so
+    periodic jobs started by every worker process run in only one of them.
+    Other databases have no advisory locks and always get it.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return True
+    return await session.scalar(
+        select(func.pg_try_advisory_xact_lock(func.hashtext(name)))
+    )
@@ -1,12 +1,18 @@
 from typing import AsyncGenerator
 
-from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-
-from dependecies.session import AsyncSessionDep
+from dependecies.session import AsyncSessionDep, ReadSessionDep
 from models import User
+from services.users.modules.user_cache import CachedUserDatabase
 
 
 async def get_user_db(
     session: AsyncSessionDep,
-) -> AsyncGenerator[SQLAlchemyUserDatabase[int, User], None]:
-    yield SQLAlchemyUserDatabase(session, User)
+) -> AsyncGenerator[CachedUserDatabase, None]:
+    yield CachedUserDatabase(session, User)
+
+
+async def get_read_user_db(
+    session: ReadSessionDep,
+) -> AsyncGenerator[CachedUserDatabase, None]:
+    """User database on the route's ReadSessionDep session, for read-only routes."""
+    yield CachedUserDatabase(session, User)
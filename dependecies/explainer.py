@@ -0,0 +1,13 @@
+from typing import Annotated
+
+from fastapi import Depends, Request
+
+from services.posts.modules.explainer import PostExplainer
+
+
+def get_post_explainer(request: Request) -> PostExplainer:
+    """Return the explainer created in the application lifespan."""
+    return request.app.state.post_explainer
+
+
+PostExplainerDep = Annotated[PostExplainer, Depends(get_post_explainer)]
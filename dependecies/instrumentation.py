@@ -0,0 +1,16 @@
+from db.instrumentation import get_query_stats
+
+
+def query_budget(max_statements: int):
+    """Declare how many SQL statements a route may issue.
+
+    Use as ``dependencies=[Depends(query_budget(3))]``; the check runs in
+    `QueryStatsMiddleware` once the response is complete.
+    """
+
+    async def declare_budget() -> None:
+        stats = get_query_stats()
+        if stats is not None:
+            stats.budget = max_statements
+
+    return declare_budget
@@ -0,0 +1,13 @@
+from typing import Annotated, Optional
+
+from fastapi import Depends, Request
+
+from services.posts.modules.like_buffer import LikeBuffer
+
+
+def get_like_buffer(request: Request) -> Optional[LikeBuffer]:
+    """Return the write-behind like buffer, or None when it is disabled."""
+    return getattr(request.app.state, "like_buffer", None)
+
+
+LikeBufferDep = Annotated[Optional[LikeBuffer], Depends(get_like_buffer)]
@@ -3,6 +3,9 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.database import get_async_session
+from db.database import get_async_session, get_read_session
 
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+# For routes that only read: served by the replica unless it lags or the
+# client has just written, whatever the request method.
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
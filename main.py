@@ -2,26 +2,164 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from common.settings import Settings
-from db.database import Database
+from common.cache import MemoryCache, configure_cache, create_cache, get_cache
+from common.metrics import (
+    preallocate_route_metrics,
+    register_cache_metrics,
+    register_password_pool_metrics,
+    register_pool_metrics,
+)
+from common.settings import get_settings
+from common.tasks import PeriodicTask
+from db.database import Database, DatabaseSession
+from db.instrumentation import QueryStatsMiddleware
 from services.users.routes.user import users_router
 from services.posts.routes.posts import post_router
+from services.posts.query_builder import PostLikesQueryBuilder, TrendingQueryBuilder
+from services.posts.modules.like_buffer import LikeBuffer
+from services.posts.modules.explainer import PostExplainer, create_explainer_client
+from services.posts.modules.explanation_worker import ExplanationWorker
 from services.comments.routes import com_router
+from services.exports.routes import export_router
+from services.feed.routes import feed_router
+from services.feed.query_builder import TimelineQueryBuilder
+from services.monitoring.routes import monitoring_router
+from services.users.modules.manager import get_jwt_strategy
+from services.users.modules.user_cache import configure_user_cache, get_user_cache
+from services.users.modules.password_pool import (
+    PasswordHashingPool,
+    configure_password_pool,
+)
+from services.comments.query_builder import CommentQueryBuilder
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    database = Database(settings=Settings())
+    settings = get_settings()
+    database = Database(settings=settings)
+    app.state.database = database
+    cache = create_cache(settings.cache)
+    configure_cache(cache)
+    if settings.auth.user_cache_ttl_seconds:
+        configure_user_cache(
+            MemoryCache(
+                max_entries=settings.auth.user_cache_max_entries,
+                default_ttl=settings.auth.user_cache_ttl_seconds,
+            )
+        )
+    password_pool = PasswordHashingPool(
+        workers=settings.auth.password_pool_workers, kind=settings.auth.password_pool
+    )
+    configure_password_pool(password_pool)
+    preallocate_route_metrics(app.routes)
+    register_pool_metrics(database.engines)
+    register_cache_metrics(
+        {"response": get_cache, "user": get_user_cache, "jwt": get_jwt_strategy}
+    )
+    register_password_pool_metrics(password_pool)
+    explainer_client = create_explainer_client(settings.explainer)
+    post_explainer = PostExplainer(explainer_client, settings.explainer)
+    app.state.post_explainer = post_explainer
+    explanation_worker = ExplanationWorker(
+        database.session_maker, post_explainer, settings.explainer
+    )
+    tasks = []
+
+    PostLikesQueryBuilder.counter_shards = settings.likes.counter_shards
+    TimelineQueryBuilder.fanout_max_followers = settings.feed.fanout_max_followers
+    TimelineQueryBuilder.follow_backfill_posts = settings.feed.follow_backfill_posts
+    TrendingQueryBuilder.top_k = settings.trending.top_k
+    if settings.likes.counter_shards:
+
+        async def fold_like_counter_shards():
+            async with DatabaseSession(session_maker=database.session_maker) as db:
+                await PostLikesQueryBuilder.fold_like_counter_shards(db.session)
+
+        tasks.append(
+            PeriodicTask(
+                "fold-like-counter-shards",
+                settings.likes.shard_fold_interval_seconds,
+                fold_like_counter_shards,
+                run_on_stop=True,
+            )
+        )
+
+    if settings.likes.buffer_enabled:
+        like_buffer = LikeBuffer(
+            database.session_maker, max_pending=settings.likes.buffer_max_pending
+        )
+        app.state.like_buffer = like_buffer
+        tasks.append(
+            PeriodicTask(
+                "flush-like-buffer",
+                settings.likes.buffer_flush_interval_ms / 1000,
+                like_buffer.flush,
+                run_on_stop=True,
+            )
+        )
+
+    if settings.comments.counter_reconcile_interval_seconds:
+
+        async def reconcile_comment_counters():
+            async with DatabaseSession(session_maker=database.session_maker) as db:
+                await CommentQueryBuilder.reconcile_comment_counters(db.session)
+
+        tasks.append(
+            PeriodicTask(
+                "reconcile-comment-counters",
+                settings.comments.counter_reconcile_interval_seconds,
+                reconcile_comment_counters,
+            )
+        )
+
+    if database.replica_session_maker is not None:
+        await database.check_replica()
+        tasks.append(
+            PeriodicTask(
+                "check-replica-lag",
+                settings.database.replica.lag_check_interval_seconds,
+                database.check_replica,
+            )
+        )
+
+    if settings.trending.refresh_interval_seconds:
+
+        async def refresh_trending_posts():
+            async with DatabaseSession(session_maker=database.session_maker) as db:
+                await TrendingQueryBuilder.refresh_trending_posts(db.session)
+
+        tasks.append(
+            PeriodicTask(
+                "refresh-trending-posts",
+                settings.trending.refresh_interval_seconds,
+                refresh_trending_posts,
+            )
+        )
+
+    for task in tasks:
+        task.start()
+    explanation_worker.start()
     yield
-    await database.dispose(close=False)
+    await explanation_worker.stop()
+    for task in tasks:
+        await task.stop()
+    await cache.close()
+    password_pool.shutdown()
+    await explainer_client.aclose()
+    configure_password_pool(None)
+    await database.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware)
 
 
 app.include_router(users_router)
 app.include_router(post_router, tags=["posts"])
 app.include_router(com_router, tags=["coms"])
+app.include_router(export_router, tags=["export"])
+app.include_router(feed_router, tags=["feed"])
+app.include_router(monitoring_router, tags=["monitoring"])
 '''
     ⣇⣿⠘⣿⣿⣿⡿⡿⣟⣟⢟⢟⢝⠵⡝⣿⡿⢂⣼⣿⣷⣌⠩⡫⡻⣝⠹⢿⣿⣷
     ⡆⣿⣆⠱⣝⡵⣝⢅⠙⣿⢕⢕⢕⢕⢝⣥⢒⠅⣿⣿⣿⡿⣳⣌⠪⡪⣡⢑⢝⣇
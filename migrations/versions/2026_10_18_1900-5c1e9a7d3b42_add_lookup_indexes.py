@@ -0,0 +1,68 @@
+"""add lookup indexes
+
+Revision ID: 5c1e9a7d3b42
+Revises: 38a93d52fec1
+Create Date: 2026-10-18 19:00:12.431807
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e9a7d3b42"
+down_revision: Union[str, Sequence[str], None] = "38a93d52fec1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = (
+    ("ix_posts_author_id_created_at", "posts", ["author_id", "created_at", "id"], None),
+    (
+        "ix_posts_is_published_created_at",
+        "posts",
+        ["is_published", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_comments_post_id_created_at",
+        "comments",
+        ["post_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_comments_author_id_created_at",
+        "comments",
+        ["author_id", "created_at", "id"],
+        None,
+    ),
+    ("ix_comments_parent_id", "comments", ["parent_id"], "parent_id IS NOT NULL"),
+    ("ix_post_likes_post_id", "post_likes", ["post_id"], None),
+    ("ix_comment_likes_comment_id", "comment_likes", ["comment_id"], None),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,69 @@
+"""add post search
+
+Revision ID: a81f4c2e6d90
+Revises: 5c1e9a7d3b42
+Create Date: 2026-10-18 19:30:41.208315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from models.post import SEARCH_VECTOR_EXPRESSION
+
+# revision identifiers, used by Alembic.
+revision: str = "a81f4c2e6d90"
+down_revision: Union[str, Sequence[str], None] = "5c1e9a7d3b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_search_vector",
+            "posts",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for column in ("title", "content"):
+            op.create_index(
+                f"ix_posts_{column}_trgm",
+                "posts",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in (
+            "ix_posts_content_trgm",
+            "ix_posts_title_trgm",
+            "ix_posts_search_vector",
+        ):
+            op.drop_index(
+                name, table_name="posts", postgresql_concurrently=True, if_exists=True
+            )
+    op.drop_column("posts", "search_vector")
@@ -0,0 +1,39 @@
+"""add post like counter shards
+
+Revision ID: d4b7e1a90c53
+Revises: a81f4c2e6d90
+Create Date: 2026-10-18 20:00:27.915264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b7e1a90c53"
+down_revision: Union[str, Sequence[str], None] = "a81f4c2e6d90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "post_like_counter_shards",
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["post_id"],
+            ["posts.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("post_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("post_like_counter_shards")
@@ -0,0 +1,71 @@
+"""add comment path
+
+Revision ID: 7e3f9b2c1a64
+Revises: d4b7e1a90c53
+Create Date: 2026-10-18 20:30:41.206518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7e3f9b2c1a64"
+down_revision: Union[str, Sequence[str], None] = "d4b7e1a90c53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_PATHS = """
+WITH RECURSIVE tree AS (
+    SELECT id, lpad(id::text, 10, '0') COLLATE "C" AS path, 0 AS depth
+    FROM comments
+    WHERE parent_id IS NULL
+    UNION ALL
+    SELECT c.id, tree.path || '.' || lpad(c.id::text, 10, '0'), tree.depth + 1
+    FROM comments c
+    JOIN tree ON c.parent_id = tree.id
+)
+UPDATE comments
+SET path = tree.path, depth = tree.depth
+FROM tree
+WHERE comments.id = tree.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "comments",
+        sa.Column("path", sa.VARCHAR(collation="C"), nullable=True),
+    )
+    op.add_column(
+        "comments",
+        sa.Column("depth", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(BACKFILL_PATHS)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_comments_post_id_path",
+            "comments",
+            ["post_id", "path", "depth"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_comments_post_id_path",
+            table_name="comments",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("comments", "depth")
+    op.drop_column("comments", "path")
@@ -0,0 +1,62 @@
+"""add comment counters
+
+Revision ID: b62d0c8e4f17
+Revises: 7e3f9b2c1a64
+Create Date: 2026-10-18 21:00:09.518342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b62d0c8e4f17"
+down_revision: Union[str, Sequence[str], None] = "7e3f9b2c1a64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_COMMENTS = """
+UPDATE posts
+SET number_of_comments = counts.total
+FROM (SELECT post_id, count(*) AS total FROM comments GROUP BY post_id) AS counts
+WHERE posts.id = counts.post_id
+"""
+
+BACKFILL_REPLIES = """
+UPDATE comments
+SET number_of_replies = counts.total
+FROM (
+    SELECT parent_id, count(*) AS total
+    FROM comments
+    WHERE parent_id IS NOT NULL
+    GROUP BY parent_id
+) AS counts
+WHERE comments.id = counts.parent_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "posts",
+        sa.Column(
+            "number_of_comments", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    op.add_column(
+        "comments",
+        sa.Column(
+            "number_of_replies", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    op.execute(BACKFILL_COMMENTS)
+    op.execute(BACKFILL_REPLIES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("comments", "number_of_replies")
+    op.drop_column("posts", "number_of_comments")
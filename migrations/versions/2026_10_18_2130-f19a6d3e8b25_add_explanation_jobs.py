@@ -0,0 +1,81 @@
+"""add explanation jobs
+
+Revision ID: f19a6d3e8b25
+Revises: b62d0c8e4f17
+Create Date: 2026-10-18 21:30:52.604719
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f19a6d3e8b25"
+down_revision: Union[str, Sequence[str], None] = "b62d0c8e4f17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "explanation_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.VARCHAR(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("result", postgresql.JSONB(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["post_id"],
+            ["posts.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_explanation_jobs_status_run_after",
+        "explanation_jobs",
+        ["status", "run_after"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+    op.create_index(
+        "ix_explanation_jobs_status_locked_at",
+        "explanation_jobs",
+        ["status", "locked_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'running'"),
+    )
+    op.create_index(
+        "ix_explanation_jobs_post_id", "explanation_jobs", ["post_id"], unique=False
+    )
+    op.create_index(
+        "ix_explanation_jobs_active_post_id",
+        "explanation_jobs",
+        ["post_id"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_explanation_jobs_active_post_id", table_name="explanation_jobs"
+    )
+    op.drop_index("ix_explanation_jobs_post_id", table_name="explanation_jobs")
+    op.drop_index(
+        "ix_explanation_jobs_status_locked_at", table_name="explanation_jobs"
+    )
+    op.drop_index(
+        "ix_explanation_jobs_status_run_after", table_name="explanation_jobs"
+    )
+    op.drop_table("explanation_jobs")
@@ -0,0 +1,80 @@
+"""add follows and timelines
+
+Revision ID: 3c8a5e71d9f2
+Revises: f19a6d3e8b25
+Create Date: 2026-10-18 22:00:27.913054
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8a5e71d9f2"
+down_revision: Union[str, Sequence[str], None] = "f19a6d3e8b25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "number_of_followers", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", sa.Integer(), nullable=False),
+        sa.Column("followee_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["followee_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["follower_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("follower_id", "followee_id"),
+    )
+    op.create_index(
+        "ix_follows_followee_id", "follows", ["followee_id"], unique=False
+    )
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "post_id"),
+    )
+    op.create_index(
+        "ix_timeline_entries_user_id_created_at",
+        "timeline_entries",
+        ["user_id", "created_at", "post_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_timeline_entries_user_id_author_id",
+        "timeline_entries",
+        ["user_id", "author_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_timeline_entries_post_id", "timeline_entries", ["post_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_timeline_entries_post_id", table_name="timeline_entries")
+    op.drop_index(
+        "ix_timeline_entries_user_id_author_id", table_name="timeline_entries"
+    )
+    op.drop_index(
+        "ix_timeline_entries_user_id_created_at", table_name="timeline_entries"
+    )
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_follows_followee_id", table_name="follows")
+    op.drop_table("follows")
+    op.drop_column("users", "number_of_followers")
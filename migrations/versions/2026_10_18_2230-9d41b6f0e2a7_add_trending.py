@@ -0,0 +1,89 @@
+"""add trending
+
+Revision ID: 9d41b6f0e2a7
+Revises: 3c8a5e71d9f2
+Create Date: 2026-10-18 22:30:14.377120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9d41b6f0e2a7"
+down_revision: Union[str, Sequence[str], None] = "3c8a5e71d9f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Mirrors services/posts/query_builder/trending.py: epoch 2024-01-01, 12 hour
+# half-life, weights 1 (post), 1 (like) and 2 (comment).
+BACKFILL_HOT_SCORES = """
+WITH events AS (
+    SELECT id AS post_id, ln(1.0) AS weight, created_at FROM posts
+    UNION ALL
+    SELECT post_id, ln(1.0), created_at FROM post_likes
+    UNION ALL
+    SELECT post_id, ln(2.0), created_at FROM comments
+),
+scaled AS (
+    SELECT
+        post_id,
+        weight + (extract(epoch FROM coalesce(created_at, now())) - 1704067200)
+            / (43200 / ln(2.0)) AS x
+    FROM events
+),
+scores AS (
+    SELECT post_id, max_x + ln(sum(exp(greatest(x - max_x, -700)))) AS score
+    FROM (SELECT post_id, x, max(x) OVER (PARTITION BY post_id) AS max_x FROM scaled) s
+    GROUP BY post_id, max_x
+)
+UPDATE posts
+SET hot_score = scores.score
+FROM scores
+WHERE posts.id = scores.post_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "posts",
+        sa.Column("hot_score", sa.Float(), server_default="0", nullable=False),
+    )
+    op.execute(BACKFILL_HOT_SCORES)
+    op.create_table(
+        "trending_posts",
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("hot_score", sa.Float(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("rank"),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_hot_score",
+            "posts",
+            [sa.text("hot_score DESC")],
+            unique=False,
+            postgresql_where=sa.text("is_published"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_hot_score",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table("trending_posts")
+    op.drop_column("posts", "hot_score")
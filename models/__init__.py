@@ -3,3 +3,8 @@ from .post import Post
 from .comments import Comment
 from .comment_likes import CommentLike
 from .post_likes import PostLike
+from .post_like_counter_shard import PostLikeCounterShard
+from .explanation_job import ExplanationJob
+from .follows import Follow
+from .timeline_entry import TimelineEntry
+from .trending_post import TrendingPost
@@ -1,16 +1,19 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
-from sqlalchemy import VARCHAR, Column, DateTime
+from sqlalchemy import VARCHAR, Column, DateTime, Index
 from datetime import datetime, timezone
 
 
 class CommentLike(SQLModel, table=True):
     __tablename__ = "comment_likes"
+    __table_args__ = (Index("ix_comment_likes_comment_id", "comment_id"),)
 
     user_id: int = Field(primary_key=True, foreign_key="users.id")
     comment_id: int = Field(primary_key=True, foreign_key="comments.id")
     created_at: datetime = Field(
-        sa_column=Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
     )
 
     user: "User" = Relationship(back_populates="comment_likes")
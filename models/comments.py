@@ -1,11 +1,36 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
-from sqlalchemy import VARCHAR, Column, DateTime
+from sqlalchemy import VARCHAR, Column, DateTime, Index, text
 from datetime import datetime, timezone
 
+# Materialized path: the ids from the root comment down to this one, each
+# zero-padded so that byte order matches tree order (see `comment_path`).
+PATH_SEGMENT_WIDTH = 10
+PATH_SEPARATOR = "."
+# First character after PATH_SEPARATOR; `path < prefix + PATH_UPPER_BOUND`
+# closes the range scan for a subtree.
+PATH_UPPER_BOUND = "/"
+
+
+def comment_path(parent_path: Optional[str], com_id: int) -> str:
+    segment = str(com_id).zfill(PATH_SEGMENT_WIDTH)
+    if parent_path:
+        return parent_path + PATH_SEPARATOR + segment
+    return segment
+
 
 class Comment(SQLModel, table=True):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_post_id_created_at", "post_id", "created_at", "id"),
+        Index("ix_comments_author_id_created_at", "author_id", "created_at", "id"),
+        Index(
+            "ix_comments_parent_id",
+            "parent_id",
+            postgresql_where=text("parent_id IS NOT NULL"),
+        ),
+        Index("ix_comments_post_id_path", "post_id", "path", "depth"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     content: str = Field(sa_column=Column(VARCHAR(length=500), nullable=False))
@@ -13,9 +38,18 @@ class Comment(SQLModel, table=True):
     author_id: int = Field(default=None, foreign_key="users.id")
     parent_id: Optional[int] = Field(default=None, foreign_key="comments.id")
     created_at: datetime = Field(
-        sa_column=Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
     )
     number_of_likes: int = Field(default=0)
+    number_of_replies: int = Field(default=0)
+    # Set by CommentQueryBuilder.create_com once the id is known. The "C"
+    # collation keeps comparisons bytewise so range scans follow the tree.
+    path: Optional[str] = Field(
+        default=None, sa_column=Column(VARCHAR(collation="C"), nullable=True)
+    )
+    depth: int = Field(default=0)
 
     post: Optional["Post"] = Relationship(back_populates="comments")
     author: Optional["User"] = Relationship(back_populates="comments")
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import VARCHAR, Column, DateTime, Index, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+# Predicate of the partial indexes over queued jobs; also the ON CONFLICT target.
+ACTIVE_JOB_CONDITION = "status IN ('pending', 'running')"
+
+
+class ExplanationJob(SQLModel, table=True):
+    """Queued request to explain a post; workers claim rows with SKIP LOCKED."""
+
+    __tablename__ = "explanation_jobs"
+    __table_args__ = (
+        Index(
+            "ix_explanation_jobs_status_run_after",
+            "status",
+            "run_after",
+            postgresql_where=text(ACTIVE_JOB_CONDITION),
+        ),
+        Index(
+            "ix_explanation_jobs_status_locked_at",
+            "status",
+            "locked_at",
+            postgresql_where=text("status = 'running'"),
+        ),
+        Index("ix_explanation_jobs_post_id", "post_id"),
+        # At most one active job per post; create_job inserts ON CONFLICT here.
+        Index(
+            "ix_explanation_jobs_active_post_id",
+            "post_id",
+            unique=True,
+            postgresql_where=text(ACTIVE_JOB_CONDITION),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    post_id: int = Field(foreign_key="posts.id", ondelete="CASCADE")
+    status: str = Field(
+        default=JOB_PENDING, sa_column=Column(VARCHAR(16), nullable=False)
+    )
+    attempts: int = Field(default=0)
+    result: Optional[Dict[str, Any]] = Field(
+        default=None, sa_column=Column(JSONB, nullable=True)
+    )
+    error: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    run_after: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            nullable=False,
+            default=lambda: datetime.now(timezone.utc),
+        )
+    )
+    locked_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    created_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            onupdate=lambda: datetime.now(timezone.utc),
+        )
+    )
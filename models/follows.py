@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime, Index
+from datetime import datetime, timezone
+
+
+class Follow(SQLModel, table=True):
+    __tablename__ = "follows"
+    __table_args__ = (Index("ix_follows_followee_id", "followee_id"),)
+
+    follower_id: int = Field(
+        primary_key=True, foreign_key="users.id", ondelete="CASCADE"
+    )
+    followee_id: int = Field(
+        primary_key=True, foreign_key="users.id", ondelete="CASCADE"
+    )
+    created_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
+    )
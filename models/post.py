@@ -1,21 +1,63 @@
 from sqlmodel import DateTime, SQLModel, Field, Relationship
 from typing import Optional, List
-from sqlalchemy import VARCHAR, Column
+from sqlalchemy import VARCHAR, Column, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime, timezone
 
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B')"
+)
+
 
 class Post(SQLModel, table=True):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_author_id_created_at", "author_id", "created_at", "id"),
+        Index("ix_posts_is_published_created_at", "is_published", "created_at", "id"),
+        Index(
+            "ix_posts_hot_score",
+            text("hot_score DESC"),
+            postgresql_where=text("is_published"),
+        ),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_posts_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_posts_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
+    )
+    # search_vector is generated by Postgres and only used in WHERE/ORDER BY,
+    # so it is kept out of the mapper to avoid loading it with every post.
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(sa_column=Column(VARCHAR(length=100), nullable=False))
     content: str = Field(sa_column=Column(VARCHAR(length=1000), nullable=False))
     author_id: Optional[int] = Field(default=None, foreign_key="users.id")
     number_of_likes: int = Field(default=0)
+    number_of_comments: int = Field(default=0)
+    # Log of the time-decayed sum of post, like and comment events; see
+    # services/posts/query_builder/trending.py.
+    hot_score: float = Field(default=0.0)
     created_at: datetime = Field(
-        sa_column=Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
     )
     is_published: bool = Field(default=True)
+    search_vector: Optional[str] = Field(
+        default=None,
+        sa_column=Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)),
+    )
 
     author: Optional["User"] = Relationship(back_populates="posts")
     comments: List["Comment"] = Relationship(back_populates="post")
@@ -0,0 +1,11 @@
+from sqlmodel import SQLModel, Field
+
+
+class PostLikeCounterShard(SQLModel, table=True):
+    """Pending like delta for a post, spread over shards to avoid row contention."""
+
+    __tablename__ = "post_like_counter_shards"
+
+    post_id: int = Field(primary_key=True, foreign_key="posts.id", ondelete="CASCADE")
+    shard: int = Field(primary_key=True)
+    delta: int = Field(default=0)
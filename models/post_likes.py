@@ -1,16 +1,19 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
-from sqlalchemy import VARCHAR, Column, DateTime
+from sqlalchemy import VARCHAR, Column, DateTime, Index
 from datetime import datetime, timezone
 
 
 class PostLike(SQLModel, table=True):
     __tablename__ = "post_likes"
+    __table_args__ = (Index("ix_post_likes_post_id", "post_id"),)
 
     user_id: int = Field(primary_key=True, foreign_key="users.id")
     post_id: int = Field(primary_key=True, foreign_key="posts.id")
     created_at: datetime = Field(
-        sa_column=Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
     )
 
     user: "User" = Relationship(back_populates="post_likes")
@@ -0,0 +1,27 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime, Index
+from datetime import datetime
+
+
+class TimelineEntry(SQLModel, table=True):
+    """A post pushed into a follower's home timeline when it was published.
+
+    `author_id` and `created_at` are copied from the post so a timeline page
+    and an unfollow are served by this table's indexes alone.
+    """
+
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        Index(
+            "ix_timeline_entries_user_id_created_at", "user_id", "created_at", "post_id"
+        ),
+        Index("ix_timeline_entries_user_id_author_id", "user_id", "author_id"),
+        Index("ix_timeline_entries_post_id", "post_id"),
+    )
+
+    user_id: int = Field(primary_key=True, foreign_key="users.id", ondelete="CASCADE")
+    post_id: int = Field(primary_key=True, foreign_key="posts.id", ondelete="CASCADE")
+    author_id: int
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
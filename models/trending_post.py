@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime
+from datetime import datetime, timezone
+
+
+class TrendingPost(SQLModel, table=True):
+    """Top-K snapshot of posts by `Post.hot_score`, rebuilt on a schedule."""
+
+    __tablename__ = "trending_posts"
+
+    rank: int = Field(primary_key=True)
+    post_id: int = Field(foreign_key="posts.id", ondelete="CASCADE")
+    hot_score: float
+    refreshed_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        )
+    )
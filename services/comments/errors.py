@@ -1,2 +1,6 @@
 class CommentNotFound(Exception):
     """Exception raised when a Post is not found."""
+
+
+class CommentParentChangeNotAllowed(Exception):
+    """Raised when an update tries to move a comment under another parent."""
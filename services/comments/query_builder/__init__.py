@@ -1,2 +1,3 @@
 from .comment import CommentQueryBuilder
 from .likes import CommentLikeQueryBuilder
+from .tree import CommentTreeQueryBuilder
@@ -1,9 +1,16 @@
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
 from sqlmodel import select
+from sqlalchemy import and_, delete, func, or_, update
+from sqlalchemy.orm import aliased
 
 from common.errors import EmptyQueryResult
-from services.comments.errors import CommentNotFound
+from services.comments.errors import CommentNotFound, CommentParentChangeNotAllowed
 from dependecies.session import AsyncSessionDep
-from models import Comment
+from models import Comment, CommentLike, Post
+from models.comments import PATH_SEPARATOR, PATH_UPPER_BOUND, comment_path
 
 from services.comments.schemas import (
     CommentResponseSchema,
@@ -12,10 +19,71 @@ from services.comments.schemas import (
     CommentUpdateSchema,
 )
 from common import UnauthorizedAccess
+from common.pagination import decode_cursor, paginate, split_page
+from common.cache import get_cache
+from common.cache.tags import post_comments_tag, post_tag
+from common.schemas import PaginationParams
+from db.locks import try_advisory_xact_lock
+from services.posts.query_builder.trending import COMMENT_WEIGHT, TrendingQueryBuilder
 
 
 class CommentQueryBuilder:
 
+    @staticmethod
+    async def _apply_comment_delta(
+        session: AsyncSessionDep,
+        post_id: int,
+        parent_id: Optional[int],
+        delta: int,
+        created_at: Optional[datetime] = None,
+        reply_delta: Optional[int] = None,
+    ) -> None:
+        """Adjust the post's comment count and the parent's reply count in SQL.
+
+        `created_at` is the time of the comments' score event, now by default.
+        `reply_delta` is the parent's change when it differs from `delta`, as
+        when a whole subtree is deleted.
+        """
+        await session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(
+                number_of_comments=func.greatest(Post.number_of_comments + delta, 0),
+                hot_score=TrendingQueryBuilder.score_after_event(
+                    Post.hot_score, delta * COMMENT_WEIGHT, created_at
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if parent_id is not None:
+            await session.execute(
+                update(Comment)
+                .where(Comment.id == parent_id)
+                .values(
+                    number_of_replies=func.greatest(
+                        Comment.number_of_replies
+                        + (delta if reply_delta is None else reply_delta),
+                        0,
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    async def _ensure_path(session: AsyncSessionDep, com: Comment) -> str:
+        """Return the comment's path, filling it in (and its ancestors') if missing.
+
+        Comments written by code that predates the path column have none.
+        """
+        if com.path is None:
+            parent_path = None
+            if com.parent_id is not None:
+                parent = await session.get(Comment, com.parent_id)
+                parent_path = await CommentQueryBuilder._ensure_path(session, parent)
+                com.depth = parent.depth + 1
+            com.path = comment_path(parent_path, com.id)
+        return com.path
+
     @staticmethod
     async def create_com(
         session: AsyncSessionDep, com_data: CommentCreateSchema, user_id: int
@@ -27,11 +95,75 @@ class CommentQueryBuilder:
             com_dict["parent_id"] = None
 
         com = Comment(**com_dict)
+        parent_path = None
+        if com.parent_id is not None:
+            parent = await session.get(Comment, com.parent_id)
+            if not parent or parent.post_id != com.post_id:
+                raise CommentNotFound
+            parent_path = await CommentQueryBuilder._ensure_path(session, parent)
+            com.depth = parent.depth + 1
+
         session.add(com)
+        # The path ends with the comment's own id, so it is set after the flush.
+        await session.flush()
+        com.path = comment_path(parent_path, com.id)
+        await CommentQueryBuilder._apply_comment_delta(
+            session, com.post_id, com.parent_id, 1
+        )
         await session.commit()
         await session.refresh(com)
+        await get_cache().invalidate_tags(
+            post_tag(com.post_id), post_comments_tag(com.post_id)
+        )
         return com
 
+    @staticmethod
+    async def reconcile_comment_counters(session: AsyncSessionDep) -> None:
+        """Repair drifted number_of_comments / number_of_replies in bulk.
+
+        Each counter is recomputed with a correlated count and only rows whose
+        stored value differs are updated. When another process is already
+        reconciling, this returns without doing anything.
+        """
+        if not await try_advisory_xact_lock(session, "reconcile-comment-counters"):
+            return
+        comment_count = (
+            select(func.count())
+            .select_from(Comment)
+            .where(Comment.post_id == Post.id)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(Post)
+            .where(Post.number_of_comments != comment_count)
+            .values(number_of_comments=comment_count)
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        )
+        post_ids = set(result.scalars().all())
+
+        replies = aliased(Comment)
+        reply_count = (
+            select(func.count())
+            .select_from(replies)
+            .where(replies.parent_id == Comment.id)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(Comment)
+            .where(Comment.number_of_replies != reply_count)
+            .values(number_of_replies=reply_count)
+            .returning(Comment.post_id)
+            .execution_options(synchronize_session=False)
+        )
+        reply_post_ids = set(result.scalars().all())
+        await session.commit()
+
+        await get_cache().invalidate_tags(
+            *(post_tag(post_id) for post_id in post_ids),
+            *(post_comments_tag(post_id) for post_id in reply_post_ids),
+        )
+
     @staticmethod
     async def get_com_by_id(session: AsyncSessionDep, com_id: int):
         query = select(Comment).where(Comment.id == com_id)
@@ -57,13 +189,71 @@ class CommentQueryBuilder:
 
         return com
 
+    @staticmethod
+    def _subtree_condition(com: Comment):
+        """Match the comment and all its replies, at any depth.
+
+        The subtree is a range scan on the path prefix; a comment without a
+        path is walked by ``parent_id`` instead.
+        """
+        if com.path is not None:
+            return and_(
+                Comment.post_id == com.post_id,
+                or_(
+                    Comment.id == com.id,
+                    and_(
+                        Comment.path > com.path + PATH_SEPARATOR,
+                        Comment.path < com.path + PATH_UPPER_BOUND,
+                    ),
+                ),
+            )
+        subtree = (
+            select(Comment.id)
+            .where(Comment.id == com.id)
+            .cte("subtree", recursive=True)
+        )
+        subtree = subtree.union_all(
+            select(Comment.id).where(Comment.parent_id == subtree.c.id)
+        )
+        return Comment.id.in_(select(subtree.c.id))
+
     @staticmethod
     async def delete_com(session: AsyncSessionDep, com_id: int, user_id: int):
+        """Delete the comment together with its replies and their likes.
+
+        The post loses one comment and one score event per deleted row; the
+        parent loses one reply.
+        """
         com = await CommentQueryBuilder.get_com_by_id_with_author_check(
             session, com_id, user_id
         )
-        await session.delete(com)
+        post_id, parent_id = com.post_id, com.parent_id
+        subtree = CommentQueryBuilder._subtree_condition(com)
+        await session.execute(
+            delete(CommentLike)
+            .where(CommentLike.comment_id.in_(select(Comment.id).where(subtree)))
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(
+            delete(Comment)
+            .where(subtree)
+            .returning(Comment.created_at)
+            .execution_options(synchronize_session=False)
+        )
+        created = result.scalars().all()
+        session.expunge(com)
+        await CommentQueryBuilder._apply_comment_delta(
+            session,
+            post_id,
+            parent_id,
+            -len(created),
+            TrendingQueryBuilder.combined_event_time(
+                [created_at or datetime.now(timezone.utc) for created_at in created]
+            ),
+            reply_delta=-1,
+        )
         await session.commit()
+        await get_cache().invalidate_tags(post_tag(post_id), post_comments_tag(post_id))
 
     @staticmethod
     async def update_com(
@@ -75,28 +265,127 @@ class CommentQueryBuilder:
         com = await CommentQueryBuilder.get_com_by_id_with_author_check(
             session, com_id, user_id
         )
-        for key, value in com_data.model_dump(exclude_unset=True).items():
+        updates = com_data.model_dump(exclude_unset=True)
+        # Moving a comment would have to re-path its whole subtree.
+        if updates.pop("parent", com.parent_id) != com.parent_id:
+            raise CommentParentChangeNotAllowed
+        for key, value in updates.items():
             setattr(com, key, value)
         await session.commit()
         await session.refresh(com)
+        await get_cache().invalidate_tags(post_comments_tag(com.post_id))
         return com
 
     @staticmethod
-    async def get_com_by_user(session: AsyncSessionDep, user_id: int):
-        query = select(Comment).where(Comment.author_id == user_id)
+    def build_user_coms_query(user_id: int, pagination_params: PaginationParams):
+        return paginate(
+            select(Comment).where(Comment.author_id == user_id),
+            pagination_params,
+            Comment.created_at,
+            Comment.id,
+        )
+
+    @staticmethod
+    def build_post_coms_query(post_id: int, pagination_params: PaginationParams):
+        return paginate(
+            select(Comment).where(Comment.post_id == post_id),
+            pagination_params,
+            Comment.created_at,
+            Comment.id,
+            descending=False,
+        )
+
+    @staticmethod
+    async def get_com_by_user(
+        session: AsyncSessionDep, user_id: int, pagination_params: PaginationParams
+    ):
+        query = CommentQueryBuilder.build_user_coms_query(user_id, pagination_params)
         result = await session.execute(query)
-        coms = result.scalars().all()
+        coms, next_cursor = split_page(result.scalars().all(), pagination_params)
         if not coms:
             raise EmptyQueryResult
 
-        return CommentListResponseSchema(items=coms)
+        return CommentListResponseSchema(items=coms, next_cursor=next_cursor)
 
     @staticmethod
-    async def get_post_coms_by_id(session: AsyncSessionDep, post_id: int):
-        query = select(Comment).where(Comment.post_id == post_id)
+    async def get_post_coms_by_id(
+        session: AsyncSessionDep, post_id: int, pagination_params: PaginationParams
+    ):
+        async def load_coms():
+            query = CommentQueryBuilder.build_post_coms_query(
+                post_id, pagination_params
+            )
+            result = await session.execute(query)
+            coms, next_cursor = split_page(result.scalars().all(), pagination_params)
+            if not coms:
+                raise EmptyQueryResult
+            return CommentListResponseSchema(
+                items=coms, next_cursor=next_cursor
+            ).model_dump(mode="json")
+
+        cache_key = f"coms:post:{post_id}:" + json.dumps(
+            pagination_params.model_dump(), sort_keys=True
+        )
+        data = await get_cache().get_or_load(
+            cache_key, load_coms, tags=lambda _: [post_comments_tag(post_id)]
+        )
+        return CommentListResponseSchema.model_validate(data)
+
+    @staticmethod
+    async def get_com_replies(
+        session: AsyncSessionDep, com_id: int, pagination_params: PaginationParams
+    ):
+        """Page through the direct replies of a comment in path order.
+
+        Replies share the parent's path as a prefix, so a page is one range
+        scan over ``ix_comments_post_id_path``; the cursor's id is the last
+        reply returned and the next page starts right after its path. A
+        parent without a path is paged by ``parent_id`` and id instead, which
+        is the same order because path segments are zero-padded ids.
+        """
+        parent = await session.get(Comment, com_id)
+        if not parent:
+            raise CommentNotFound
+
+        if parent.path is None:
+            query = (
+                select(Comment)
+                .where(Comment.parent_id == parent.id)
+                .order_by(Comment.id)
+                .limit(pagination_params.size + 1)
+            )
+            if pagination_params.cursor:
+                _, last_id = decode_cursor(pagination_params.cursor)
+                query = query.where(Comment.id > last_id)
+            else:
+                query = query.offset(pagination_params.page * pagination_params.size)
+            result = await session.execute(query)
+            coms, next_cursor = split_page(result.scalars().all(), pagination_params)
+            if not coms:
+                raise EmptyQueryResult
+            return CommentListResponseSchema(items=coms, next_cursor=next_cursor)
+
+        lower_bound = parent.path + PATH_SEPARATOR
+        if pagination_params.cursor:
+            _, last_id = decode_cursor(pagination_params.cursor)
+            lower_bound = comment_path(parent.path, last_id)
+        query = (
+            select(Comment)
+            .where(
+                Comment.post_id == parent.post_id,
+                Comment.path > lower_bound,
+                Comment.path < parent.path + PATH_UPPER_BOUND,
+                Comment.depth == parent.depth + 1,
+            )
+            .order_by(Comment.path)
+            .limit(pagination_params.size + 1)
+        )
+        if not pagination_params.cursor:
+            query = query.offset(pagination_params.page * pagination_params.size)
+
         result = await session.execute(query)
-        coms = result.scalars().all()
+        coms, next_cursor = split_page(result.scalars().all(), pagination_params)
         if not coms:
             raise EmptyQueryResult
 
-        return CommentListResponseSchema(items=coms)
+        return CommentListResponseSchema(items=coms, next_cursor=next_cursor)
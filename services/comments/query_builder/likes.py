@@ -1,12 +1,27 @@
-from typing import List
+from typing import Dict, Iterable, List, Set, Tuple
 from sqlmodel import select
+from sqlalchemy import (
+    Integer,
+    RowMapping,
+    column,
+    delete,
+    func,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from common.errors import EmptyQueryResult
 from models import CommentLike, Comment
 
-from common.errors import LikeNotFound
+from common.errors import LikeAlreadyExists, LikeNotFound
 from services.comments.errors import CommentNotFound
 from dependecies.session import AsyncSessionDep
-from sqlalchemy.orm import selectinload
+from common.cache import get_cache
+from common.cache.tags import post_comments_tag
+from common.projection import schema_columns
+from services.comments.schemas import CommentLikesResponseSchema
 
 
 class CommentLikeQueryBuilder:
@@ -14,30 +29,32 @@ class CommentLikeQueryBuilder:
     @staticmethod
     async def create_like_for_comment(
         session: AsyncSessionDep, user_id: int, com_id: int
-    ):
-        existing_like = await CommentLikeQueryBuilder.get_com_like(
-            session, user_id, com_id
+    ) -> None:
+        inserted_like = (
+            insert(CommentLike)
+            .values(user_id=user_id, comment_id=com_id)
+            .on_conflict_do_nothing()
+            .returning(CommentLike.comment_id)
+            .cte("inserted_like")
         )
-
-        if existing_like:
-            return existing_like
-
-        com_query = select(Comment).where(Comment.id == com_id)
-        com_result = await session.execute(com_query)
-        com = com_result.scalar_one_or_none()
-
-        if not com:
+        query = (
+            update(Comment)
+            .where(Comment.id == inserted_like.c.comment_id)
+            .values(number_of_likes=Comment.number_of_likes + 1)
+            .returning(Comment.post_id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await session.execute(query)
+        except IntegrityError:
+            await session.rollback()
             raise CommentNotFound
-
-        like = CommentLike(user_id=user_id, comment_id=com_id)
-        session.add(like)
-
-        com.number_of_likes += 1
-
+        post_id = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(like)
-        await session.refresh(com)
-        return like
+
+        if post_id is None:
+            raise LikeAlreadyExists
+        await get_cache().invalidate_tags(post_comments_tag(post_id))
 
     @staticmethod
     async def get_com_like(session: AsyncSessionDep, user_id: int, com_id: int):
@@ -50,37 +67,125 @@ class CommentLikeQueryBuilder:
 
     @staticmethod
     async def delete_like_from_com(session: AsyncSessionDep, com_id: int, user_id: int):
-        like = await CommentLikeQueryBuilder.get_post_like(session, user_id, com_id)
-        if not like:
-            raise LikeNotFound
-
-        com_query = select(Comment).where(Comment.id == com_id)
-        result = await session.execute(com_query)
-        com = result.scalar_one_or_none()
-
-        if not com:
-            raise CommentNotFound
-        await session.delete(like)
+        deleted_like = (
+            delete(CommentLike)
+            .where(CommentLike.comment_id == com_id, CommentLike.user_id == user_id)
+            .returning(CommentLike.comment_id)
+            .cte("deleted_like")
+        )
+        query = (
+            update(Comment)
+            .where(Comment.id == deleted_like.c.comment_id)
+            .values(number_of_likes=func.greatest(Comment.number_of_likes - 1, 0))
+            .returning(Comment.post_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(query)
+        post_id = result.scalar_one_or_none()
+        await session.commit()
 
-        if com.number_of_likes > 0:
-            com.number_of_likes -= 1
+        if post_id is None:
+            raise LikeNotFound
+        await get_cache().invalidate_tags(post_comments_tag(post_id))
 
+    @staticmethod
+    async def apply_like_batch(
+        session: AsyncSessionDep,
+        likes: Iterable[Tuple[int, int]],
+        unlikes: Iterable[Tuple[int, int]],
+    ) -> Dict[int, int]:
+        """Apply many `(user_id, comment_id)` likes and unlikes with bulk statements.
+
+        Mirrors `PostLikesQueryBuilder.apply_like_batch`; returns the applied
+        delta per comment.
+        """
+        likes, unlikes = list(likes), list(unlikes)
+        deltas: Dict[int, int] = {}
+
+        if likes:
+            requested = values(
+                column("user_id", Integer),
+                column("comment_id", Integer),
+                name="requested",
+            ).data(likes)
+            result = await session.execute(
+                insert(CommentLike)
+                .from_select(
+                    ["user_id", "comment_id", "created_at"],
+                    select(
+                        requested.c.user_id, requested.c.comment_id, func.now()
+                    ).join(Comment, Comment.id == requested.c.comment_id),
+                )
+                .on_conflict_do_nothing()
+                .returning(CommentLike.comment_id)
+            )
+            for com_id in result.scalars():
+                deltas[com_id] = deltas.get(com_id, 0) + 1
+
+        if unlikes:
+            result = await session.execute(
+                delete(CommentLike)
+                .where(tuple_(CommentLike.user_id, CommentLike.comment_id).in_(unlikes))
+                .returning(CommentLike.comment_id)
+            )
+            for com_id in result.scalars():
+                deltas[com_id] = deltas.get(com_id, 0) - 1
+
+        deltas = {com_id: delta for com_id, delta in deltas.items() if delta}
+        post_ids = set()
+        if deltas:
+            changes = values(
+                column("id", Integer), column("delta", Integer), name="changes"
+            ).data(list(deltas.items()))
+            result = await session.execute(
+                update(Comment)
+                .where(Comment.id == changes.c.id)
+                .values(
+                    number_of_likes=func.greatest(
+                        Comment.number_of_likes + changes.c.delta, 0
+                    )
+                )
+                .returning(Comment.post_id)
+                .execution_options(synchronize_session=False)
+            )
+            post_ids = set(result.scalars())
         await session.commit()
-        await session.refresh(com)
+        await get_cache().invalidate_tags(
+            *(post_comments_tag(post_id) for post_id in post_ids)
+        )
+        return deltas
 
     @staticmethod
-    async def get_user_comment_likes(session: AsyncSessionDep, user_id: int):
+    async def get_liked_comment_ids(
+        session: AsyncSessionDep, user_id: int, com_ids: Iterable[int]
+    ) -> Set[int]:
+        """Return which of `com_ids` the user has liked, in one primary-key lookup."""
+        com_ids = list(com_ids)
+        if not com_ids:
+            return set()
+        result = await session.execute(
+            select(CommentLike.comment_id).where(
+                CommentLike.user_id == user_id, CommentLike.comment_id.in_(com_ids)
+            )
+        )
+        return set(result.scalars())
+
+    @staticmethod
+    async def get_user_comment_likes(
+        session: AsyncSessionDep, user_id: int
+    ) -> List[RowMapping]:
+        """Return liked comments as rows with exactly CommentLikesResponseSchema's fields."""
         query = (
-            select(CommentLike)
-            .where(CommentLike.user_id == user_id)
-            .options(
-                selectinload(CommentLike.comment).selectinload(Comment.author),
-                selectinload(CommentLike.comment).selectinload(Comment.post),
-                selectinload(CommentLike.comment).selectinload(Comment.likes),
+            select(
+                *schema_columns(
+                    CommentLikesResponseSchema, Comment, liked_at=CommentLike.created_at
+                )
             )
+            .join(CommentLike, CommentLike.comment_id == Comment.id)
+            .where(CommentLike.user_id == user_id)
         )
         result = await session.execute(query)
-        likes = result.scalars().all()
+        likes = result.mappings().all()
         if not likes:
             raise EmptyQueryResult
         return likes
@@ -0,0 +1,157 @@
+import json
+from typing import Dict, List
+
+from sqlalchemy import and_, func, tuple_, union_all
+from sqlmodel import select
+
+from common.cache import get_cache
+from common.cache.tags import post_comments_tag
+from common.errors import EmptyQueryResult
+from common.pagination import decode_cursor, split_page
+from common.schemas import PaginationParams
+from dependecies.session import AsyncSessionDep
+from models import Comment
+from models.comments import PATH_SEPARATOR, PATH_UPPER_BOUND
+from services.comments.schemas import CommentTreeNodeSchema, CommentTreeResponseSchema
+
+COMMENT_COLUMNS = (
+    Comment.id,
+    Comment.content,
+    Comment.author_id,
+    Comment.created_at,
+    Comment.post_id,
+    Comment.parent_id,
+    Comment.number_of_likes,
+    Comment.number_of_replies,
+)
+
+
+class CommentTreeQueryBuilder:
+
+    @staticmethod
+    def build_tree_query(
+        post_id: int,
+        pagination_params: PaginationParams,
+        max_depth: int,
+        max_replies: int,
+    ):
+        """Build one query for a page of threads using materialized paths.
+
+        Top-level comments are paged by `(created_at, id)`; the replies of each
+        expanded thread are a single range scan on `(post_id, path)`, keeping
+        at most `max_replies` siblings per parent down to `max_depth` levels.
+        One extra top-level row is selected (with `expand` false) so the
+        caller can tell whether another page exists.
+        """
+        top_level = select(
+            *COMMENT_COLUMNS,
+            Comment.path,
+            Comment.depth,
+            func.row_number()
+            .over(order_by=(Comment.created_at, Comment.id))
+            .label("position"),
+        ).where(Comment.post_id == post_id, Comment.parent_id.is_(None))
+        if pagination_params.cursor:
+            created_at, com_id = decode_cursor(pagination_params.cursor)
+            top_level = top_level.where(
+                tuple_(Comment.created_at, Comment.id) > tuple_(created_at, com_id)
+            )
+            page_offset = 0
+        else:
+            page_offset = pagination_params.page * pagination_params.size
+        top_level = (
+            top_level.order_by(Comment.created_at, Comment.id)
+            .offset(page_offset)
+            .limit(pagination_params.size + 1)
+            .cte("top_level")
+        )
+        expand = top_level.c.position <= pagination_params.size + page_offset
+
+        descendants = (
+            select(
+                *COMMENT_COLUMNS,
+                Comment.path,
+                Comment.depth,
+                top_level.c.position,
+                func.row_number()
+                .over(partition_by=Comment.parent_id, order_by=Comment.path)
+                .label("sibling_rank"),
+            )
+            .join(
+                top_level,
+                and_(
+                    Comment.path > top_level.c.path + PATH_SEPARATOR,
+                    Comment.path < top_level.c.path + PATH_UPPER_BOUND,
+                ),
+            )
+            .where(Comment.post_id == post_id, Comment.depth <= max_depth, expand)
+            .subquery("descendants")
+        )
+
+        tree = union_all(
+            select(
+                *(top_level.c[column.key] for column in COMMENT_COLUMNS),
+                top_level.c.path,
+                top_level.c.depth,
+                top_level.c.position,
+            ),
+            select(
+                *(descendants.c[column.key] for column in COMMENT_COLUMNS),
+                descendants.c.path,
+                descendants.c.depth,
+                descendants.c.position,
+            ).where(descendants.c.sibling_rank <= max_replies),
+        ).subquery("tree")
+
+        return select(
+            *(tree.c[column.key] for column in COMMENT_COLUMNS),
+            tree.c.depth,
+            tree.c.number_of_replies.label("reply_count"),
+        ).order_by(tree.c.position, tree.c.path)
+
+    @staticmethod
+    def assemble_tree(rows) -> List[CommentTreeNodeSchema]:
+        """Nest flat rows under their parents in one pass; returns the roots."""
+        nodes: Dict[int, CommentTreeNodeSchema] = {}
+        roots = []
+        for row in rows:
+            node = CommentTreeNodeSchema.model_validate(dict(row))
+            nodes[node.id] = node
+        for node in nodes.values():
+            parent = nodes.get(node.parent_id) if node.parent_id else None
+            if parent is not None:
+                parent.replies.append(node)
+            elif node.parent_id is None:
+                roots.append(node)
+        return roots
+
+    @staticmethod
+    async def get_post_com_tree(
+        session: AsyncSessionDep,
+        post_id: int,
+        pagination_params: PaginationParams,
+        max_depth: int,
+        max_replies: int,
+    ) -> CommentTreeResponseSchema:
+        async def load_tree():
+            query = CommentTreeQueryBuilder.build_tree_query(
+                post_id, pagination_params, max_depth, max_replies
+            )
+            result = await session.execute(query)
+            roots, next_cursor = split_page(
+                CommentTreeQueryBuilder.assemble_tree(result.mappings().all()),
+                pagination_params,
+            )
+            if not roots:
+                raise EmptyQueryResult
+            return CommentTreeResponseSchema(
+                items=roots, next_cursor=next_cursor
+            ).model_dump(mode="json")
+
+        cache_key = f"coms:tree:{post_id}:" + json.dumps(
+            [pagination_params.model_dump(), max_depth, max_replies], sort_keys=True
+        )
+        data = await get_cache().get_or_load(
+            cache_key, load_tree, tags=lambda _: [post_comments_tag(post_id)]
+        )
+        return CommentTreeResponseSchema.model_validate(data)
@@ -1,22 +1,35 @@
 from fastapi import APIRouter, Depends, status, HTTPException, Query
 from typing import List, Annotated
-from services.comments.query_builder import CommentQueryBuilder, CommentLikeQueryBuilder
+from services.comments.query_builder import (
+    CommentQueryBuilder,
+    CommentLikeQueryBuilder,
+    CommentTreeQueryBuilder,
+)
 from dependecies import session
 from dependecies.session import AsyncSessionDep
+from dependecies.likes import LikeBufferDep
+from dependecies.instrumentation import query_budget
 from models.user import User
 from services.comments.schemas import (
     CommentCreateSchema,
+    CommentFeedItemSchema,
+    CommentFeedResponseSchema,
     CommentListResponseSchema,
     CommentResponseSchema,
+    CommentTreeResponseSchema,
     CommentUpdateSchema,
 )
 from services.users.modules.manager import current_active_user
-from services.comments.errors import CommentNotFound
+from services.comments.errors import CommentNotFound, CommentParentChangeNotAllowed
 
 from common.errors import UnauthorizedAccess
 from pydantic import ValidationError
 from common.errors import EmptyQueryResult
-from common.errors import LikeNotFound
+from common.errors import LikeNotFound, LikeAlreadyExists
+from common.errors import InvalidCursor
+from common.schemas import LikeBatchResponseSchema, LikeBatchSchema, PaginationParams
+from services.posts.modules.like_buffer import COMMENT
+from common.responses import RowsResponse
 from services.comments.schemas import (
     CommentLikesResponseSchema,
     CommentLikesListResponseSchema,
@@ -62,89 +75,201 @@ async def update_com(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="You cant change this com"
         )
+    except CommentParentChangeNotAllowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A comment cannot be moved to another parent",
+        )
 
 
 @com_router.get("/coms/my", response_model=CommentListResponseSchema)
 async def get_my_coms(
-    session: AsyncSessionDep, user: User = Depends(current_active_user)
+    session: AsyncSessionDep,
+    pagination_params: Annotated[PaginationParams, Depends()],
+    user: User = Depends(current_active_user),
 ):
     try:
-        return await CommentQueryBuilder.get_com_by_user(session, user.id)
+        return await CommentQueryBuilder.get_com_by_user(
+            session, user.id, pagination_params
+        )
     except EmptyQueryResult:
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
 
 
-@com_router.get("/post/coms/{post_id}", response_model=CommentListResponseSchema)
+@com_router.get(
+    "/post/coms/{post_id}",
+    response_model=CommentFeedResponseSchema,
+    dependencies=[Depends(query_budget(3))],
+)
 async def get_post_coms(
-    session: AsyncSessionDep, post_id: int, user: User = Depends(current_active_user)
+    session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
+    post_id: int,
+    pagination_params: Annotated[PaginationParams, Depends()],
+    user: User = Depends(current_active_user),
 ):
     try:
-        return await CommentQueryBuilder.get_post_coms_by_id(session, post_id)
+        page = await CommentQueryBuilder.get_post_coms_by_id(
+            session, post_id, pagination_params
+        )
+        com_ids = [com.id for com in page.items]
+        liked = await CommentLikeQueryBuilder.get_liked_comment_ids(
+            session, user.id, com_ids
+        )
+        if like_buffer is not None:
+            liked = like_buffer.overlay_liked(COMMENT, user.id, com_ids, liked)
+        items = [
+            CommentFeedItemSchema(**com.model_dump(), liked_by_me=com.id in liked)
+            for com in page.items
+        ]
+        return CommentFeedResponseSchema(items=items, next_cursor=page.next_cursor)
     except EmptyQueryResult:
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
 
 
-@com_router.post("/coms/likes/{com_id}", status_code=status.HTTP_201_CREATED)
-async def like_com(
-    session: AsyncSessionDep, com_id: int, user: User = Depends(current_active_user)
+@com_router.get("/post/coms/{post_id}/tree", response_model=CommentTreeResponseSchema)
+async def get_post_com_tree(
+    session: AsyncSessionDep,
+    post_id: int,
+    pagination_params: Annotated[PaginationParams, Depends()],
+    max_depth: int = Query(3, ge=0, le=20, description="Reply levels to include"),
+    max_replies: int = Query(
+        5, ge=0, le=50, description="Replies to include per comment"
+    ),
+    user: User = Depends(current_active_user),
 ):
     try:
-        existing_like = await CommentLikeQueryBuilder.get_com_like(
-            session, user.id, com_id
+        return await CommentTreeQueryBuilder.get_post_com_tree(
+            session, post_id, pagination_params, max_depth, max_replies
+        )
+    except EmptyQueryResult:
+        raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+@com_router.get("/coms/{com_id}/replies", response_model=CommentListResponseSchema)
+async def get_com_replies(
+    session: AsyncSessionDep,
+    com_id: int,
+    pagination_params: Annotated[PaginationParams, Depends()],
+    user: User = Depends(current_active_user),
+):
+    try:
+        return await CommentQueryBuilder.get_com_replies(
+            session, com_id, pagination_params
+        )
+    except CommentNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Com not found"
+        )
+    except EmptyQueryResult:
+        raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
         )
-        if existing_like:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="You have already liked this comment",
-            )
-        like = await CommentLikeQueryBuilder.create_like_for_comment(
-            session, user.id, com_id
+
+
+@com_router.post(
+    "/coms/likes/batch",
+    response_model=LikeBatchResponseSchema,
+    dependencies=[Depends(query_budget(4))],
+)
+async def batch_like_coms(
+    session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
+    batch: LikeBatchSchema,
+    user: User = Depends(current_active_user),
+):
+    if set(batch.like) & set(batch.unlike):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A comment cannot be liked and unliked in one batch",
         )
+    if like_buffer is not None:
+        for com_id in batch.like:
+            like_buffer.like_comment(user.id, com_id)
+        for com_id in batch.unlike:
+            like_buffer.unlike_comment(user.id, com_id)
+        return LikeBatchResponseSchema(liked=batch.like, unliked=batch.unlike)
+    deltas = await CommentLikeQueryBuilder.apply_like_batch(
+        session,
+        [(user.id, com_id) for com_id in set(batch.like)],
+        [(user.id, com_id) for com_id in set(batch.unlike)],
+    )
+    return LikeBatchResponseSchema.from_deltas(deltas)
+
+
+@com_router.post(
+    "/coms/likes/{com_id}",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(2))],
+)
+async def like_com(
+    session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
+    com_id: int,
+    user: User = Depends(current_active_user),
+):
+    if like_buffer is not None:
+        like_buffer.like_comment(user.id, com_id)
         return {"message": "Liked this post"}
+    try:
+        await CommentLikeQueryBuilder.create_like_for_comment(session, user.id, com_id)
+        return {"message": "Liked this post"}
+    except LikeAlreadyExists:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already liked this comment",
+        )
     except CommentNotFound:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
 
-@com_router.delete("/coms/likes/{com_id}}", status_code=status.HTTP_204_NO_CONTENT)
+@com_router.delete(
+    "/coms/likes/{com_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(query_budget(2))],
+)
 async def unlike_com(
-    session: AsyncSessionDep, com_id: int, user: User = Depends(current_active_user)
+    session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
+    com_id: int,
+    user: User = Depends(current_active_user),
 ):
+    if like_buffer is not None:
+        like_buffer.unlike_comment(user.id, com_id)
+        return
     try:
         await CommentLikeQueryBuilder.delete_like_from_com(session, com_id, user.id)
-        return {"message": "Unliked com"}
     except LikeNotFound:
         raise HTTPException(
-            status_code=status.HTTP_404_NO_CONTENT, detail="Like not found"
-        )
-    except CommentNotFound:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Com not found"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Like not found"
         )
 
 
-@com_router.get("/coms/likes/my", response_model=CommentLikesListResponseSchema)
+@com_router.get(
+    "/coms/likes/my",
+    response_model=CommentLikesListResponseSchema,
+    response_class=RowsResponse,
+    dependencies=[Depends(query_budget(2))],
+)
 async def get_my_comment_likes(
     session: AsyncSessionDep, user: User = Depends(current_active_user)
 ):
     try:
         likes = await CommentLikeQueryBuilder.get_user_comment_likes(session, user.id)
-
-        liked_comments = []
-        for like in likes:
-            comment = like.comment
-            liked_comments.append(
-                CommentLikesResponseSchema(
-                    id=comment.id,
-                    content=comment.content,
-                    author_id=comment.author_id,
-                    created_at=comment.created_at,
-                    post_id=comment.post_id,
-                    parent_id=comment.parent_id,
-                    number_of_likes=comment.number_of_likes,
-                    liked_at=like.created_at,
-                )
-            )
-
-        return CommentLikesListResponseSchema(items=liked_comments)
+        return RowsResponse({"items": likes})
     except EmptyQueryResult:
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,7 +1,11 @@
 from .comment import (
     CommentCreateSchema,
+    CommentFeedItemSchema,
+    CommentFeedResponseSchema,
     CommentListResponseSchema,
     CommentResponseSchema,
+    CommentTreeNodeSchema,
+    CommentTreeResponseSchema,
     CommentUpdateSchema,
 )
 from .likes import CommentLikesListResponseSchema, CommentLikesResponseSchema
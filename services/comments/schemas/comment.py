@@ -13,10 +13,22 @@ class CommentResponseSchema(SQLModel):
     post_id: int
     parent_id: Optional[int] = None
     number_of_likes: int
+    number_of_replies: int = 0
+    depth: int = 0
 
 
 class CommentListResponseSchema(SQLModel):
     items: List[CommentResponseSchema]
+    next_cursor: Optional[str] = None
+
+
+class CommentFeedItemSchema(CommentResponseSchema):
+    liked_by_me: bool = False
+
+
+class CommentFeedResponseSchema(SQLModel):
+    items: List[CommentFeedItemSchema]
+    next_cursor: Optional[str] = None
 
 
 class CommentCreateSchema(SQLModel):
@@ -28,3 +40,13 @@ class CommentCreateSchema(SQLModel):
 class CommentUpdateSchema(SQLModel):
     content: Optional[str] = None
     parent: Optional[int] = None
+
+
+class CommentTreeNodeSchema(CommentResponseSchema):
+    reply_count: int = 0
+    replies: List["CommentTreeNodeSchema"] = []
+
+
+class CommentTreeResponseSchema(SQLModel):
+    items: List[CommentTreeNodeSchema]
+    next_cursor: Optional[str] = None
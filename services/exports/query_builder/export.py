@@ -0,0 +1,37 @@
+from sqlmodel import select
+from sqlalchemy import Select
+
+from common.projection import schema_columns
+from models import Comment, CommentLike, Post, PostLike
+from services.comments.schemas import CommentResponseSchema
+from services.posts.schemas import PostResponseSchema
+
+
+class ExportQueryBuilder:
+    """Queries for full-table exports, ordered by primary key.
+
+    Each query selects only the exported columns so rows can be streamed
+    without building ORM instances.
+    """
+
+    @staticmethod
+    def posts_query() -> Select:
+        return select(*schema_columns(PostResponseSchema, Post)).order_by(Post.id)
+
+    @staticmethod
+    def comments_query() -> Select:
+        return select(*schema_columns(CommentResponseSchema, Comment)).order_by(
+            Comment.id
+        )
+
+    @staticmethod
+    def post_likes_query() -> Select:
+        return select(PostLike.user_id, PostLike.post_id, PostLike.created_at).order_by(
+            PostLike.user_id, PostLike.post_id
+        )
+
+    @staticmethod
+    def comment_likes_query() -> Select:
+        return select(
+            CommentLike.user_id, CommentLike.comment_id, CommentLike.created_at
+        ).order_by(CommentLike.user_id, CommentLike.comment_id)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query
+
+from common.responses import NDJSONStreamingResponse, stream_ndjson_rows
+from db.database import Database, get_database
+from models.user import User
+from services.exports.query_builder import ExportQueryBuilder
+from services.users.modules.manager import current_superuser
+
+export_router = APIRouter(prefix="/export")
+
+YIELD_PER = Query(
+    1000, ge=1, le=10000, description="Rows fetched from the cursor per chunk"
+)
+
+
+def ndjson_export(database: Database, query, yield_per: int):
+    return NDJSONStreamingResponse(
+        stream_ndjson_rows(database.read_session_maker, query, yield_per)
+    )
+
+
+@export_router.get("/posts", response_class=NDJSONStreamingResponse)
+async def export_posts(
+    database: Database = Depends(get_database),
+    yield_per: int = YIELD_PER,
+    user: User = Depends(current_superuser),
+):
+    return ndjson_export(database, ExportQueryBuilder.posts_query(), yield_per)
+
+
+@export_router.get("/coms", response_class=NDJSONStreamingResponse)
+async def export_coms(
+    database: Database = Depends(get_database),
+    yield_per: int = YIELD_PER,
+    user: User = Depends(current_superuser),
+):
+    return ndjson_export(database, ExportQueryBuilder.comments_query(), yield_per)
+
+
+@export_router.get("/post/likes", response_class=NDJSONStreamingResponse)
+async def export_post_likes(
+    database: Database = Depends(get_database),
+    yield_per: int = YIELD_PER,
+    user: User = Depends(current_superuser),
+):
+    return ndjson_export(database, ExportQueryBuilder.post_likes_query(), yield_per)
+
+
+@export_router.get("/coms/likes", response_class=NDJSONStreamingResponse)
+async def export_com_likes(
+    database: Database = Depends(get_database),
+    yield_per: int = YIELD_PER,
+    user: User = Depends(current_superuser),
+):
+    return ndjson_export(
+        database, ExportQueryBuilder.comment_likes_query(), yield_per
+    )
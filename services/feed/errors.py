@@ -0,0 +1,14 @@
+class UserNotFound(Exception):
+    """Exception raised when the user to follow does not exist."""
+
+
+class CannotFollowSelf(Exception):
+    """Raised when a user tries to follow themselves."""
+
+
+class FollowAlreadyExists(Exception):
+    """Raised when the user already follows the target."""
+
+
+class FollowNotFound(Exception):
+    """Raised when the user does not follow the target."""
@@ -0,0 +1,2 @@
+from .timeline import TimelineQueryBuilder
+from .follows import FollowQueryBuilder
@@ -0,0 +1,82 @@
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from dependecies.session import AsyncSessionDep
+from models import Follow, User
+from services.feed.errors import (
+    CannotFollowSelf,
+    FollowAlreadyExists,
+    FollowNotFound,
+    UserNotFound,
+)
+from services.feed.query_builder.timeline import TimelineQueryBuilder
+
+
+class FollowQueryBuilder:
+
+    @staticmethod
+    async def follow_user(
+        session: AsyncSessionDep, follower_id: int, followee_id: int
+    ) -> None:
+        """Follow a user and backfill their recent posts into the timeline.
+
+        The follow row and the followee's follower counter change in one
+        statement; authors over the fan-out threshold are not backfilled
+        because their posts are pulled on read.
+        """
+        if follower_id == followee_id:
+            raise CannotFollowSelf
+        inserted_follow = (
+            insert(Follow)
+            .values(follower_id=follower_id, followee_id=followee_id)
+            .on_conflict_do_nothing()
+            .returning(Follow.followee_id)
+            .cte("inserted_follow")
+        )
+        try:
+            result = await session.execute(
+                update(User)
+                .where(User.id == inserted_follow.c.followee_id)
+                .values(number_of_followers=User.number_of_followers + 1)
+                .returning(User.number_of_followers)
+                .execution_options(synchronize_session=False)
+            )
+        except IntegrityError:
+            await session.rollback()
+            raise UserNotFound
+        followers = result.scalar_one_or_none()
+        if followers is None:
+            await session.rollback()
+            raise FollowAlreadyExists
+
+        if followers <= TimelineQueryBuilder.fanout_max_followers:
+            await TimelineQueryBuilder.backfill_followee(
+                session, follower_id, followee_id
+            )
+        await session.commit()
+
+    @staticmethod
+    async def unfollow_user(
+        session: AsyncSessionDep, follower_id: int, followee_id: int
+    ) -> None:
+        """Unfollow a user and drop their posts from the follower's timeline."""
+        deleted_follow = (
+            delete(Follow)
+            .where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+            .returning(Follow.followee_id)
+            .cte("deleted_follow")
+        )
+        result = await session.execute(
+            update(User)
+            .where(User.id == deleted_follow.c.followee_id)
+            .values(number_of_followers=func.greatest(User.number_of_followers - 1, 0))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await session.rollback()
+            raise FollowNotFound
+
+        await TimelineQueryBuilder.remove_followee(session, follower_id, followee_id)
+        await session.commit()
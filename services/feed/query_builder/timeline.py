@@ -0,0 +1,159 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Row, delete, literal, tuple_, union
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+
+from common.errors import EmptyQueryResult
+from common.pagination import decode_cursor, paginate, split_page
+from common.projection import schema_columns
+from common.schemas import PaginationParams
+from dependecies.session import AsyncSessionDep
+from models import Follow, Post, TimelineEntry, User
+from services.posts.schemas import PostResponseSchema
+
+TIMELINE_COLUMNS = ["user_id", "post_id", "author_id", "created_at"]
+
+
+class TimelineQueryBuilder:
+    """Home timelines built by fan-out on write, with fan-out on read for
+    authors that have too many followers to push to.
+
+    Publishing a post copies its id into `timeline_entries` for every
+    follower of the author in one ``INSERT ... SELECT``, unless the author
+    has more than `fanout_max_followers` followers. Posts of such authors
+    are merged into the feed at read time instead. A post published while
+    its author was above the threshold is not backfilled if the author later
+    drops below it.
+    """
+
+    # Set from FeedSettings in the application lifespan.
+    fanout_max_followers: int = 1000
+    follow_backfill_posts: int = 50
+
+    @staticmethod
+    async def fan_out_post(session: AsyncSessionDep, post_id: int) -> None:
+        """Push a published post into its author's followers' timelines.
+
+        Runs in the caller's transaction; a no-op for authors over the
+        fan-out threshold, whose posts are pulled on read.
+        """
+        pushed = (
+            select(Follow.follower_id, Post.id, Post.author_id, Post.created_at)
+            .join(Post, Post.author_id == Follow.followee_id)
+            .join(User, User.id == Post.author_id)
+            .where(
+                Post.id == post_id,
+                User.number_of_followers <= TimelineQueryBuilder.fanout_max_followers,
+            )
+        )
+        await session.execute(
+            insert(TimelineEntry)
+            .from_select(TIMELINE_COLUMNS, pushed)
+            .on_conflict_do_nothing()
+        )
+
+    @staticmethod
+    async def remove_post(session: AsyncSessionDep, post_id: int) -> None:
+        """Drop an unpublished post from every timeline, in the caller's transaction."""
+        await session.execute(
+            delete(TimelineEntry).where(TimelineEntry.post_id == post_id)
+        )
+
+    @staticmethod
+    async def backfill_followee(
+        session: AsyncSessionDep, follower_id: int, followee_id: int
+    ) -> None:
+        """Copy the followee's most recent posts into a new follower's timeline."""
+        if not TimelineQueryBuilder.follow_backfill_posts:
+            return
+        backfill = (
+            select(literal(follower_id), Post.id, Post.author_id, Post.created_at)
+            .where(Post.author_id == followee_id, Post.is_published == True)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(TimelineQueryBuilder.follow_backfill_posts)
+        )
+        await session.execute(
+            insert(TimelineEntry)
+            .from_select(TIMELINE_COLUMNS, backfill)
+            .on_conflict_do_nothing()
+        )
+
+    @staticmethod
+    async def remove_followee(
+        session: AsyncSessionDep, follower_id: int, followee_id: int
+    ) -> None:
+        await session.execute(
+            delete(TimelineEntry).where(
+                TimelineEntry.user_id == follower_id,
+                TimelineEntry.author_id == followee_id,
+            )
+        )
+
+    @staticmethod
+    def _candidates(query, created_at_column, id_column, pagination_params):
+        """Order one feed source newest first and keep only rows that can reach the page."""
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+        if pagination_params.cursor:
+            query = query.where(
+                tuple_(created_at_column, id_column)
+                < tuple_(*decode_cursor(pagination_params.cursor))
+            )
+            return query.limit(pagination_params.size + 1)
+        return query.limit((pagination_params.page + 1) * pagination_params.size + 1)
+
+    @staticmethod
+    def build_feed_query(user_id: int, pagination_params: PaginationParams):
+        """Build one query merging the pushed timeline with pulled posts.
+
+        Each source is cut to the page before the ``UNION`` (which also drops
+        posts present in both), so a page reads at most a page's worth of
+        rows from the timeline index and from ``ix_posts_author_id_created_at``.
+        """
+        pushed = TimelineQueryBuilder._candidates(
+            select(
+                TimelineEntry.post_id.label("id"),
+                TimelineEntry.created_at.label("created_at"),
+            ).where(TimelineEntry.user_id == user_id),
+            TimelineEntry.created_at,
+            TimelineEntry.post_id,
+            pagination_params,
+        )
+        pulled_authors = (
+            select(Follow.followee_id)
+            .join(User, User.id == Follow.followee_id)
+            .where(
+                Follow.follower_id == user_id,
+                User.number_of_followers > TimelineQueryBuilder.fanout_max_followers,
+            )
+        )
+        pulled = TimelineQueryBuilder._candidates(
+            select(Post.id, Post.created_at).where(
+                Post.author_id.in_(pulled_authors), Post.is_published == True
+            ),
+            Post.created_at,
+            Post.id,
+            pagination_params,
+        )
+        candidates = union(pushed, pulled).subquery("candidates")
+        return paginate(
+            select(*schema_columns(PostResponseSchema, Post)).join(
+                candidates, candidates.c.id == Post.id
+            ),
+            pagination_params,
+            candidates.c.created_at,
+            candidates.c.id,
+        )
+
+    @staticmethod
+    async def get_feed(
+        session: AsyncSessionDep, user_id: int, pagination_params: PaginationParams
+    ) -> Tuple[List[Row], Optional[str]]:
+        """Return a page of the user's home feed, newest first, and the next cursor."""
+        result = await session.execute(
+            TimelineQueryBuilder.build_feed_query(user_id, pagination_params)
+        )
+        posts, next_cursor = split_page(result.all(), pagination_params)
+        if not posts:
+            raise EmptyQueryResult
+        return posts, next_cursor
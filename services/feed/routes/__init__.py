@@ -0,0 +1 @@
+from .feed import feed_router
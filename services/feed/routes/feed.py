@@ -0,0 +1,90 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from common.errors import EmptyQueryResult, InvalidCursor
+from common.schemas import PaginationParams
+from dependecies.likes import LikeBufferDep
+from dependecies.instrumentation import query_budget
+from dependecies.session import AsyncSessionDep, ReadSessionDep
+from models.user import User
+from services.feed.errors import (
+    CannotFollowSelf,
+    FollowAlreadyExists,
+    FollowNotFound,
+    UserNotFound,
+)
+from services.feed.query_builder import FollowQueryBuilder, TimelineQueryBuilder
+from services.posts.modules.like_buffer import POST
+from services.posts.query_builder import PostLikesQueryBuilder
+from services.posts.schemas import PostFeedItemSchema, PostFeedResponseSchema
+from services.users.modules.manager import current_active_reader, current_active_user
+
+feed_router = APIRouter()
+
+
+@feed_router.get(
+    "/feed",
+    response_model=PostFeedResponseSchema,
+    dependencies=[Depends(query_budget(3))],
+)
+async def get_feed(
+    session: ReadSessionDep,
+    like_buffer: LikeBufferDep,
+    pagination_params: Annotated[PaginationParams, Depends()],
+    user: User = Depends(current_active_reader),
+):
+    try:
+        posts, next_cursor = await TimelineQueryBuilder.get_feed(
+            session, user.id, pagination_params
+        )
+    except EmptyQueryResult:
+        raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    post_ids = [post.id for post in posts]
+    liked = await PostLikesQueryBuilder.get_liked_post_ids(session, user.id, post_ids)
+    if like_buffer is not None:
+        liked = like_buffer.overlay_liked(POST, user.id, post_ids, liked)
+    items = [
+        PostFeedItemSchema(**post._mapping, liked_by_me=post.id in liked)
+        for post in posts
+    ]
+    return PostFeedResponseSchema(items=items, next_cursor=next_cursor)
+
+
+@feed_router.post("/users/{user_id}/follow", status_code=status.HTTP_201_CREATED)
+async def follow_user(
+    session: AsyncSessionDep, user_id: int, user: User = Depends(current_active_user)
+):
+    try:
+        await FollowQueryBuilder.follow_user(session, user.id, user_id)
+        return {"message": "Followed this user"}
+    except CannotFollowSelf:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="You cannot follow yourself"
+        )
+    except UserNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    except FollowAlreadyExists:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You already follow this user",
+        )
+
+
+@feed_router.delete("/users/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow_user(
+    session: AsyncSessionDep, user_id: int, user: User = Depends(current_active_user)
+):
+    try:
+        await FollowQueryBuilder.unfollow_user(session, user.id, user_id)
+    except FollowNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="You do not follow this user"
+        )
@@ -0,0 +1 @@
+from .metrics import monitoring_router
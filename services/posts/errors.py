@@ -1,6 +1,18 @@
+from common.errors import LikeAlreadyExists
+
+
 class PostNotFound(Exception):
     """Exception raised when a Post is not found."""
 
 
-class LikeAlreadyExists(Exception):
-    """"""
+class ExplanationFailed(Exception):
+    """Raised when the explanation service returns an error or times out."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ExplanationJobNotFound(Exception):
+    """Exception raised when an explanation job is not found."""
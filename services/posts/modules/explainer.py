@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from common.cache import get_cache
+from common.cache.tags import explanation_tag
+from common.settings import ExplainerSettings
+from services.posts.errors import ExplanationFailed
+
+CHAT_COMPLETIONS_PATH = "/v1/chat/completions"
+
+
+def create_explainer_client(settings: ExplainerSettings) -> httpx.AsyncClient:
+    """Build the pooled client shared by every explanation request."""
+    return httpx.AsyncClient(
+        base_url=settings.base_url,
+        timeout=httpx.Timeout(settings.timeout_seconds, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_connections,
+        ),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def sse_event(data: str) -> bytes:
+    return f"data: {data}\n\n".encode()
+
+
+class StreamRelay:
+    """Events of one upstream stream, replayed to every client following it."""
+
+    def __init__(self) -> None:
+        self.events: List[str] = []
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, data: str) -> None:
+        self.events.append(data)
+        self._wake()
+
+    def finish(self) -> None:
+        self.finished = True
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Yield every event published so far, then new ones until finished."""
+        sent = 0
+        while True:
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.finished:
+                return
+            await self._changed.wait()
+
+
+class PostExplainer:
+    """Explain posts with an OpenAI-compatible chat API (Ollama by default).
+
+    Explanations are cached by a hash of the model and the post's title and
+    content, and tagged so only `update_post` and `delete_post` drop them.
+    Concurrent requests for the same content share one upstream call, and
+    at most `max_concurrency` upstream calls run at a time.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, settings: ExplainerSettings) -> None:
+        self.client = client
+        self.model = settings.model
+        self.cache_ttl_seconds = settings.cache_ttl_seconds
+        self._limiter = asyncio.Semaphore(settings.max_concurrency)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._in_flight_streams: Dict[str, StreamRelay] = {}
+
+    def cache_key(self, title: str, content: str) -> str:
+        digest = hashlib.sha256(
+            json.dumps([self.model, title, content]).encode()
+        ).hexdigest()
+        return f"explain:{digest}"
+
+    def build_request(self, title: str, content: str, stream: bool) -> Dict[str, Any]:
+        post_insides = f"Title of the post {title}, content of the post {content}"
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": f"Explain this post: {post_insides}"}
+            ],
+            "stream": stream,
+        }
+
+    async def explain(self, post_id: int, title: str, content: str) -> Dict[str, Any]:
+        """Return the chat completion explaining the post."""
+        key = self.cache_key(title, content)
+        cached = await get_cache().get(key)
+        if cached is not None:
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, post_id, title, content))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so one client disconnecting does not cancel the shared call.
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, key: str, post_id: int, title: str, content: str
+    ) -> Dict[str, Any]:
+        async with self._limiter:
+            try:
+                response = await self.client.post(
+                    CHAT_COMPLETIONS_PATH,
+                    json=self.build_request(title, content, stream=False),
+                )
+            except httpx.TimeoutException:
+                raise ExplanationFailed(504, "Explanation service timed out")
+            except httpx.HTTPError as e:
+                raise ExplanationFailed(502, f"Explanation service error: {e}")
+        if response.status_code != 200:
+            raise ExplanationFailed(
+                response.status_code, f"Mistral API error: {response.text}"
+            )
+
+        explanation = response.json()
+        await get_cache().set(
+            key, explanation, tags=[explanation_tag(post_id)], ttl=self.cache_ttl_seconds
+        )
+        return explanation
+
+    async def stream(
+        self, post_id: int, title: str, content: str
+    ) -> AsyncIterator[bytes]:
+        """Yield the explanation as server-sent events.
+
+        Every answer is sent as chat.completion.chunk events followed by
+        `[DONE]`; a cached answer is one chunk carrying the whole message.
+        Concurrent streams of the same content follow one upstream stream,
+        and its answer is cached only if upstream finished with `[DONE]`.
+        """
+        key = self.cache_key(title, content)
+        cached = await get_cache().get(key)
+        if cached is not None:
+            yield sse_event(json.dumps(self._completion_chunk(cached)))
+            yield sse_event("[DONE]")
+            return
+
+        relay = self._in_flight_streams.get(key)
+        if relay is None:
+            relay = StreamRelay()
+            self._in_flight_streams[key] = relay
+            # The relay keeps the task referenced; it outlives client disconnects.
+            relay.task = asyncio.create_task(
+                self._relay(key, post_id, title, content, relay)
+            )
+        async for data in relay.follow():
+            yield sse_event(data)
+
+    async def _relay(
+        self, key: str, post_id: int, title: str, content: str, relay: "StreamRelay"
+    ) -> None:
+        parts = []
+        finished = False
+        try:
+            async with self._limiter:
+                async with self.client.stream(
+                    "POST",
+                    CHAT_COMPLETIONS_PATH,
+                    json=self.build_request(title, content, stream=True),
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode(errors="replace")
+                        relay.publish(
+                            json.dumps(
+                                {
+                                    "error": f"Mistral API error: {body}",
+                                    "status_code": response.status_code,
+                                }
+                            )
+                        )
+                        return
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:") :].strip()
+                        if data == "[DONE]":
+                            finished = True
+                            break
+                        parts.append(self._delta_content(data))
+                        relay.publish(data)
+            if not finished:
+                relay.publish(
+                    json.dumps({"error": "Explanation service ended the stream early"})
+                )
+                return
+            explanation = {
+                "object": "chat.completion",
+                "model": self.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(parts)},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+            await get_cache().set(
+                key,
+                explanation,
+                tags=[explanation_tag(post_id)],
+                ttl=self.cache_ttl_seconds,
+            )
+            relay.publish("[DONE]")
+        except httpx.HTTPError as e:
+            relay.publish(json.dumps({"error": f"Explanation service error: {e}"}))
+        finally:
+            # Dropped before finishing so no later stream joins a finished relay.
+            self._in_flight_streams.pop(key, None)
+            relay.finish()
+
+    def _completion_chunk(self, explanation: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a cached chat.completion into a single streaming chunk."""
+        choice = (explanation.get("choices") or [{}])[0]
+        return {
+            "object": "chat.completion.chunk",
+            "model": explanation.get("model", self.model),
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": choice.get("message", {}),
+                    "finish_reason": choice.get("finish_reason", "stop"),
+                }
+            ],
+        }
+
+    @staticmethod
+    def _delta_content(data: str) -> str:
+        try:
+            choices = json.loads(data).get("choices") or [{}]
+            return choices[0].get("delta", {}).get("content") or ""
+        except (ValueError, AttributeError):
+            return ""
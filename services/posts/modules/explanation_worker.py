@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import signal
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from common.settings import ExplainerSettings
+from common.tasks import PeriodicTask
+from db.database import DatabaseSession
+from models import ExplanationJob
+from services.posts.errors import ExplanationFailed, PostNotFound
+from services.posts.modules.explainer import PostExplainer
+from services.posts.query_builder import ExplanationJobQueryBuilder, PostQueryBuilder
+
+logger = logging.getLogger(__name__)
+
+
+class ExplanationWorker:
+    """Run queued explanation jobs with a fixed number of polling loops.
+
+    Jobs live in the `explanation_jobs` table, so any number of workers, in
+    the API process or started with `python -m
+    services.posts.modules.explanation_worker`, can share the queue. Failed
+    attempts are retried with exponential backoff up to `job_max_attempts`,
+    and jobs left running by a crashed worker are requeued once they are
+    older than `job_stale_after_seconds`, unless their attempts are used up.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        explainer: PostExplainer,
+        settings: ExplainerSettings,
+    ) -> None:
+        self._session_maker = session_maker
+        self._explainer = explainer
+        self._settings = settings
+        self._loops: List[asyncio.Task] = []
+        self._requeue = PeriodicTask(
+            "requeue-stale-explanation-jobs",
+            settings.job_stale_after_seconds,
+            self.requeue_stale_jobs,
+        )
+
+    def retry_delay(self, attempts: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if attempts >= self._settings.job_max_attempts:
+            return None
+        return self._settings.job_backoff_seconds * 2 ** (attempts - 1)
+
+    async def requeue_stale_jobs(self) -> None:
+        async with DatabaseSession(session_maker=self._session_maker) as db:
+            requeued, failed = await ExplanationJobQueryBuilder.requeue_stale_jobs(
+                db.session,
+                self._settings.job_stale_after_seconds,
+                self._settings.job_max_attempts,
+            )
+        if requeued or failed:
+            logger.warning(
+                "Requeued %d and failed %d stale explanation jobs", requeued, failed
+            )
+
+    async def run_job(self, job: ExplanationJob) -> None:
+        async with DatabaseSession(session_maker=self._session_maker) as db:
+            try:
+                result = await PostQueryBuilder.explain_post(
+                    db.session, job.post_id, self._explainer
+                )
+            except PostNotFound:
+                await ExplanationJobQueryBuilder.fail_job(
+                    db.session, job.id, "Post not found", None
+                )
+            except ExplanationFailed as e:
+                await ExplanationJobQueryBuilder.fail_job(
+                    db.session, job.id, e.detail, self.retry_delay(job.attempts)
+                )
+            except Exception as e:
+                # Anything else would leave the job running until it goes stale.
+                logger.exception("Explanation job %d failed", job.id)
+                await db.session.rollback()
+                await ExplanationJobQueryBuilder.fail_job(
+                    db.session,
+                    job.id,
+                    f"Unexpected error: {e!r}",
+                    self.retry_delay(job.attempts),
+                )
+            else:
+                await ExplanationJobQueryBuilder.complete_job(
+                    db.session, job.id, result
+                )
+
+    async def run_next(self) -> bool:
+        """Claim and run one job; returns False when the queue is empty."""
+        async with DatabaseSession(session_maker=self._session_maker) as db:
+            job = await ExplanationJobQueryBuilder.claim_job(db.session)
+        if job is None:
+            return False
+        await self.run_job(job)
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                if await self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Explanation worker iteration failed")
+            await asyncio.sleep(self._settings.job_poll_interval_seconds)
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """Schedule `workers` loops (default `job_workers`) on the running loop."""
+        if self._loops:
+            return
+        if workers is None:
+            workers = self._settings.job_workers
+        self._loops = [
+            asyncio.create_task(self._loop(), name=f"explanation-worker-{i}")
+            for i in range(workers)
+        ]
+        if self._loops:
+            self._requeue.start()
+
+    async def stop(self) -> None:
+        """Cancel the loops; interrupted jobs are requeued once they go stale."""
+        for loop in self._loops:
+            loop.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+        await self._requeue.stop()
+
+
+async def main() -> None:
+    """Run explanation workers in their own process until interrupted."""
+    from common.cache import configure_cache, create_cache
+    from common.settings import get_settings
+    from db.database import Database
+    from services.posts.modules.explainer import create_explainer_client
+
+    settings = get_settings()
+    database = Database(settings=settings)
+    cache = create_cache(settings.cache)
+    configure_cache(cache)
+    client = create_explainer_client(settings.explainer)
+    worker = ExplanationWorker(
+        database.session_maker,
+        PostExplainer(client, settings.explainer),
+        settings.explainer,
+    )
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    worker.start(max(settings.explainer.job_workers, 1))
+    await stopped.wait()
+    await worker.stop()
+    await client.aclose()
+    await cache.close()
+    await database.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from db.database import DatabaseSession
+from services.comments.query_builder import CommentLikeQueryBuilder
+from services.posts.query_builder import PostLikesQueryBuilder
+
+logger = logging.getLogger(__name__)
+
+POST = "post"
+COMMENT = "comment"
+
+
+class LikeBuffer:
+    """In-process write-behind buffer for post and comment likes.
+
+    Like and unlike requests only record the user's latest intent per target,
+    so repeated toggles coalesce into at most one row change. `flush` writes
+    everything accumulated since the previous flush with bulk statements;
+    like counts are therefore stale for up to one flush interval.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker, max_pending: int = 10000):
+        self._session_maker = session_maker
+        self._max_pending = max_pending
+        # (kind, target_id, user_id) -> True for like, False for unlike
+        self._pending: Dict[Tuple[str, int, int], bool] = {}
+        self._flush_lock = asyncio.Lock()
+        self._early_flush: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _record(self, kind: str, target_id: int, user_id: int, liked: bool) -> None:
+        self._pending[(kind, target_id, user_id)] = liked
+        if len(self._pending) >= self._max_pending and (
+            self._early_flush is None or self._early_flush.done()
+        ):
+            self._early_flush = asyncio.create_task(self.flush())
+            self._early_flush.add_done_callback(self._early_flush_done)
+
+    @staticmethod
+    def _early_flush_done(task: asyncio.Task) -> None:
+        # `flush` has already re-queued the intents; retrieve the error so
+        # it is logged rather than reported as never retrieved.
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Early like buffer flush failed; intents re-queued",
+                exc_info=task.exception(),
+            )
+
+    def like_post(self, user_id: int, post_id: int) -> None:
+        self._record(POST, post_id, user_id, True)
+
+    def unlike_post(self, user_id: int, post_id: int) -> None:
+        self._record(POST, post_id, user_id, False)
+
+    def like_comment(self, user_id: int, com_id: int) -> None:
+        self._record(COMMENT, com_id, user_id, True)
+
+    def unlike_comment(self, user_id: int, com_id: int) -> None:
+        self._record(COMMENT, com_id, user_id, False)
+
+    def pending_state(self, kind: str, target_id: int, user_id: int) -> Optional[bool]:
+        """Return the unflushed like state of a target for a user, if any."""
+        return self._pending.get((kind, target_id, user_id))
+
+    def overlay_liked(
+        self, kind: str, user_id: int, target_ids: Iterable[int], liked: Set[int]
+    ) -> Set[int]:
+        """Return `liked` (the stored likes among `target_ids`) with unflushed intents applied."""
+        liked = set(liked)
+        for target_id in target_ids:
+            state = self._pending.get((kind, target_id, user_id))
+            if state is True:
+                liked.add(target_id)
+            elif state is False:
+                liked.discard(target_id)
+        return liked
+
+    async def flush(self) -> None:
+        """Write all pending likes and unlikes to the database."""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            # kind -> (likes, unlikes) as (user_id, target_id) pairs
+            batches = {kind: ([], []) for kind in (POST, COMMENT)}
+            for (kind, target_id, user_id), liked in pending.items():
+                batches[kind][0 if liked else 1].append((user_id, target_id))
+
+            try:
+                async with DatabaseSession(session_maker=self._session_maker) as db:
+                    likes, unlikes = batches[POST]
+                    if likes or unlikes:
+                        await PostLikesQueryBuilder.apply_like_batch(
+                            db.session, likes, unlikes
+                        )
+                    likes, unlikes = batches[COMMENT]
+                    if likes or unlikes:
+                        await CommentLikeQueryBuilder.apply_like_batch(
+                            db.session, likes, unlikes
+                        )
+            except BaseException:
+                # Re-queue the intents unless a newer one has replaced them,
+                # also when the flush is cancelled mid-write; re-applying an
+                # already written batch is a no-op.
+                for key, liked in pending.items():
+                    self._pending.setdefault(key, liked)
+                raise
@@ -1,2 +1,5 @@
 from .posts import PostQueryBuilder
 from .likes import PostLikesQueryBuilder
+from .search import PostSearchQueryBuilder
+from .explanation_jobs import ExplanationJobQueryBuilder
+from .trending import TrendingQueryBuilder
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlmodel import select
+from sqlalchemy import case, func, text, update
+from sqlalchemy.dialects.postgresql import insert
+
+from dependecies.session import AsyncSessionDep
+from models import ExplanationJob, Post
+from models.explanation_job import (
+    ACTIVE_JOB_CONDITION,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+)
+from services.posts.errors import ExplanationJobNotFound, PostNotFound
+
+
+class ExplanationJobQueryBuilder:
+
+    @staticmethod
+    async def create_job(session: AsyncSessionDep, post_id: int) -> ExplanationJob:
+        """Queue an explanation, reusing a job that is still pending or running.
+
+        The insert skips on the partial unique index of active jobs, so
+        concurrent requests for one post end up with the same job.
+        """
+        if await session.get(Post, post_id) is None:
+            raise PostNotFound
+        insert_job = (
+            insert(ExplanationJob)
+            .values(post_id=post_id, status=JOB_PENDING, attempts=0)
+            .on_conflict_do_nothing(
+                index_elements=[ExplanationJob.post_id],
+                index_where=text(ACTIVE_JOB_CONDITION),
+            )
+            .returning(ExplanationJob)
+        )
+        active_job = select(ExplanationJob).where(
+            ExplanationJob.post_id == post_id,
+            ExplanationJob.status.in_((JOB_PENDING, JOB_RUNNING)),
+        )
+        while True:
+            job = (await session.execute(insert_job)).scalar_one_or_none()
+            if job is None:
+                # Lost to an active job; it may finish before we read it.
+                job = (await session.execute(active_job)).scalar_one_or_none()
+            if job is not None:
+                await session.commit()
+                return job
+
+    @staticmethod
+    async def get_job(session: AsyncSessionDep, job_id: int) -> ExplanationJob:
+        job = await session.get(ExplanationJob, job_id)
+        if job is None:
+            raise ExplanationJobNotFound
+        return job
+
+    @staticmethod
+    async def claim_job(session: AsyncSessionDep) -> Optional[ExplanationJob]:
+        """Mark the next due job as running and return it.
+
+        ``FOR UPDATE SKIP LOCKED`` lets any number of workers, in this process
+        or others, claim jobs concurrently without handing one job out twice.
+        """
+        next_job = (
+            select(ExplanationJob.id)
+            .where(
+                ExplanationJob.status == JOB_PENDING,
+                ExplanationJob.run_after <= func.now(),
+            )
+            .order_by(ExplanationJob.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(ExplanationJob)
+            .where(ExplanationJob.id == next_job)
+            .values(
+                status=JOB_RUNNING,
+                attempts=ExplanationJob.attempts + 1,
+                locked_at=func.now(),
+            )
+            .returning(ExplanationJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.scalar_one_or_none()
+        await session.commit()
+        return job
+
+    @staticmethod
+    async def complete_job(
+        session: AsyncSessionDep, job_id: int, result: Dict[str, Any]
+    ) -> None:
+        await session.execute(
+            update(ExplanationJob)
+            .where(ExplanationJob.id == job_id)
+            .values(status=JOB_DONE, result=result, error=None, locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    @staticmethod
+    async def fail_job(
+        session: AsyncSessionDep,
+        job_id: int,
+        error: str,
+        retry_in_seconds: Optional[float],
+    ) -> None:
+        """Record a failed attempt; retry after a delay or give up when it is None."""
+        values: Dict[str, Any] = {"error": error, "locked_at": None}
+        if retry_in_seconds is None:
+            values["status"] = JOB_FAILED
+        else:
+            values["status"] = JOB_PENDING
+            values["run_after"] = datetime.now(timezone.utc) + timedelta(
+                seconds=retry_in_seconds
+            )
+        await session.execute(
+            update(ExplanationJob)
+            .where(ExplanationJob.id == job_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    @staticmethod
+    async def requeue_stale_jobs(
+        session: AsyncSessionDep, stale_after_seconds: float, max_attempts: int
+    ) -> Tuple[int, int]:
+        """Return jobs left running by a crashed worker to the queue.
+
+        Jobs that already used `max_attempts` are marked failed instead, so a
+        post that crashes its worker is not retried forever. Returns the
+        number of requeued and of failed jobs.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+        exhausted = ExplanationJob.attempts >= max_attempts
+        result = await session.execute(
+            update(ExplanationJob)
+            .where(
+                ExplanationJob.status == JOB_RUNNING,
+                ExplanationJob.locked_at < cutoff,
+            )
+            .values(
+                status=case((exhausted, JOB_FAILED), else_=JOB_PENDING),
+                error=case(
+                    (exhausted, "Worker stopped during the last attempt"),
+                    else_=ExplanationJob.error,
+                ),
+                locked_at=None,
+                run_after=func.now(),
+            )
+            .returning(ExplanationJob.status)
+            .execution_options(synchronize_session=False)
+        )
+        statuses = result.scalars().all()
+        await session.commit()
+        return statuses.count(JOB_PENDING), statuses.count(JOB_FAILED)
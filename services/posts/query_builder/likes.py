@@ -1,66 +1,260 @@
-from typing import List
+import random
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Set, Tuple
 from sqlmodel import select
-from common.errors import EmptyQueryResult
-from models import PostLike, Post
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    RowMapping,
+    column,
+    delete,
+    func,
+    literal,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from common.errors import EmptyQueryResult, LikeAlreadyExists, LikeNotFound
+from models import PostLike, Post, PostLikeCounterShard
+from common.projection import schema_columns
+from services.posts.schemas.likes import LikedPostResponseSchema
 from services.posts.errors import PostNotFound
 from dependecies.session import AsyncSessionDep
+from common.cache import get_cache
+from common.cache.tags import post_tag
+from services.posts.query_builder.trending import LIKE_WEIGHT, TrendingQueryBuilder
 
 
 class PostLikesQueryBuilder:
-    @staticmethod
-    async def create_like_for_post(
-        session: AsyncSessionDep, user_id: int, post_id: int
-    ):
+    # Number of counter shards per post; 0 updates posts.number_of_likes directly.
+    counter_shards: int = 0
 
-        existing_like = await PostLikesQueryBuilder.get_post_like(
-            session, user_id, post_id
-        )
-        if existing_like:
-            return existing_like
-
-        post_query = select(Post).where(Post.id == post_id)
-        post_result = await session.execute(post_query)
-        post = post_result.scalar_one_or_none()
+    @staticmethod
+    def _apply_like_delta(changed_like, delta: int):
+        """Build the statement that adds `delta` to the counter of liked posts.
 
-        if not post:
-            raise PostNotFound
+        `changed_like` is a CTE returning the `post_id` and `created_at` of
+        the inserted or deleted like, so the like row and the counter change
+        in one round trip and an unlike removes the like's own score event.
+        """
+        if PostLikesQueryBuilder.counter_shards:
+            shard_insert = insert(PostLikeCounterShard).from_select(
+                ["post_id", "shard", "delta"],
+                select(
+                    changed_like.c.post_id,
+                    literal(random.randrange(PostLikesQueryBuilder.counter_shards)),
+                    literal(delta),
+                ),
+            )
+            return shard_insert.on_conflict_do_update(
+                index_elements=["post_id", "shard"],
+                set_={
+                    "delta": PostLikeCounterShard.delta + shard_insert.excluded.delta
+                },
+            ).returning(PostLikeCounterShard.post_id)
 
-        like = PostLike(
-            user_id=user_id,
-            post_id=post_id,
+        return (
+            update(Post)
+            .where(Post.id == changed_like.c.post_id)
+            .values(
+                number_of_likes=func.greatest(Post.number_of_likes + delta, 0),
+                hot_score=TrendingQueryBuilder.score_after_event(
+                    Post.hot_score, delta * LIKE_WEIGHT, changed_like.c.created_at
+                ),
+            )
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
         )
-        session.add(like)
-
-        post.number_of_likes += 1
 
+    @staticmethod
+    async def create_like_for_post(
+        session: AsyncSessionDep, user_id: int, post_id: int
+    ) -> None:
+        inserted_like = (
+            insert(PostLike)
+            .values(user_id=user_id, post_id=post_id)
+            .on_conflict_do_nothing()
+            .returning(PostLike.post_id, PostLike.created_at)
+            .cte("inserted_like")
+        )
+        try:
+            result = await session.execute(
+                PostLikesQueryBuilder._apply_like_delta(inserted_like, 1)
+            )
+        except IntegrityError:
+            await session.rollback()
+            raise PostNotFound
+        changed = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(like)
-        await session.refresh(post)
-        return like
+
+        if changed is None:
+            raise LikeAlreadyExists
+        await get_cache().invalidate_tags(post_tag(post_id))
 
     @staticmethod
     async def delete_like_from_post(
         session: AsyncSessionDep, post_id: int, user_id: int
-    ):
-        like = await PostLikesQueryBuilder.get_post_like(session, user_id, post_id)
-        if not like:
-            raise EmptyQueryResult("Like not found")
+    ) -> None:
+        deleted_like = (
+            delete(PostLike)
+            .where(PostLike.post_id == post_id, PostLike.user_id == user_id)
+            .returning(PostLike.post_id, PostLike.created_at)
+            .cte("deleted_like")
+        )
+        result = await session.execute(
+            PostLikesQueryBuilder._apply_like_delta(deleted_like, -1)
+        )
+        changed = result.scalar_one_or_none()
+        await session.commit()
 
-        post_query = select(Post).where(Post.id == post_id)
-        post_result = await session.execute(post_query)
-        post = post_result.scalar_one_or_none()
+        if changed is None:
+            raise LikeNotFound
+        await get_cache().invalidate_tags(post_tag(post_id))
 
-        if not post:
-            raise EmptyQueryResult("Post not found")
+    @staticmethod
+    async def apply_like_batch(
+        session: AsyncSessionDep,
+        likes: Iterable[Tuple[int, int]],
+        unlikes: Iterable[Tuple[int, int]],
+    ) -> Dict[int, int]:
+        """Apply many `(user_id, post_id)` likes and unlikes with bulk statements.
+
+        Likes for missing posts and duplicate likes are skipped. Counters are
+        adjusted by the rows actually inserted or deleted, in a single
+        ``UPDATE ... FROM (VALUES ...)``; the deleted likes of a post leave
+        its score as one event at their combined time. Returns the applied
+        delta per post.
+        """
+        likes, unlikes = list(likes), list(unlikes)
+        added: Dict[int, int] = {}
+        removed: Dict[int, List[datetime]] = {}
 
-        await session.delete(like)
+        if likes:
+            requested = values(
+                column("user_id", Integer), column("post_id", Integer), name="requested"
+            ).data(likes)
+            result = await session.execute(
+                insert(PostLike)
+                .from_select(
+                    ["user_id", "post_id", "created_at"],
+                    select(requested.c.user_id, requested.c.post_id, func.now()).join(
+                        Post, Post.id == requested.c.post_id
+                    ),
+                )
+                .on_conflict_do_nothing()
+                .returning(PostLike.post_id)
+            )
+            for post_id in result.scalars():
+                added[post_id] = added.get(post_id, 0) + 1
 
-        if post.number_of_likes > 0:
-            post.number_of_likes -= 1
+        if unlikes:
+            result = await session.execute(
+                delete(PostLike)
+                .where(tuple_(PostLike.user_id, PostLike.post_id).in_(unlikes))
+                .returning(PostLike.post_id, PostLike.created_at)
+            )
+            now = datetime.now(timezone.utc)
+            for post_id, created_at in result:
+                removed.setdefault(post_id, []).append(created_at or now)
 
+        changed = []
+        for post_id in added.keys() | removed.keys():
+            removed_at = removed.get(post_id, [])
+            changed.append(
+                (
+                    post_id,
+                    added.get(post_id, 0),
+                    len(removed_at),
+                    (
+                        TrendingQueryBuilder.combined_event_time(removed_at)
+                        if removed_at
+                        else None
+                    ),
+                )
+            )
+        deltas = {
+            post_id: plus - minus
+            for post_id, plus, minus, _ in changed
+            if plus != minus
+        }
+        if changed:
+            changes = values(
+                column("id", Integer),
+                column("added", Integer),
+                column("removed", Integer),
+                column("removed_at", DateTime(timezone=True)),
+                name="changes",
+            ).data(changed)
+            await session.execute(
+                update(Post)
+                .where(Post.id == changes.c.id)
+                .values(
+                    number_of_likes=func.greatest(
+                        Post.number_of_likes + changes.c.added - changes.c.removed,
+                        0,
+                    ),
+                    hot_score=TrendingQueryBuilder.score_after_event(
+                        TrendingQueryBuilder.score_after_event(
+                            Post.hot_score, changes.c.added * LIKE_WEIGHT
+                        ),
+                        -changes.c.removed * LIKE_WEIGHT,
+                        changes.c.removed_at,
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
         await session.commit()
-        await session.refresh(post)
+        await get_cache().invalidate_tags(
+            *(post_tag(post_id) for post_id, _, _, _ in changed)
+        )
+        return deltas
+
+    @staticmethod
+    async def fold_like_counter_shards(session: AsyncSessionDep) -> None:
+        """Move pending shard deltas into posts.number_of_likes in one statement."""
+        folded = (
+            delete(PostLikeCounterShard)
+            .returning(PostLikeCounterShard.post_id, PostLikeCounterShard.delta)
+            .cte("folded")
+        )
+        totals = (
+            select(folded.c.post_id, func.sum(folded.c.delta).label("delta"))
+            .group_by(folded.c.post_id)
+            .subquery()
+        )
+        result = await session.execute(
+            update(Post)
+            .where(Post.id == totals.c.post_id)
+            .values(
+                number_of_likes=func.greatest(Post.number_of_likes + totals.c.delta, 0),
+                # Sharded likes enter the score when folded, not when made.
+                hot_score=TrendingQueryBuilder.score_after_event(
+                    Post.hot_score, totals.c.delta * LIKE_WEIGHT
+                ),
+            )
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        )
+        post_ids = result.scalars().all()
+        await session.commit()
+        await get_cache().invalidate_tags(*(post_tag(post_id) for post_id in post_ids))
+
+    @staticmethod
+    async def get_liked_post_ids(
+        session: AsyncSessionDep, user_id: int, post_ids: Iterable[int]
+    ) -> Set[int]:
+        """Return which of `post_ids` the user has liked, in one primary-key lookup."""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return set()
+        result = await session.execute(
+            select(PostLike.post_id).where(
+                PostLike.user_id == user_id, PostLike.post_id.in_(post_ids)
+            )
+        )
+        return set(result.scalars())
 
     @staticmethod
     async def get_post_like(session: AsyncSessionDep, user_id: int, post_id: int):
@@ -72,19 +266,21 @@ class PostLikesQueryBuilder:
         return like
 
     @staticmethod
-    async def get_user_post_likes(session: AsyncSessionDep, user_id: int):
-
+    async def get_user_post_likes(
+        session: AsyncSessionDep, user_id: int
+    ) -> List[RowMapping]:
+        """Return liked posts as rows with exactly LikedPostResponseSchema's fields."""
         query = (
-            select(PostLike)
-            .where(PostLike.user_id == user_id)
-            .options(
-                selectinload(PostLike.post).selectinload(Post.author),
-                selectinload(PostLike.post).selectinload(Post.comments),
-                selectinload(PostLike.post).selectinload(Post.likes),
+            select(
+                *schema_columns(
+                    LikedPostResponseSchema, Post, liked_at=PostLike.created_at
+                )
             )
+            .join(PostLike, PostLike.post_id == Post.id)
+            .where(PostLike.user_id == user_id)
         )
         result = await session.execute(query)
-        likes = result.scalars().all()
+        likes = result.mappings().all()
         if not likes:
             raise EmptyQueryResult
         return likes
@@ -1,48 +1,89 @@
-from typing import List, Optional
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Tuple
 from sqlmodel import select
-from sqlalchemy import Select, and_, or_
+from sqlalchemy import RowMapping, Select, and_, or_
 
 from common.errors import EmptyQueryResult
 from dependecies.session import AsyncSessionDep
 from models import Post
-from services.posts.schemas import PostCreateSchema, PostUpdateSchema
+from services.posts.schemas import (
+    PostCreateSchema,
+    PostResponseSchema,
+    PostUpdateSchema,
+)
+from common.cache import get_cache
+from common.cache.tags import (
+    POSTS_LIST_TAG,
+    explanation_tag,
+    post_comments_tag,
+    post_tag,
+)
 from common.schemas import PaginationParams
+from common.pagination import paginate, split_page
+from common.projection import schema_columns
 from services.posts.schemas.filters import PostFilter
-from sqlalchemy.orm import selectinload
 from services.posts.errors import PostNotFound
 from common.errors import UnauthorizedAccess
-import httpx
-from fastapi import HTTPException
+from services.posts.modules.explainer import PostExplainer
+from services.feed.query_builder.timeline import TimelineQueryBuilder
+from services.posts.query_builder.trending import TrendingQueryBuilder
 
 
 class PostQueryBuilder:
 
     @staticmethod
-    async def get_posts_pagination(
-        session, pagination_params, filters: Optional[PostFilter] = None, current_user_id: int = None
-    ) -> List[Post]:
-        query_offset, query_limit = (
-            pagination_params.page * pagination_params.size,
-            pagination_params.size,
+    def build_posts_page_query(
+        pagination_params, filters: Optional[PostFilter] = None, current_user_id: int = None
+    ) -> Select:
+        return paginate(
+            PostQueryBuilder.apply_filters(select(Post), filters, current_user_id),
+            pagination_params,
+            Post.created_at,
+            Post.id,
         )
 
+    @staticmethod
+    async def get_posts_pagination(
+        session, pagination_params, filters: Optional[PostFilter] = None, current_user_id: int = None
+    ) -> Tuple[List[PostResponseSchema], Optional[str]]:
         
         if filters and filters.is_published is False and current_user_id is None:
             
             raise EmptyQueryResult
 
-        select_query = (
-            PostQueryBuilder.apply_filters(select(Post), filters, current_user_id)
-            .offset(query_offset)
-            .limit(query_limit)
+        async def load_page():
+            select_query = PostQueryBuilder.build_posts_page_query(
+                pagination_params, filters, current_user_id
+            )
+            result = await session.execute(select_query)
+            posts, next_cursor = split_page(result.scalars().all(), pagination_params)
+            if not posts:
+                raise EmptyQueryResult
+            return {
+                "items": [
+                    PostResponseSchema.model_validate(post).model_dump(mode="json")
+                    for post in posts
+                ],
+                "next_cursor": next_cursor,
+            }
+
+        cache_key = "posts:" + json.dumps(
+            [
+                filters.model_dump() if filters else None,
+                pagination_params.model_dump(),
+                current_user_id,
+            ],
+            sort_keys=True,
         )
-        
-        result = await session.execute(select_query)
-        posts = result.scalars().all()
-        
-        if not posts:
-            raise EmptyQueryResult
-        return posts
+        page = await get_cache().get_or_load(
+            cache_key,
+            load_page,
+            tags=lambda page: [POSTS_LIST_TAG]
+            + [post_tag(item["id"]) for item in page["items"]],
+        )
+        posts = [PostResponseSchema.model_validate(item) for item in page["items"]]
+        return posts, page["next_cursor"]
 
     @staticmethod
     def apply_filters(select_query, filters: Optional[PostFilter] = None, current_user_id: int = None) -> Select:
@@ -99,13 +140,21 @@ class PostQueryBuilder:
         return select_query
 
     @staticmethod
-    async def get_post_by_id(session: AsyncSessionDep, post_id: int) -> Post:
-        query = select(Post).where(Post.id == post_id)
-        result = await session.execute(query)
-        post = result.scalar_one_or_none()
-        if not post:
-            raise PostNotFound
-        return post
+    async def get_post_by_id(
+        session: AsyncSessionDep, post_id: int
+    ) -> PostResponseSchema:
+        async def load_post():
+            query = select(Post).where(Post.id == post_id)
+            result = await session.execute(query)
+            post = result.scalar_one_or_none()
+            if not post:
+                raise PostNotFound
+            return PostResponseSchema.model_validate(post).model_dump(mode="json")
+
+        data = await get_cache().get_or_load(
+            f"post:{post_id}", load_post, tags=lambda _: [post_tag(post_id)]
+        )
+        return PostResponseSchema.model_validate(data)
 
     @staticmethod
     async def get_post_by_content(
@@ -153,11 +202,19 @@ class PostQueryBuilder:
     ):
         post_dict = post_data.model_dump()
         post_dict["author_id"] = user_id
+        post_dict["created_at"] = datetime.now(timezone.utc)
+        post_dict["hot_score"] = TrendingQueryBuilder.initial_score(
+            post_dict["created_at"]
+        )
 
         post = Post(**post_dict)
         session.add(post)
+        await session.flush()
+        if post.is_published:
+            await TimelineQueryBuilder.fan_out_post(session, post.id)
         await session.commit()
         await session.refresh(post)
+        await get_cache().invalidate_tags(POSTS_LIST_TAG)
         return post
 
     @staticmethod
@@ -168,10 +225,18 @@ class PostQueryBuilder:
         user_id: int,
     ) -> Post:
         post = await PostQueryBuilder.get_post_by_id_check(session, post_id, user_id)
+        was_published = post.is_published
         for key, value in post_data.model_dump(exclude_unset=True).items():
             setattr(post, key, value)
+        if post.is_published and not was_published:
+            await TimelineQueryBuilder.fan_out_post(session, post.id)
+        elif was_published and not post.is_published:
+            await TimelineQueryBuilder.remove_post(session, post.id)
         await session.commit()
         await session.refresh(post)
+        await get_cache().invalidate_tags(
+            post_tag(post_id), explanation_tag(post_id), POSTS_LIST_TAG
+        )
         return post
 
     @staticmethod
@@ -179,20 +244,23 @@ class PostQueryBuilder:
         post = await PostQueryBuilder.get_post_by_id_check(session, post_id, user_id)
         await session.delete(post)
         await session.commit()
+        await get_cache().invalidate_tags(
+            post_tag(post_id),
+            post_comments_tag(post_id),
+            explanation_tag(post_id),
+            POSTS_LIST_TAG,
+        )
 
     @staticmethod
-    async def get_posts_by_user(session: AsyncSessionDep, user_id: int) -> List[Post]:
-        select_query = (
-            select(Post)
-            .where(Post.author_id == user_id)
-            .options(
-                selectinload(Post.author),
-                selectinload(Post.comments),
-                selectinload(Post.likes),
-            )
+    async def get_posts_by_user(
+        session: AsyncSessionDep, user_id: int
+    ) -> List[RowMapping]:
+        """Return the user's posts as rows with exactly PostResponseSchema's fields."""
+        select_query = select(*schema_columns(PostResponseSchema, Post)).where(
+            Post.author_id == user_id
         )
         query_result = await session.execute(select_query)
-        posts = list(query_result.scalars())
+        posts = query_result.mappings().all()
 
         if not posts:
             raise EmptyQueryResult
@@ -201,32 +269,23 @@ class PostQueryBuilder:
     @staticmethod
     async def get_user_noted_posts(
         session: AsyncSessionDep, user_id: int, pagination_params: PaginationParams
-    ) -> List[Post]:
-        query_offset, query_limit = (
-            pagination_params.page * pagination_params.size,
-            pagination_params.size,
-        )
-
-        select_query = (
-            select(Post)
+    ) -> Tuple[List[RowMapping], Optional[str]]:
+        select_query = paginate(
+            select(*schema_columns(PostResponseSchema, Post))
             .where(Post.author_id == user_id)
-            .where(Post.is_published == False)
-            .offset(query_offset)
-            .limit(query_limit)
-            .options(
-                selectinload(Post.author),
-                selectinload(Post.comments),
-                selectinload(Post.likes),
-            )
+            .where(Post.is_published == False),
+            pagination_params,
+            Post.created_at,
+            Post.id,
         )
 
         result = await session.execute(select_query)
-        posts = result.scalars().all()
+        rows, next_cursor = split_page(result.all(), pagination_params)
 
-        if not posts:
+        if not rows:
             raise EmptyQueryResult
 
-        return posts
+        return [row._mapping for row in rows], next_cursor
 
     @staticmethod
     async def get_post_by_id_check(
@@ -242,50 +301,22 @@ class PostQueryBuilder:
         return post
 
     @staticmethod
-    async def explain_post(session: AsyncSessionDep, post_id: int):
-        post = await PostQueryBuilder.get_post_by_id(session, post_id)
-        if not post:
-            raise PostNotFound
-        """Generates an explanation for a specific post using an external AI service.
-        
-        Retrieves the post by ID and sends its content to an AI model for explanation.
-
-        Args:
-            session: The asynchronous database session dependency.
-            post_id: The ID of the post to explain.
-
-        Returns:
-            dict: The response from the AI model containing the explanation.
+    async def explain_post(
+        session: AsyncSessionDep, post_id: int, explainer: PostExplainer
+    ):
+        """Return an explanation of the post from the explanation service.
 
         Raises:
             PostNotFound: If the post with the given ID does not exist.
-            HTTPException: If the external AI service returns an error.
+            ExplanationFailed: If the explanation service returns an error.
         """
+        post = await PostQueryBuilder.get_post_by_id(session, post_id)
+        return await explainer.explain(post.id, post.title, post.content)
 
-        post_insides: str = (
-            f"Title of the post {post.title}, content of the post {post.content}"
-        )
-
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                "http://localhost:11434/v1/chat/completions",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "model": "mistral",
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": f"Explain this post: {post_insides}",
-                        }
-                    ],
-                    "stream": False,
-                },
-            )
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Mistral API error: {response.text}",
-                )
\ No newline at end of file
+    @staticmethod
+    async def stream_post_explanation(
+        session: AsyncSessionDep, post_id: int, explainer: PostExplainer
+    ) -> AsyncIterator[bytes]:
+        """Load the post and return an SSE stream of its explanation."""
+        post = await PostQueryBuilder.get_post_by_id(session, post_id)
+        return explainer.stream(post.id, post.title, post.content)
@@ -0,0 +1,96 @@
+from typing import List, Optional
+
+from sqlalchemy import func, literal_column
+from sqlmodel import select
+
+from common.errors import EmptyQueryResult
+from common.schemas import PaginationParams
+from dependecies.session import AsyncSessionDep
+from models import Post
+from models.post import SEARCH_CONFIG
+from services.posts.query_builder.posts import PostQueryBuilder
+from services.posts.schemas import PostFilter, PostSearchResultSchema
+
+SEARCH_REGCONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+)
+HTML_ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("'", "&#x27;"),
+)
+
+
+def html_escape(column):
+    """Escape `column` in SQL so `<mark>` is the only markup in a headline."""
+    for char, entity in HTML_ESCAPES:
+        column = func.replace(column, char, entity)
+    return column
+
+
+class PostSearchQueryBuilder:
+
+    @staticmethod
+    async def search_posts(
+        session: AsyncSessionDep,
+        term: str,
+        pagination_params: PaginationParams,
+        current_user_id: Optional[int] = None,
+    ) -> List[PostSearchResultSchema]:
+        """Full-text search over post titles and contents, best matches first.
+
+        Matching and ranking run against the GIN-indexed ``search_vector``;
+        highlight snippets are only built for the rows of the requested page.
+        The snippets are HTML-escaped post text with matches wrapped in
+        ``<mark>``, so they are safe to insert as markup.
+        """
+        search_vector = Post.__table__.c.search_vector
+        ts_query = func.websearch_to_tsquery(SEARCH_REGCONFIG, term)
+        rank = func.ts_rank_cd(search_vector, ts_query).label("rank")
+
+        ranked = (
+            PostQueryBuilder.apply_filters(
+                select(Post.id, rank), PostFilter(), current_user_id
+            )
+            .where(search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), Post.id.desc())
+            .offset(pagination_params.page * pagination_params.size)
+            .limit(pagination_params.size)
+            .subquery()
+        )
+
+        query = (
+            select(
+                Post.id,
+                Post.title,
+                Post.content,
+                Post.author_id,
+                Post.created_at,
+                Post.is_published,
+                Post.number_of_likes,
+                ranked.c.rank,
+                func.ts_headline(
+                    SEARCH_REGCONFIG,
+                    html_escape(Post.title),
+                    ts_query,
+                    HEADLINE_OPTIONS,
+                ).label("title_highlight"),
+                func.ts_headline(
+                    SEARCH_REGCONFIG,
+                    html_escape(Post.content),
+                    ts_query,
+                    HEADLINE_OPTIONS,
+                ).label("content_highlight"),
+            )
+            .join(ranked, ranked.c.id == Post.id)
+            .order_by(ranked.c.rank.desc(), Post.id.desc())
+        )
+
+        result = await session.execute(query)
+        rows = result.mappings().all()
+        if not rows:
+            raise EmptyQueryResult
+        return [PostSearchResultSchema.model_validate(row) for row in rows]
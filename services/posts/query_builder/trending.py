@@ -0,0 +1,171 @@
+import json
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Union
+
+from sqlalchemy import Float, case, cast, delete, func, insert, literal
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import select
+
+from common.cache import get_cache
+from common.cache.tags import TRENDING_TAG, post_tag
+from common.errors import EmptyQueryResult
+from common.projection import schema_columns
+from db.locks import try_advisory_xact_lock
+from dependecies.session import AsyncSessionDep
+from models import Post, TrendingPost
+from services.posts.schemas import PostResponseSchema
+
+# Scores are logs of sum(weight * exp((t - TRENDING_EPOCH) / TRENDING_TAU))
+# over a post's events, so an event's contribution halves every half-life
+# relative to newer ones without any score ever being rewritten for decay.
+TRENDING_EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+TRENDING_HALF_LIFE_SECONDS = 12 * 3600
+TRENDING_TAU = TRENDING_HALF_LIFE_SECONDS / math.log(2)
+POST_WEIGHT = 1.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+EXP_FLOOR = -700.0
+
+
+class TrendingQueryBuilder:
+    # Set from TrendingSettings in the application lifespan.
+    top_k: int = 100
+
+    @staticmethod
+    def initial_score(created_at: datetime) -> float:
+        return (
+            math.log(POST_WEIGHT)
+            + (created_at.timestamp() - TRENDING_EPOCH) / TRENDING_TAU
+        )
+
+    @staticmethod
+    def combined_event_time(timestamps: Iterable[datetime]) -> datetime:
+        """Return when one event of weight n is worth the n events at `timestamps`.
+
+        Lets a batch remove several events of one post as a single event.
+        """
+        exponents = [
+            (timestamp.timestamp() - TRENDING_EPOCH) / TRENDING_TAU
+            for timestamp in timestamps
+        ]
+        top = max(exponents)
+        combined = top + math.log(sum(math.exp(x - top) for x in exponents))
+        return datetime.fromtimestamp(
+            TRENDING_EPOCH
+            + TRENDING_TAU * (combined - math.log(len(exponents))),
+            timezone.utc,
+        )
+
+    @staticmethod
+    def score_after_event(
+        score: ColumnElement,
+        weight: Union[float, ColumnElement],
+        at: Union[datetime, ColumnElement, None] = None,
+    ) -> ColumnElement:
+        """Return `score` with an event of `weight` at time `at` folded in.
+
+        Positive weights are added and negative ones removed in log space
+        (``logaddexp`` / ``logsubexp``), so likes and comments update the
+        score in the same ``UPDATE`` that changes their counters. `at`
+        defaults to now; removals pass the removed row's ``created_at`` so
+        they subtract exactly what its addition added. A removal never takes
+        the score below what the post's other events account for.
+        """
+        if at is None:
+            at_epoch = cast(func.extract("epoch", func.now()), Float)
+        elif isinstance(at, datetime):
+            at_epoch = literal(at.timestamp(), Float)
+        else:
+            at_epoch = cast(
+                func.extract("epoch", func.coalesce(at, func.now())), Float
+            )
+        if isinstance(weight, (int, float)):
+            if not weight:
+                return score
+            magnitude = literal(math.log(abs(weight)), Float)
+        else:
+            magnitude = func.ln(func.abs(weight))
+        event = magnitude + (at_epoch - TRENDING_EPOCH) / TRENDING_TAU
+
+        # Postgres raises on exp() underflow, and beyond EXP_FLOOR the
+        # smaller term no longer changes a double anyway.
+        added = func.greatest(score, event) + func.ln(
+            1 + func.exp(func.greatest(-func.abs(score - event), EXP_FLOOR))
+        )
+        removed = case(
+            (
+                score > event + 1e-9,
+                score + func.ln(1 - func.exp(func.greatest(event - score, EXP_FLOOR))),
+            ),
+            else_=score,
+        )
+        if isinstance(weight, (int, float)):
+            return added if weight > 0 else removed
+        return case((weight > 0, added), (weight < 0, removed), else_=score)
+
+    @staticmethod
+    async def refresh_trending_posts(session: AsyncSessionDep) -> None:
+        """Rebuild the top-K table from ``ix_posts_hot_score`` in one transaction.
+
+        Every worker process schedules this; an advisory lock lets one rebuild
+        run at a time, and the others skip their turn.
+        """
+        if not await try_advisory_xact_lock(session, "refresh-trending-posts"):
+            return
+        top = (
+            select(
+                func.row_number()
+                .over(order_by=(Post.hot_score.desc(), Post.id.desc()))
+                .label("rank"),
+                Post.id,
+                Post.hot_score,
+            )
+            .where(Post.is_published == True)
+            .order_by(Post.hot_score.desc(), Post.id.desc())
+            .limit(TrendingQueryBuilder.top_k)
+        )
+        await session.execute(delete(TrendingPost))
+        await session.execute(
+            insert(TrendingPost).from_select(["rank", "post_id", "hot_score"], top)
+        )
+        await session.commit()
+        await get_cache().invalidate_tags(TRENDING_TAG)
+
+    @staticmethod
+    async def get_trending_posts(
+        session: AsyncSessionDep, page: int, size: int
+    ) -> List[Dict[str, Any]]:
+        """Return a slice of the top-K snapshot by rank, a primary-key range read.
+
+        Posts unpublished since the last refresh are skipped, so a page can be
+        shorter than `size` until the snapshot is rebuilt.
+        """
+
+        async def load_trending():
+            query = (
+                select(*schema_columns(PostResponseSchema, Post))
+                .join(TrendingPost, TrendingPost.post_id == Post.id)
+                .where(
+                    TrendingPost.rank > page * size,
+                    TrendingPost.rank <= (page + 1) * size,
+                    Post.is_published == True,
+                )
+                .order_by(TrendingPost.rank)
+            )
+            result = await session.execute(query)
+            posts = [
+                PostResponseSchema.model_validate(dict(row)).model_dump(mode="json")
+                for row in result.mappings()
+            ]
+            if not posts:
+                raise EmptyQueryResult
+            return posts
+
+        cache_key = "posts:trending:" + json.dumps([page, size])
+        return await get_cache().get_or_load(
+            cache_key,
+            load_trending,
+            tags=lambda posts: [TRENDING_TAG]
+            + [post_tag(post["id"]) for post in posts],
+        )
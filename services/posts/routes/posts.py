@@ -1,34 +1,65 @@
 from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Annotated
 
 from dependecies import session
-from dependecies.session import AsyncSessionDep
+from dependecies.session import AsyncSessionDep, ReadSessionDep
+from dependecies.likes import LikeBufferDep
+from dependecies.explainer import PostExplainerDep
+from dependecies.instrumentation import query_budget
 from models import Post, post
 from models.user import User
 from services.posts.schemas import (
     PostCreateSchema,
+    PostFeedItemSchema,
+    PostFeedResponseSchema,
     PostListResponseSchema,
     PostResponseSchema,
     PostUpdateSchema,
 )
-from common.schemas import PaginationParams
+from common.schemas import (
+    MAX_PAGE_SIZE,
+    LikeBatchResponseSchema,
+    LikeBatchSchema,
+    PaginationParams,
+)
+from services.posts.modules.like_buffer import POST
 from services.posts.schemas.filters import PostFilter
-from services.posts.query_builder import PostQueryBuilder, PostLikesQueryBuilder
+from services.posts.query_builder import (
+    PostQueryBuilder,
+    PostLikesQueryBuilder,
+    PostSearchQueryBuilder,
+    ExplanationJobQueryBuilder,
+    TrendingQueryBuilder,
+)
 from common import EmptyQueryResult
-from services.users.modules.manager import current_active_user
+from services.users.modules.manager import current_active_reader, current_active_user
 
-from services.posts.errors import PostNotFound
-from common.errors import UnauthorizedAccess
+from services.posts.errors import (
+    ExplanationFailed,
+    ExplanationJobNotFound,
+    PostNotFound,
+)
+from common.errors import UnauthorizedAccess, InvalidCursor, LikeNotFound
+from services.posts.errors import LikeAlreadyExists
 from pydantic import ValidationError
 from services.posts.schemas import LikedPostsListResponseSchema, LikedPostResponseSchema
+from services.posts.schemas import PostSearchListResponseSchema
+from services.posts.schemas import ExplanationJobResponseSchema
+from common.responses import RowsResponse
 
 post_router = APIRouter()
 
 
 
-@post_router.get("/posts", response_model=PostListResponseSchema)
+@post_router.get(
+    "/posts",
+    response_model=PostFeedResponseSchema,
+    dependencies=[Depends(query_budget(3))],
+)
 async def get_posts(
     session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
     current_user: Annotated[User, Depends(current_active_user)],
     pagination_params: Annotated[PaginationParams, Depends()],
     post_name: str = Query(None, description="Find post by title"),
@@ -46,12 +77,21 @@ async def get_posts(
             is_published=is_published,
         )
 
-        posts = await PostQueryBuilder.get_posts_pagination(
+        posts, next_cursor = await PostQueryBuilder.get_posts_pagination(
             session, pagination_params, filters, current_user.id
         )
 
-        post_schemas = [PostResponseSchema.model_validate(post) for post in posts]
-        return PostListResponseSchema(items=post_schemas)
+        post_ids = [post.id for post in posts]
+        liked = await PostLikesQueryBuilder.get_liked_post_ids(
+            session, current_user.id, post_ids
+        )
+        if like_buffer is not None:
+            liked = like_buffer.overlay_liked(POST, current_user.id, post_ids, liked)
+        items = [
+            PostFeedItemSchema(**post.model_dump(), liked_by_me=post.id in liked)
+            for post in posts
+        ]
+        return PostFeedResponseSchema(items=items, next_cursor=next_cursor)
 
     except EmptyQueryResult:
         raise HTTPException(
@@ -60,23 +100,66 @@ async def get_posts(
         )
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+@post_router.get("/posts/search", response_model=PostSearchListResponseSchema)
+async def search_posts(
+    session: ReadSessionDep,
+    current_user: Annotated[User, Depends(current_active_reader)],
+    pagination_params: Annotated[PaginationParams, Depends()],
+    q: str = Query(..., min_length=1, max_length=100, description="Search query"),
+):
+    try:
+        items = await PostSearchQueryBuilder.search_posts(
+            session, q, pagination_params, current_user.id
+        )
+        return PostSearchListResponseSchema(items=items)
+    except EmptyQueryResult:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No posts found matching the query",
+        )
 
 
-@post_router.get("/posts/my")
+@post_router.get(
+    "/posts/my", response_model=PostListResponseSchema, response_class=RowsResponse
+)
 async def get_my_posts(
     session: AsyncSessionDep, user: User = Depends(current_active_user)
-) -> PostListResponseSchema:
+):
     try:
         posts = await PostQueryBuilder.get_posts_by_user(session, user.id)
-        return PostListResponseSchema(
-            firstName=user.first_name, secondName=user.second_name, items=posts
+        return RowsResponse(
+            {
+                "firstName": user.first_name,
+                "secondName": user.second_name,
+                "items": posts,
+                "next_cursor": None,
+            }
         )
     except EmptyQueryResult:
         raise HTTPException(
-            status_code=status.HTTP_204_NOT_FOUND,
+            status_code=status.HTTP_204_NO_CONTENT,
             detail="You don't have any posts yet"
         )
 
+@post_router.get("/posts/trending", response_model=PostListResponseSchema)
+async def get_trending_posts(
+    session: ReadSessionDep,
+    page: int = Query(0, ge=0),
+    size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+):
+    try:
+        posts = await TrendingQueryBuilder.get_trending_posts(session, page, size)
+        return PostListResponseSchema(items=posts)
+    except EmptyQueryResult:
+        raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @post_router.get("/posts/{post_id}", response_model=PostResponseSchema)
 async def get_post_by_id(post_id: int, session: AsyncSessionDep):
     try:
@@ -131,76 +214,156 @@ async def update_post(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
 
-@post_router.post("/posts/likes/{post_id}", status_code=status.HTTP_201_CREATED)
+@post_router.post(
+    "/posts/likes/batch",
+    response_model=LikeBatchResponseSchema,
+    dependencies=[Depends(query_budget(4))],
+)
+async def batch_like_posts(
+    session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
+    batch: LikeBatchSchema,
+    current_user: User = Depends(current_active_user),
+):
+    if set(batch.like) & set(batch.unlike):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A post cannot be liked and unliked in one batch",
+        )
+    if like_buffer is not None:
+        for post_id in batch.like:
+            like_buffer.like_post(current_user.id, post_id)
+        for post_id in batch.unlike:
+            like_buffer.unlike_post(current_user.id, post_id)
+        return LikeBatchResponseSchema(liked=batch.like, unliked=batch.unlike)
+    deltas = await PostLikesQueryBuilder.apply_like_batch(
+        session,
+        [(current_user.id, post_id) for post_id in set(batch.like)],
+        [(current_user.id, post_id) for post_id in set(batch.unlike)],
+    )
+    return LikeBatchResponseSchema.from_deltas(deltas)
+
+
+@post_router.post(
+    "/posts/likes/{post_id}",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(2))],
+)
 async def like_post(
     session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
     post_id: int,
     current_user: User = Depends(current_active_user),
 ):
+    if like_buffer is not None:
+        like_buffer.like_post(current_user.id, post_id)
+        return {"message": "Liked this post"}
     try:
-        existing_like = await PostLikesQueryBuilder.get_post_like(
-            session, current_user.id, post_id
-        )
-        if existing_like:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="You have already liked this post",
-            )
-
-        like = await PostLikesQueryBuilder.create_like_for_post(
+        await PostLikesQueryBuilder.create_like_for_post(
             session, current_user.id, post_id
         )
         return {"message": "Liked this post"}
+    except LikeAlreadyExists:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already liked this post",
+        )
     except PostNotFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
 
-@post_router.get("/posts/likes/my", response_model=LikedPostsListResponseSchema)
+@post_router.get(
+    "/posts/likes/my",
+    response_model=LikedPostsListResponseSchema,
+    response_class=RowsResponse,
+    dependencies=[Depends(query_budget(2))],
+)
 async def get_my_post_likes(
     session: AsyncSessionDep, user: User = Depends(current_active_user)
 ):
     try:
         likes = await PostLikesQueryBuilder.get_user_post_likes(session, user.id)
-
-        liked_posts = []
-        for like in likes:
-            post = like.post
-            liked_posts.append(
-                LikedPostResponseSchema(
-                    id=post.id,
-                    title=post.title,
-                    content=post.content,
-                    author_id=post.author_id,
-                    created_at=post.created_at,
-                    is_published=post.is_published,
-                    number_of_likes=post.number_of_likes,
-                    liked_at=like.created_at,
-                )
-            )
-
-        return LikedPostsListResponseSchema(items=liked_posts)
+        return RowsResponse({"items": likes})
     except EmptyQueryResult:
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@post_router.delete("/post/likes/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+@post_router.delete(
+    "/post/likes/{post_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(query_budget(2))],
+)
 async def unlike_post(
-    session: AsyncSessionDep, post_id: int, user: User = Depends(current_active_user)
+    session: AsyncSessionDep,
+    like_buffer: LikeBufferDep,
+    post_id: int,
+    user: User = Depends(current_active_user),
 ):
+    if like_buffer is not None:
+        like_buffer.unlike_post(user.id, post_id)
+        return
     try:
 
         await PostLikesQueryBuilder.delete_like_from_post(session, post_id, user.id)
+    except LikeNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Like not found"
+        )
+
+
+@post_router.post(
+    "/post/explain/{post_id}/jobs",
+    response_model=ExplanationJobResponseSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def queue_post_explanation(
+    session: AsyncSessionDep,
+    post_id: int,
+    user: User = Depends(current_active_user),
+):
+    try:
+        return await ExplanationJobQueryBuilder.create_job(session, post_id)
     except PostNotFound:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+
+
+@post_router.get(
+    "/post/explain/jobs/{job_id}", response_model=ExplanationJobResponseSchema
+)
+async def get_post_explanation_job(
+    session: AsyncSessionDep,
+    job_id: int,
+    user: User = Depends(current_active_user),
+):
+    try:
+        return await ExplanationJobQueryBuilder.get_job(session, job_id)
+    except ExplanationJobNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
 
 
 @post_router.get("/post/explain/{post_id}")
-async def explain_meaning_of_post(session: AsyncSessionDep, post_id: int):
+async def explain_meaning_of_post(
+    session: AsyncSessionDep,
+    explainer: PostExplainerDep,
+    post_id: int,
+    stream: bool = Query(False, description="Stream the answer as server-sent events"),
+):
     try:
-        return await PostQueryBuilder.explain_post(session, post_id)
+        if stream:
+            events = await PostQueryBuilder.stream_post_explanation(
+                session, post_id, explainer
+            )
+            return StreamingResponse(events, media_type="text/event-stream")
+        return await PostQueryBuilder.explain_post(session, post_id, explainer)
     except PostNotFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
+    except ExplanationFailed as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -1,8 +1,12 @@
 from .filters import PostFilter
 from .posts import (
     PostCreateSchema,
+    PostFeedItemSchema,
+    PostFeedResponseSchema,
     PostListResponseSchema,
     PostResponseSchema,
     PostUpdateSchema,
 )
 from .likes import LikedPostResponseSchema, LikedPostsListResponseSchema
+from .search import PostSearchListResponseSchema, PostSearchResultSchema
+from .explanation_jobs import ExplanationJobResponseSchema
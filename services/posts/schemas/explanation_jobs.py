@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlmodel import SQLModel
+
+
+class ExplanationJobResponseSchema(SQLModel):
+    id: int
+    post_id: int
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -27,9 +27,20 @@ class PostResponseSchema(SQLModel):
     author_id: int
     is_published: bool
     number_of_likes: int
+    number_of_comments: int = 0
+
+
+class PostFeedItemSchema(PostResponseSchema):
+    liked_by_me: bool = False
+
+
+class PostFeedResponseSchema(SQLModel):
+    items: List[PostFeedItemSchema]
+    next_cursor: Optional[str] = None
 
 
 class PostListResponseSchema(SQLModel):
     firstName: Optional[str] = None
     secondName: Optional[str] = None
     items: List[PostResponseSchema]
+    next_cursor: Optional[str] = None
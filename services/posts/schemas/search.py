@@ -0,0 +1,15 @@
+from typing import List
+
+from sqlmodel import SQLModel
+
+from services.posts.schemas.posts import PostResponseSchema
+
+
+class PostSearchResultSchema(PostResponseSchema):
+    rank: float
+    title_highlight: str
+    content_highlight: str
+
+
+class PostSearchListResponseSchema(SQLModel):
+    items: List[PostSearchResultSchema]
@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from fastapi_users import exceptions
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from fastapi_users.manager import BaseUserManager
+from sqlalchemy.orm import make_transient_to_detached
+
+from common.metrics import JWT_VERIFY_SECONDS
+from models import User
+
+USER_CLAIMS = (
+    "email",
+    "first_name",
+    "second_name",
+    "is_active",
+    "is_superuser",
+    "is_verified",
+)
+
+
+class CachingJWTStrategy(JWTStrategy[User, int]):
+    """JWT strategy that remembers the claims of recently verified tokens.
+
+    A bearer token is reused for its whole lifetime, so its signature is
+    checked once and the decoded claims are kept in an LRU until the token's
+    `exp`. Only tokens that passed verification are ever stored.
+    """
+
+    def __init__(self, *args, max_cached_tokens: int = 10000, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_cached_tokens = max_cached_tokens
+        # token -> (expires_at, claims)
+        self._claims: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def decode_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the verified claims of `token`, or None if it is invalid."""
+        entry = self._claims.get(token)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > time.time():
+                self._claims.move_to_end(token)
+                self.hits += 1
+                return claims
+            del self._claims[token]
+
+        self.misses += 1
+        started_at = time.perf_counter()
+        try:
+            claims = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+        except jwt.PyJWTError:
+            return None
+        finally:
+            JWT_VERIFY_SECONDS.observe(time.perf_counter() - started_at)
+
+        if self.max_cached_tokens:
+            self._claims[token] = (claims.get("exp", float("inf")), claims)
+            while len(self._claims) > self.max_cached_tokens:
+                self._claims.popitem(last=False)
+        return claims
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[User, int]
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        claims = self.decode_token(token)
+        if claims is None or claims.get("sub") is None:
+            return None
+        try:
+            return await user_manager.get(user_manager.parse_id(claims["sub"]))
+        except (ValueError, exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+
+class StatelessJWTStrategy(CachingJWTStrategy):
+    """JWT strategy that rebuilds the user from signed claims without a query.
+
+    Deactivating a user or changing their flags only takes effect once their
+    current token expires. Writes through `CachedUserDatabase` reload the
+    user from the database first, so stale claims are never written back.
+    """
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[User, int]
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        claims = self.decode_token(token)
+        if claims is None:
+            return None
+        if "sub" not in claims or any(claim not in claims for claim in USER_CLAIMS):
+            # Token issued before stateless mode was enabled.
+            return await super().read_token(token, user_manager)
+
+        try:
+            user_id = user_manager.parse_id(claims["sub"])
+        except (ValueError, exceptions.InvalidID):
+            return None
+        user = User(id=user_id, **{claim: claims[claim] for claim in USER_CLAIMS})
+        make_transient_to_detached(user)
+        return user
+
+    async def write_token(self, user: User) -> str:
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            **{claim: getattr(user, claim) for claim in USER_CLAIMS},
+        }
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm
+        )
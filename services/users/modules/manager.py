@@ -1,25 +1,34 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
-from fastapi_users import BaseUserManager, FastAPIUsers
+from fastapi_users import BaseUserManager, FastAPIUsers, exceptions, schemas
 from fastapi_users.authentication import (
     BearerTransport,
     JWTStrategy,
     AuthenticationBackend,
 )
 from fastapi import Request, Depends
+from fastapi.security import OAuth2PasswordRequestForm
 
-from common.settings import Settings
-from dependecies.auth import get_user_db
+from common.settings import get_settings
+from dependecies.auth import get_read_user_db, get_user_db
 from models import User
+from services.users.modules.jwt_strategy import (
+    CachingJWTStrategy,
+    StatelessJWTStrategy,
+)
+from services.users.modules.password_pool import get_password_pool
+from services.users.modules.user_cache import get_user_cache, user_cache_key
 
 
 class UserManager(BaseUserManager[User, int]):
-    reset_password_token_secret = (
-        Settings().auth.reset_password_token_secret.get_secret_value()
-    )
-    verification_token_secret = (
-        Settings().auth.verification_token_secret.get_secret_value()
-    )
+    @property
+    def reset_password_token_secret(self) -> str:
+        return get_settings().auth.reset_password_token_secret.get_secret_value()
+
+    @property
+    def verification_token_secret(self) -> str:
+        return get_settings().auth.verification_token_secret.get_secret_value()
 
     async def on_after_register(self, user, request: Optional[Request] = None):
         print(f"User {user.email} has registered")
@@ -34,6 +43,68 @@ class UserManager(BaseUserManager[User, int]):
     ):
         print(f"User: {user.email} sended verification request. token: {token}")
 
+    async def on_after_delete(self, user, request: Optional[Request] = None):
+        await get_user_cache().delete(user_cache_key(user.id))
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        # Same as BaseUserManager.create, but hashes on the password pool.
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await get_password_pool().hash(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        # Same as BaseUserManager.authenticate, but verifies on the password pool.
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Still hash to keep response times independent of the e-mail.
+            await get_password_pool().hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await get_password_pool().verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+            await get_user_cache().delete(user_cache_key(user.id))
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        # update(), verify() and reset_password() all write through here.
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {
+                key: value for key, value in update_dict.items() if key != "password"
+            }
+            update_dict["hashed_password"] = await get_password_pool().hash(password)
+        user = await super()._update(user, update_dict)
+        await get_user_cache().delete(user_cache_key(user.id))
+        return user
+
     def parse_id(self, user_id):
         return int(user_id)
 
@@ -42,13 +113,24 @@ async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
 
 
+async def get_read_user_manager(user_db=Depends(get_read_user_db)):
+    yield UserManager(user_db)
+
+
 bearer_transport = BearerTransport(tokenUrl="users/jwt/login")
 
 
+@lru_cache(maxsize=1)
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(
-        secret=Settings().auth.jwt_strategy_token_secret.get_secret_value(),
+    """Return the shared strategy; its token cache lives as long as the process."""
+    auth_settings = get_settings().auth
+    strategy_class = (
+        StatelessJWTStrategy if auth_settings.stateless_tokens else CachingJWTStrategy
+    )
+    return strategy_class(
+        secret=auth_settings.jwt_strategy_token_secret.get_secret_value(),
         lifetime_seconds=3600,
+        max_cached_tokens=auth_settings.token_cache_max_entries,
     )
 
 
@@ -58,3 +140,9 @@ auth_backend = AuthenticationBackend(
 
 fastapi_users = FastAPIUsers[User, int](get_user_manager, [auth_backend])
 current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+# For routes on ReadSessionDep: loads the user with the route's own session
+# instead of opening a second one.
+current_active_reader = FastAPIUsers[User, int](
+    get_read_user_manager, [auth_backend]
+).current_user(active=True)
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+from fastapi_users.password import PasswordHelper
+
+from common.metrics import PASSWORD_HASH_SECONDS
+
+_password_helper: Optional[PasswordHelper] = None
+
+
+def _get_password_helper() -> PasswordHelper:
+    # Created lazily so every process-pool worker builds its own hashers.
+    global _password_helper
+    if _password_helper is None:
+        _password_helper = PasswordHelper()
+    return _password_helper
+
+
+def hash_password(password: str) -> str:
+    return _get_password_helper().hash(password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return _get_password_helper().verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHashingPool:
+    """Run password hashing off the event loop with bounded concurrency.
+
+    At most `workers` hashes run at once; further calls wait on a semaphore
+    and are counted in `queued`, so a burst of logins queues up here instead
+    of blocking the event loop.
+    """
+
+    def __init__(
+        self, workers: int = 4, kind: Literal["thread", "process"] = "thread"
+    ) -> None:
+        self.workers = workers
+        self.kind = kind
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=workers)
+            if kind == "process"
+            else ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash"
+            )
+        )
+        self._slots = asyncio.Semaphore(workers)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self._run_metrics = {
+            operation: PASSWORD_HASH_SECONDS.labels(operation)
+            for operation in ("hash", "verify")
+        }
+
+    async def _run(
+        self, operation: str, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        enqueued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        started_at = time.perf_counter()
+        self.wait_seconds_total += started_at - enqueued_at
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            run_seconds = time.perf_counter() - started_at
+            self.running -= 1
+            self.completed += 1
+            self.run_seconds_total += run_seconds
+            self._run_metrics[operation].observe(run_seconds)
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(
+            "verify", verify_and_update_password, plain_password, hashed_password
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "max_queued": self.max_queued,
+            "wait_seconds_total": self.wait_seconds_total,
+            "run_seconds_total": self.run_seconds_total,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[PasswordHashingPool] = None
+
+
+def get_password_pool() -> PasswordHashingPool:
+    """Return the configured pool, creating a default thread pool if needed."""
+    global _pool
+    if _pool is None:
+        _pool = PasswordHashingPool()
+    return _pool
+
+
+def configure_password_pool(pool: Optional[PasswordHashingPool]) -> None:
+    global _pool
+    _pool = pool
@@ -0,0 +1,61 @@
+from typing import Any, Dict, Optional
+
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy.orm import make_transient_to_detached
+
+from common.cache import CacheBackend, NullCache
+from models import User
+
+# Process-local on purpose: entries include the password hash, so they are
+# never sent to a shared backend such as Redis.
+_user_cache: CacheBackend = NullCache()
+
+
+def get_user_cache() -> CacheBackend:
+    return _user_cache
+
+
+def configure_user_cache(cache: CacheBackend) -> None:
+    global _user_cache
+    _user_cache = cache
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def user_to_dict(user: User) -> Dict[str, Any]:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+class CachedUserDatabase(SQLAlchemyUserDatabase[User, int]):
+    """User database that serves `get` by id from the user cache.
+
+    Cache hits are merged into the session without a query, so the returned
+    user is persistent and can be updated like a freshly loaded one. Entries
+    are invalidated by `UserManager` after updates and deletes.
+    """
+
+    async def get(self, id: int) -> Optional[User]:
+        data = await get_user_cache().get(user_cache_key(id))
+        if data is not None:
+            user = User(**data)
+            make_transient_to_detached(user)
+            return await self.session.merge(user, load=False)
+
+        user = await super().get(id)
+        if user is not None:
+            await get_user_cache().set(user_cache_key(id), user_to_dict(user))
+        return user
+
+    async def _attach(self, user: User) -> User:
+        """Reload users that did not come from this session, e.g. token claims."""
+        if user in self.session:
+            return user
+        return await super().get(user.id)
+
+    async def update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        return await super().update(await self._attach(user), update_dict)
+
+    async def delete(self, user: User) -> None:
+        await super().delete(await self._attach(user))
@@ -0,0 +1,17 @@
+import os
+
+# Settings that have no defaults; tests never connect with them.
+for name, value in {
+    "IS_DEBUG": "false",
+    "IS_DATABASE__ENGINE": "postgresql+asyncpg",
+    "IS_DATABASE__DEBUG": "false",
+    "IS_DATABASE__HOST": "localhost",
+    "IS_DATABASE__PORT": "5432",
+    "IS_DATABASE__DB": "blog_test",
+    "IS_DATABASE__USER": "postgres",
+    "IS_DATABASE__PASSWORD": "postgres",
+    "IS_AUTH__RESET_PASSWORD_TOKEN_SECRET": "test-reset-secret",
+    "IS_AUTH__VERIFICATION_TOKEN_SECRET": "test-verification-secret",
+    "IS_AUTH__JWT_STRATEGY_TOKEN_SECRET": "test-jwt-secret",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class FakeOllama:
+    """OpenAI-compatible chat endpoint answering with a fixed explanation.
+
+    `release` holds every answer until set, so tests can start concurrent
+    requests first; `truncate` drops the final `[DONE]` of streamed answers.
+    """
+
+    def __init__(self, answer: str = "A post about testing.") -> None:
+        self.answer = answer
+        self.calls = 0
+        self.truncate = False
+        self.release = asyncio.Event()
+        self.release.set()
+        self.app = Starlette(
+            routes=[Route("/v1/chat/completions", self.chat, methods=["POST"])]
+        )
+
+    async def chat(self, request: Request) -> Response:
+        self.calls += 1
+        body = await request.json()
+        await self.release.wait()
+        if not body.get("stream"):
+            return JSONResponse(
+                {
+                    "object": "chat.completion",
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": self.answer},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+        lines = [
+            "data: "
+            + json.dumps(
+                {
+                    "object": "chat.completion.chunk",
+                    "model": body["model"],
+                    "choices": [
+                        {"index": 0, "delta": {"content": word}, "finish_reason": None}
+                    ],
+                }
+            )
+            for word in self.answer.split(" ")
+        ]
+        if not self.truncate:
+            lines.append("data: [DONE]")
+        return Response(
+            "\n\n".join(lines) + "\n\n", media_type="text/event-stream"
+        )
@@ -0,0 +1,128 @@
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class FakeRedis:
+    """In-memory stand-in for the `redis.asyncio.Redis` commands the app uses.
+
+    Every awaited command and every pipeline `execute` counts as one round
+    trip, so tests can assert how chatty a caller is.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self.sets: Dict[str, Set[bytes]] = {}
+        self.expiries: Dict[str, float] = {}
+        self.round_trips = 0
+        self.closed = False
+
+    def _expired(self, key: str) -> bool:
+        expires_at = self.expiries.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+            del self.expiries[key]
+            return True
+        return False
+
+    # Commands, shared by the client and pipelines.
+
+    def _get(self, key: str) -> Optional[bytes]:
+        if self._expired(key) or key not in self.values:
+            return None
+        return self.values[key][1]
+
+    def _set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        self.values[key] = (ex, value)
+        if ex is not None:
+            self.expiries[key] = time.monotonic() + ex
+        else:
+            self.expiries.pop(key, None)
+        return True
+
+    def _delete(self, *keys) -> int:
+        deleted = 0
+        for key in keys:
+            key = key.decode() if isinstance(key, bytes) else key
+            self.expiries.pop(key, None)
+            if self.values.pop(key, None) is not None or self.sets.pop(key, None):
+                deleted += 1
+        return deleted
+
+    def _sadd(self, key: str, *members: str) -> int:
+        self._expired(key)
+        target = self.sets.setdefault(key, set())
+        added = {member.encode() for member in members} - target
+        target |= added
+        return len(added)
+
+    def _smembers(self, key: str) -> Set[bytes]:
+        if self._expired(key):
+            return set()
+        return set(self.sets.get(key, ()))
+
+    def _expire(self, key: str, seconds: int) -> bool:
+        if key not in self.values and key not in self.sets:
+            return False
+        self.expiries[key] = time.monotonic() + seconds
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.round_trips += 1
+        return self._get(key)
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        self.round_trips += 1
+        return self._set(key, value, ex)
+
+    async def delete(self, *keys) -> int:
+        self.round_trips += 1
+        return self._delete(*keys)
+
+    async def sadd(self, key: str, *members: str) -> int:
+        self.round_trips += 1
+        return self._sadd(key, *members)
+
+    async def smembers(self, key: str) -> Set[bytes]:
+        self.round_trips += 1
+        return self._smembers(key)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self.round_trips += 1
+        return self._expire(key, seconds)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._commands = []
+
+    def __getattr__(self, name: str):
+        if name not in ("get", "set", "delete", "sadd", "smembers", "expire"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        self._client.round_trips += 1
+        commands, self._commands = self._commands, []
+        return [
+            getattr(self._client, f"_{name}")(*args, **kwargs)
+            for name, args, kwargs in commands
+        ]
@@ -0,0 +1,51 @@
+"""Run the Postgres models on SQLite files for tests.
+
+Postgres-only column types compile to their closest SQLite type, computed
+columns become plain columns, and the math functions used by the hot score
+are registered on each connection of engines made by `create_sqlite_engine`.
+"""
+
+import math
+
+from sqlalchemy import VARCHAR, event
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector(element, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb(element, compiler, **kw):
+    return "JSON"
+
+
+@compiles(VARCHAR, "sqlite")
+def _varchar(element, compiler, **kw):
+    # SQLite compares bytewise by default, like the "C" collation.
+    return "VARCHAR"
+
+
+@compiles(CreateColumn, "sqlite")
+def _create_column(element, compiler, **kw):
+    column = element.element
+    if column.computed is not None:
+        return f"{column.name} TEXT"
+    return compiler.visit_create_column(element, **kw)
+
+
+def create_sqlite_engine(path) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def register_functions(dbapi_connection, record):
+        dbapi_connection.create_function("greatest", -1, max)
+        dbapi_connection.create_function("least", -1, min)
+        dbapi_connection.create_function("ln", 1, math.log)
+        dbapi_connection.create_function("exp", 1, math.exp)
+
+    return engine
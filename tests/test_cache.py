@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from common.cache import MemoryCache, RedisCache
+from tests.fake_redis import FakeRedis
+
+
+def make_memory_cache():
+    return MemoryCache(max_entries=100, default_ttl=60)
+
+
+def make_redis_cache():
+    return RedisCache(FakeRedis(), prefix="test:", default_ttl=60)
+
+
+@pytest.fixture(params=[make_memory_cache, make_redis_cache], ids=["memory", "redis"])
+def cache(request):
+    return request.param()
+
+
+def test_get_or_load_loads_once(cache):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"id": 1}
+
+    async def run():
+        first = await cache.get_or_load("post:1", loader)
+        second = await cache.get_or_load("post:1", loader)
+        return first, second
+
+    assert asyncio.run(run()) == ({"id": 1}, {"id": 1})
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_invalidate_tags_drops_tagged_entries_only(cache):
+    async def run():
+        await cache.set("page:1", [1, 2], tags=["post:1", "post:2", "posts"])
+        await cache.set("page:2", [3], tags=["post:3", "posts"])
+        await cache.set("post:3", {"id": 3}, tags=["post:3"])
+        await cache.invalidate_tags("post:2")
+        return [await cache.get(key) for key in ("page:1", "page:2", "post:3")]
+
+    assert asyncio.run(run()) == [None, [3], {"id": 3}]
+
+
+def test_invalidate_several_tags(cache):
+    async def run():
+        await cache.set("a", 1, tags=["x"])
+        await cache.set("b", 2, tags=["y"])
+        await cache.set("c", 3, tags=["z"])
+        await cache.invalidate_tags("x", "y")
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [None, None, 3]
+
+
+def test_redis_set_and_invalidate_take_one_round_trip_each():
+    client = FakeRedis()
+    cache = RedisCache(client, prefix="test:")
+    tags = [f"post:{post_id}" for post_id in range(100)]
+
+    asyncio.run(cache.set("page:1", list(range(100)), tags=tags))
+    assert client.round_trips == 1
+
+    client.round_trips = 0
+    asyncio.run(cache.invalidate_tags(*tags))
+    # One pipelined SMEMBERS for all tags, one DEL for tags and entries.
+    assert client.round_trips == 2
+    assert asyncio.run(cache.get("page:1")) is None
+
+
+def test_redis_entries_and_tag_sets_expire():
+    client = FakeRedis()
+    cache = RedisCache(client, prefix="test:")
+    asyncio.run(cache.set("post:1", {"id": 1}, tags=["post:1"], ttl=30))
+    assert client.expiries.keys() == {"test:post:1", "test:tag:post:1"}
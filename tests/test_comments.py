@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, select
+
+from models import Comment, CommentLike, Post, User
+from services.comments.query_builder import CommentQueryBuilder
+from services.comments.schemas import CommentCreateSchema
+from tests.sqlite import create_sqlite_engine
+
+
+@pytest.fixture
+def run_with_session(tmp_path):
+    def run(scenario):
+        async def main():
+            engine = create_sqlite_engine(tmp_path / "comments.db")
+            try:
+                async with engine.begin() as connection:
+                    await connection.run_sync(SQLModel.metadata.create_all)
+                session_maker = async_sessionmaker(
+                    engine, class_=AsyncSession, expire_on_commit=False
+                )
+                async with session_maker() as session:
+                    user = User(
+                        email="ann@example.com",
+                        hashed_password="not-a-hash",
+                        first_name="Ann",
+                        second_name="Lee",
+                    )
+                    session.add(user)
+                    await session.flush()
+                    post = Post(
+                        title="Title",
+                        content="Body",
+                        author_id=user.id,
+                        is_published=True,
+                    )
+                    session.add(post)
+                    await session.commit()
+                    return await scenario(session, user, post)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def comment(session, user, post, parent=None):
+    return await CommentQueryBuilder.create_com(
+        session,
+        CommentCreateSchema(
+            content="text", post_id=post.id, parent_id=parent.id if parent else None
+        ),
+        user.id,
+    )
+
+
+async def state(session, post):
+    await session.refresh(post)
+    rows = await session.execute(
+        select(Comment.id, Comment.number_of_replies).order_by(Comment.id)
+    )
+    likes = await session.execute(select(CommentLike.comment_id))
+    return post.number_of_comments, dict(rows.all()), likes.scalars().all()
+
+
+def test_deleting_a_comment_deletes_its_replies(run_with_session):
+    async def scenario(session, user, post):
+        root = await comment(session, user, post)
+        reply = await comment(session, user, post, root)
+        nested = await comment(session, user, post, reply)
+        other = await comment(session, user, post)
+        session.add(CommentLike(user_id=user.id, comment_id=nested.id))
+        await session.commit()
+
+        await CommentQueryBuilder.delete_com(session, root.id, user.id)
+        return other.id, await state(session, post)
+
+    other_id, (comments, rows, likes) = run_with_session(scenario)
+    assert comments == 1
+    assert rows == {other_id: 0}
+    assert likes == []
+
+
+def test_deleting_a_reply_updates_its_parent(run_with_session):
+    async def scenario(session, user, post):
+        root = await comment(session, user, post)
+        reply = await comment(session, user, post, root)
+        await comment(session, user, post, reply)
+        kept = await comment(session, user, post, root)
+
+        await CommentQueryBuilder.delete_com(session, reply.id, user.id)
+        return root.id, kept.id, await state(session, post)
+
+    root_id, kept_id, (comments, rows, _) = run_with_session(scenario)
+    assert comments == 2
+    assert rows == {root_id: 1, kept_id: 0}
+
+
+def test_deleting_a_comment_without_path_walks_parent_ids(run_with_session):
+    async def scenario(session, user, post):
+        root = Comment(content="old", post_id=post.id, author_id=user.id)
+        session.add(root)
+        await session.flush()
+        reply = Comment(
+            content="old", post_id=post.id, author_id=user.id, parent_id=root.id
+        )
+        session.add(reply)
+        post.number_of_comments = 2
+        await session.commit()
+
+        await CommentQueryBuilder.delete_com(session, root.id, user.id)
+        return await state(session, post)
+
+    comments, rows, _ = run_with_session(scenario)
+    assert comments == 0
+    assert rows == {}
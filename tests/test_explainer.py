@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from common.cache import MemoryCache, configure_cache, get_cache
+from common.cache.tags import explanation_tag, post_tag
+from common.settings import ExplainerSettings
+from services.posts.modules.explainer import PostExplainer
+from tests.fake_ollama import FakeOllama
+
+
+@pytest.fixture
+def ollama():
+    configure_cache(MemoryCache(max_entries=100, default_ttl=60))
+    yield FakeOllama(answer="one two three")
+    configure_cache(MemoryCache(max_entries=100, default_ttl=60))
+
+
+def run_with_explainer(ollama, scenario):
+    async def run():
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=ollama.app), base_url="http://ollama"
+        )
+        try:
+            return await scenario(PostExplainer(client, ExplainerSettings()))
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+async def collect(events):
+    return [event.decode()[len("data: ") :].strip() async for event in events]
+
+
+def streamed_content(events):
+    assert events[-1] == "[DONE]"
+    return "".join(
+        json.loads(data)["choices"][0]["delta"].get("content", "")
+        for data in events[:-1]
+    )
+
+
+def test_explain_coalesces_and_caches(ollama):
+    async def scenario(explainer):
+        ollama.release.clear()
+        pending = [
+            asyncio.create_task(explainer.explain(1, "Title", "Body"))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.05)
+        ollama.release.set()
+        answers = await asyncio.gather(*pending)
+        again = await explainer.explain(1, "Title", "Body")
+        return answers, again
+
+    answers, again = run_with_explainer(ollama, scenario)
+    assert ollama.calls == 1
+    assert again == answers[0]
+    assert answers[0]["choices"][0]["message"]["content"] == "one two three"
+
+
+def test_stream_coalesces_and_caches_in_one_event_shape(ollama):
+    async def scenario(explainer):
+        ollama.release.clear()
+        pending = [
+            asyncio.create_task(collect(explainer.stream(1, "Title", "Body")))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        ollama.release.set()
+        streams = await asyncio.gather(*pending)
+        cached = await collect(explainer.stream(1, "Title", "Body"))
+        return streams, cached
+
+    streams, cached = run_with_explainer(ollama, scenario)
+    assert ollama.calls == 1
+    assert {streamed_content(events) for events in streams} == {"onetwothree"}
+    assert len(cached) == 2
+    assert json.loads(cached[0])["object"] == "chat.completion.chunk"
+    assert streamed_content(cached) == "onetwothree"
+
+
+def test_stream_without_done_is_not_cached(ollama):
+    ollama.truncate = True
+
+    async def scenario(explainer):
+        first = await collect(explainer.stream(1, "Title", "Body"))
+        second = await collect(explainer.stream(1, "Title", "Body"))
+        return first, second
+
+    first, second = run_with_explainer(ollama, scenario)
+    assert ollama.calls == 2
+    assert "[DONE]" not in first
+    assert "error" in json.loads(first[-1])
+    assert first == second
+
+
+def test_explanation_survives_post_tag_invalidation(ollama):
+    async def scenario(explainer):
+        await explainer.explain(1, "Title", "Body")
+        await get_cache().invalidate_tags(post_tag(1))
+        await explainer.explain(1, "Title", "Body")
+        await get_cache().invalidate_tags(explanation_tag(1))
+        await explainer.explain(1, "Title", "Body")
+
+    run_with_explainer(ollama, scenario)
+    assert ollama.calls == 2
@@ -0,0 +1,33 @@
+import re
+
+from starlette.routing import Route
+
+from common.metrics import REGISTRY, record_request
+
+
+async def endpoint(request):
+    pass
+
+
+def methods_of(route: str):
+    return set(
+        re.findall(
+            rf'http_request_duration_seconds_count{{method="([^"]*)",route="{route}"}}',
+            REGISTRY.render(),
+        )
+    )
+
+
+def test_unknown_methods_share_one_other_label():
+    route = Route("/metrics-test", endpoint, methods=["GET"])
+    for method in ("GET", "DELETE", "PROPFIND", "X-RANDOM-1", "X-RANDOM-2"):
+        record_request(route, method, 405, 0.01)
+    assert methods_of("/metrics-test") == {"GET", "other"}
+
+
+def test_unmatched_requests_keep_standard_methods_only():
+    for method in ("GET", "POST", "BREW", "X-RANDOM-3"):
+        record_request(None, method, 404, 0.01)
+    methods = methods_of("unmatched")
+    assert {"GET", "POST", "other"} <= methods
+    assert not methods & {"BREW", "X-RANDOM-3"}
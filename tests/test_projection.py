@@ -0,0 +1,32 @@
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+
+from common.projection import find_unneeded_eager_loads
+from common.schemas import PaginationParams
+from models import Comment, Post
+from services.comments.query_builder import CommentQueryBuilder
+from services.comments.schemas import CommentResponseSchema
+from services.posts.query_builder import PostQueryBuilder
+from services.posts.schemas import PostFilter, PostResponseSchema
+
+
+def test_flags_relationships_the_schema_does_not_serialize():
+    query = select(Post).options(selectinload(Post.comments), selectinload(Post.author))
+    assert find_unneeded_eager_loads(query, PostResponseSchema) == [
+        "author",
+        "comments",
+    ]
+
+
+def test_post_listing_loads_no_relationships():
+    for filters in (None, PostFilter(is_published=True)):
+        query = PostQueryBuilder.build_posts_page_query(PaginationParams(), filters, 1)
+        assert find_unneeded_eager_loads(query, PostResponseSchema) == []
+
+
+def test_comment_listings_load_no_relationships():
+    for query in (
+        CommentQueryBuilder.build_user_coms_query(1, PaginationParams()),
+        CommentQueryBuilder.build_post_coms_query(1, PaginationParams()),
+    ):
+        assert find_unneeded_eager_loads(query, CommentResponseSchema) == []
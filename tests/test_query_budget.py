@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from common.errors import QueryBudgetExceeded
+from db.instrumentation import QueryStatsMiddleware, instrument_engine
+from dependecies.instrumentation import query_budget
+
+
+def run_app(tmp_path, budget_action: str, path: str) -> httpx.Response:
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'budget.db'}")
+        instrument_engine(engine, slow_query_ms=0)
+        app = FastAPI()
+        app.add_middleware(QueryStatsMiddleware, budget_action=budget_action)
+
+        @app.get("/two", dependencies=[Depends(query_budget(2))])
+        async def two():
+            async with engine.begin() as connection:
+                await connection.execute(text("CREATE TABLE t (x INTEGER)"))
+                await connection.execute(
+                    text("INSERT INTO t VALUES (1), (2), (3)")
+                )
+
+        @app.get("/three", dependencies=[Depends(query_budget(2))])
+        async def three():
+            async with engine.connect() as connection:
+                for _ in range(3):
+                    await connection.execute(text("SELECT 1"))
+
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.get(path)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_within_budget_reports_statements_and_written_rows(tmp_path):
+    response = run_app(tmp_path, "raise", "/two")
+    assert response.status_code == 200
+    assert 'desc="2 statements, 3 rows"' in response.headers["server-timing"]
+
+
+def test_over_budget_raises_with_raise_action(tmp_path):
+    with pytest.raises(QueryBudgetExceeded, match="GET /three issued 3 SQL statements"):
+        run_app(tmp_path, "raise", "/three")
+
+
+def test_over_budget_only_logs_with_warn_action(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING, logger="db.instrumentation"):
+        response = run_app(tmp_path, "warn", "/three")
+    assert response.status_code == 200
+    assert "issued 3 SQL statements, budget is 2" in caplog.text
@@ -0,0 +1,157 @@
+import asyncio
+from typing import Annotated
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import Column, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from common.cache import MemoryCache, configure_cache, get_cache
+from common.metrics import DB_SESSION_SECONDS
+from common.settings import get_settings
+from db.database import Database
+from dependecies.session import AsyncSessionDep, ReadSessionDep
+from models import User
+from services.users.modules.manager import current_active_reader, get_jwt_strategy
+
+# Each file names itself, so responses show which database served them.
+source = Table("source", MetaData(), Column("name", String))
+USER = dict(
+    id=1,
+    first_name="Ann",
+    second_name="Lee",
+    email="ann@example.com",
+    hashed_password="not-a-hash",
+    is_active=True,
+    is_superuser=False,
+    is_verified=True,
+    number_of_followers=0,
+)
+
+
+async def create_file_database(path, name: str) -> str:
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(source.create)
+            await connection.run_sync(User.__table__.create)
+            await connection.execute(insert(source).values(name=name))
+            await connection.execute(insert(User.__table__).values(**USER))
+    finally:
+        await engine.dispose()
+    return url
+
+
+def build_app(database: Database) -> FastAPI:
+    app = FastAPI()
+    app.state.database = database
+
+    @app.get("/read")
+    async def read(session: ReadSessionDep):
+        return await session.scalar(select(source.c.name))
+
+    @app.get("/get")
+    async def get(session: AsyncSessionDep):
+        return await session.scalar(select(source.c.name))
+
+    @app.post("/write")
+    async def write(session: AsyncSessionDep):
+        return await session.scalar(select(source.c.name))
+
+    @app.get("/me")
+    async def me(
+        session: ReadSessionDep,
+        user: Annotated[User, Depends(current_active_reader)],
+    ):
+        return {
+            "source": await session.scalar(select(source.c.name)),
+            "same_session": user in session,
+        }
+
+    return app
+
+
+@pytest.fixture
+def run_app(tmp_path):
+    def run(scenario):
+        async def main():
+            primary = await create_file_database(tmp_path / "primary.db", "primary")
+            replica = await create_file_database(tmp_path / "replica.db", "replica")
+            database = Database(
+                db_url=primary,
+                engine_args={"echo": False},
+                settings=get_settings(),
+                replica_url=replica,
+            )
+            try:
+                transport = httpx.ASGITransport(app=build_app(database))
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://test"
+                ) as client:
+                    return await scenario(client, database)
+            finally:
+                await database.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def test_reads_use_replica_until_the_client_writes(run_app):
+    response_cache = MemoryCache(max_entries=100)
+    configure_cache(response_cache)
+
+    async def scenario(client, database):
+        other = {"Authorization": "Bearer other-client"}
+        return [
+            (await client.get("/read")).json(),
+            (await client.get("/get")).json(),
+            (await client.post("/write")).json(),
+            (await client.get("/read")).json(),
+            (await client.get("/read", headers=other)).json(),
+        ]
+
+    try:
+        assert run_app(scenario) == [
+            "replica",
+            "replica",
+            "primary",
+            "primary",
+            "replica",
+        ]
+        # Stickiness is tracked outside the response cache.
+        assert len(response_cache) == 0
+        assert (response_cache.hits, response_cache.misses) == (0, 0)
+    finally:
+        configure_cache(MemoryCache())
+
+
+def test_reads_fall_back_to_primary_when_replica_is_unhealthy(run_app):
+    async def scenario(client, database):
+        database.replica_healthy = False
+        return (await client.get("/read")).json()
+
+    assert run_app(scenario) == "primary"
+
+
+def test_read_routes_authenticate_on_their_read_session(run_app):
+    async def scenario(client, database):
+        token = await get_jwt_strategy().write_token(User(**USER))
+        sessions = DB_SESSION_SECONDS.labels().count
+        sticky = database.sticky_cache
+        lookups = sticky.hits + sticky.misses
+        response = await client.get(
+            "/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        return (
+            response.json(),
+            DB_SESSION_SECONDS.labels().count - sessions,
+            sticky.hits + sticky.misses - lookups,
+        )
+
+    body, sessions, sticky_lookups = run_app(scenario)
+    assert body == {"source": "replica", "same_session": True}
+    assert sessions == 1
+    assert sticky_lookups == 1
@@ -0,0 +1,78 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from common.cache import MemoryCache, configure_cache
+from models import Post, TrendingPost, User
+from services.posts.query_builder.trending import (
+    TRENDING_EPOCH,
+    TRENDING_TAU,
+    TrendingQueryBuilder,
+)
+from tests.sqlite import create_sqlite_engine
+
+
+def exponent(at: datetime) -> float:
+    return (at.timestamp() - TRENDING_EPOCH) / TRENDING_TAU
+
+
+def test_combined_event_time_of_one_event_is_that_event():
+    at = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+    combined = TrendingQueryBuilder.combined_event_time([at])
+    assert abs((combined - at).total_seconds()) < 1e-3
+
+
+def test_combined_event_time_keeps_total_weight():
+    start = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    times = [start, start + timedelta(hours=6), start + timedelta(days=2)]
+    combined = TrendingQueryBuilder.combined_event_time(times)
+    assert start < combined < times[-1]
+    # n * exp(x(combined)) == sum(exp(x(t))), compared as logs.
+    top = max(exponent(at) for at in times)
+    expected = top + math.log(sum(math.exp(exponent(at) - top) for at in times))
+    assert math.isclose(
+        math.log(len(times)) + exponent(combined), expected, rel_tol=1e-12
+    )
+
+
+def test_trending_skips_posts_unpublished_since_the_refresh(tmp_path):
+    async def main():
+        engine = create_sqlite_engine(tmp_path / "trending.db")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(SQLModel.metadata.create_all)
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                user = User(
+                    email="ann@example.com",
+                    hashed_password="not-a-hash",
+                    first_name="Ann",
+                    second_name="Lee",
+                )
+                session.add(user)
+                await session.flush()
+                posts = [
+                    Post(
+                        title=title,
+                        content="Body",
+                        author_id=user.id,
+                        is_published=True,
+                    )
+                    for title in ("kept", "hidden")
+                ]
+                session.add_all(posts)
+                await session.flush()
+                session.add_all(
+                    TrendingPost(rank=rank, post_id=post.id, hot_score=1.0)
+                    for rank, post in enumerate(posts, start=1)
+                )
+                posts[1].is_published = False
+                await session.commit()
+                return await TrendingQueryBuilder.get_trending_posts(session, 0, 20)
+        finally:
+            await engine.dispose()
+
+    configure_cache(MemoryCache())
+    assert [post["title"] for post in asyncio.run(main())] == ["kept"]